@@ -0,0 +1,83 @@
+# flask packages
+from flask import Response, request, jsonify
+from flask_restful import Resource
+
+# project resources
+from functions.optimisation import optimiseWithDispatch, getPreviousDispatch
+from functions.warmstart import setLastDispatch
+
+#external packages
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+#number of worker processes used to solve batches (one per core by default)
+BATCH_WORKERS = os.cpu_count() or 1
+
+#the pool is created on first use, so that importing the module does not spawn processes
+process_pool = None
+
+
+def getProcessPool() -> ProcessPoolExecutor:
+    """
+    Gets the process pool used to solve batches, creating it on first use.
+    :return: process pool
+    """
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+    return process_pool
+
+
+def solveBatch(payloads: list) -> list:
+    """
+    Solves a list of independent payloads on the process pool.
+    The results are returned in input order. An exception raised while solving one payload
+    is turned into an error message for that payload only.
+    The last dispatches are kept by this process (see optimiseWithDispatch): a payload with 'previous' set to 'last'
+    is warm-started from the last dispatch before the batch, and the dispatches of the batch are then kept in input order.
+    :param payloads: list of payloads (as accepted by optimise)
+    :return: list of JSON solutions or errors
+    """
+    pool = getProcessPool()
+    futures = [pool.submit(optimiseWithDispatch, payload, getPreviousDispatch(payload)) for payload in payloads]
+    results = []
+    for iPayload in range(0, len(futures)):
+        try:
+            output, dispatch = futures[iPayload].result()
+            if dispatch is not None:
+                setLastDispatch(dispatch)
+            results.append(output)
+        except Exception:
+            error_message = "Unexpected error while solving payload number %s." % iPayload
+            logging.exception(error_message)
+            results.append({"msg:": error_message})
+    return results
+
+
+class ProductionPlanBatchApi(Resource):
+    """
+    Flask-restful resource solving a batch of production plan payloads.
+    The payloads are independent and are solved in parallel on a pool of processes.
+    """
+    def post(self) -> Response:
+        """
+        POST response method for optimising a batch of loads.
+        Expects a JSON array of payloads, and returns a JSON array with the solution or the error message for each payload, in input order.
+        :return: JSON object
+        """
+        logging.info("New batch POST request.")
+        data = request.get_json(silent=True)
+        if data == None:
+            error_message = "Unable to parse JSON. Check content of JSON file and/or the CURL command used."
+            logging.error(error_message)
+            return jsonify({'error': error_message})
+        if not isinstance(data, list):
+            error_message = "Batch payload must be a JSON array of payloads. Check JSON file."
+            logging.error(error_message)
+            return jsonify({'error': error_message})
+
+        logging.info("Solving batch of %s payloads.", len(data))
+        output = solveBatch(data)
+        return jsonify(output)
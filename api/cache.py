@@ -0,0 +1,25 @@
+# flask packages
+from flask import Response, jsonify
+from flask_restful import Resource
+
+# project resources
+from functions.fleetcache import fleet_cache, merit_index_cache, dispatch_cache
+from functions.responsecache import response_cache
+
+
+class CacheStatsApi(Resource):
+    """
+    Flask-restful resource returning the statistics of the caches, for tuning their size and TTL.
+    """
+    def get(self) -> Response:
+        """
+        GET response method for the cache statistics.
+        :return: JSON object
+        """
+        output = {
+            "responses": response_cache.stats(),
+            "fleets": fleet_cache.stats(),
+            "merit_indexes": merit_index_cache.stats(),
+            "dispatches": dispatch_cache.stats(),
+        }
+        return jsonify({'result': output})
@@ -0,0 +1,42 @@
+# flask packages
+from flask import Response, request, jsonify
+from flask_restful import Resource
+
+# project resources
+from functions.windensemble import optimiseWindEnsemble
+from functions.timebudget import TimeBudget
+
+#external packages
+import logging
+
+
+class ProductionPlanEnsembleApi(Resource):
+    """
+    Flask-restful resource solving a payload for an ensemble of wind scenarios.
+    """
+    def post(self) -> Response:
+        """
+        POST response method for solving wind scenarios.
+        Expects a payload where 'wind(%)' is a list of scenarios, and returns the plan and global cost of each scenario
+        with statistics of the global cost, or an error message.
+        With the query parameter 'deadline_ms', all scenarios share that time budget,
+        and the header 'X-Optimality-Proven' tells whether all plans are proven to be optimal.
+        :return: JSON object
+        """
+        logging.info("New ensemble POST request.")
+        data = request.get_json(silent=True)
+        if data == None:
+            error_message = "Unable to parse JSON. Check content of JSON file and/or the CURL command used."
+            logging.error(error_message)
+            return jsonify({'error': error_message})
+
+        budget = None
+        deadline_ms = request.args.get("deadline_ms", type=float)
+        if deadline_ms is not None:
+            budget = TimeBudget(deadline_ms)
+
+        output = optimiseWindEnsemble(data, budget=budget)
+        response = jsonify(output)
+        if budget is not None:
+            response.headers["X-Optimality-Proven"] = "true" if budget.optimal else "false"
+        return response
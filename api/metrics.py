@@ -0,0 +1,19 @@
+# flask packages
+from flask import Response
+from flask_restful import Resource
+
+# project resources
+import functions.metrics as metrics
+
+
+class MetricsApi(Resource):
+    """
+    Flask-restful resource returning the metrics of the solver (stage durations, solve latency by path, search counters),
+    in the Prometheus text format.
+    """
+    def get(self) -> Response:
+        """
+        GET response method for the metrics.
+        :return: metrics in the Prometheus text format
+        """
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
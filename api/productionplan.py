@@ -3,15 +3,14 @@ from flask import Response, request, jsonify
 from flask_restful import Resource
 
 # project resources
-from models.powerplant import PowerPlant
 from api.errors import forbidden
-from functions.optimisation import optimise
+from functions.optimisation import optimise, getResponseDispatch
+from functions.warmstart import setLastDispatch
+from functions.responsecache import response_cache, getPayloadKey, isCacheable
+from functions.timebudget import TimeBudget
 
 #external packages
 import logging
-#set up logging file
-#file gets overwritten each time the server is rehosted
-logging.basicConfig(filename='error_and_info.log', filemode='w', format='%(levelname)s: %(message)s', level=logging.INFO)
 
 
 default_solution = [
@@ -83,6 +82,8 @@ class ProductionPlanApi(Resource):
         """
         POST response method for optimising load.
         Returns either the solution to the problem or an error message.
+        With the query parameter 'deadline_ms', the search stops after that time with the best solution found so far,
+        and the header 'X-Optimality-Proven' tells whether the solution is proven to be optimal.
         :return: JSON object
         """
         logging.info("New POST request.")
@@ -92,8 +93,32 @@ class ProductionPlanApi(Resource):
             logging.error(error_message)
             return jsonify({'error': error_message})
 
-        output = optimise(data)
-        return jsonify(output)
+        budget = None
+        deadline_ms = request.args.get("deadline_ms", type=float)
+        if deadline_ms is not None:
+            budget = TimeBudget(deadline_ms)
+
+        #identical payloads get the response computed before, as long as it hasn't expired
+        #only proven optimal responses are cached, so a cached response is always optimal
+        #payloads warm-started from a previous dispatch are always solved (see isCacheable)
+        key = getPayloadKey(data) if isCacheable(data) else None
+        cached = response_cache.get(key) if key is not None else None
+        if cached is not None:
+            logging.info("Returning cached response.")
+            output, dispatch = cached
+            #the dispatch is still the last one of the power plants, as if it had been solved again
+            if dispatch is not None:
+                setLastDispatch(dispatch)
+            response = jsonify(output)
+        else:
+            output = optimise(data, budget=budget)
+            response = jsonify(output)
+            if key is not None and (budget is None or budget.optimal):
+                response_cache.put(key, [output, getResponseDispatch(data, output)])
+
+        if budget is not None:
+            response.headers["X-Optimality-Proven"] = "true" if budget.optimal else "false"
+        return response
 
     
     #def delete(self, user_id: str) -> Response:
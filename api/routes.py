@@ -3,6 +3,12 @@ from flask_restful import Api
 
 # project resources
 from api.productionplan import ProductionPlanApi
+from api.batch import ProductionPlanBatchApi
+from api.sweep import ProductionPlanSweepApi
+from api.ensemble import ProductionPlanEnsembleApi
+from api.stream import ProductionPlanStreamApi
+from api.cache import CacheStatsApi
+from api.metrics import MetricsApi
 
 
 def create_routes(api: Api):
@@ -14,4 +20,10 @@ def create_routes(api: Api):
         api.add_resource(FooSpecial, '/special/foo', endpoint="foo")
     """
     api.add_resource(ProductionPlanApi, '/productionplan')
+    api.add_resource(ProductionPlanBatchApi, '/productionplan/batch')
+    api.add_resource(ProductionPlanSweepApi, '/productionplan/sweep')
+    api.add_resource(ProductionPlanEnsembleApi, '/productionplan/ensemble')
+    api.add_resource(ProductionPlanStreamApi, '/productionplan/stream')
+    api.add_resource(CacheStatsApi, '/productionplan/cache')
+    api.add_resource(MetricsApi, '/metrics')
 
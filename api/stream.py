@@ -0,0 +1,43 @@
+# flask packages
+from flask import Response, request, stream_with_context
+from flask_restful import Resource
+
+# project resources
+from functions.ndjson import LineSplitter, solveLine, formatLine, STREAM_CHUNK_BYTES
+from functions.timebudget import TimeBudget
+
+#external packages
+import logging
+
+
+class ProductionPlanStreamApi(Resource):
+    """
+    Flask-restful resource solving a stream of payloads, one JSON payload per line (NDJSON).
+    """
+    def post(self) -> Response:
+        """
+        POST response method for solving a stream of payloads.
+        The body is read chunk by chunk (it can be sent with chunked transfer encoding), and the solution (or error) of each line
+        is streamed back as one line as soon as it is solved, in input order. Only one line at a time is kept in memory.
+        With the query parameter 'deadline_ms', each line gets that time budget.
+        :return: NDJSON stream
+        """
+        logging.info("New stream POST request.")
+        deadline_ms = request.args.get("deadline_ms", type=float)
+        stream = request.stream
+
+        def generate():
+            splitter = LineSplitter()
+            nLines = 0
+            while True:
+                chunk = stream.read(STREAM_CHUNK_BYTES)
+                lines = splitter.feed(chunk) if chunk else splitter.close()
+                for line in lines:
+                    budget = TimeBudget(deadline_ms) if deadline_ms is not None else None
+                    yield formatLine(solveLine(line, budget=budget))
+                    nLines += 1
+                if not chunk:
+                    break
+            logging.info("Streamed the solutions of %s lines.", nLines)
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
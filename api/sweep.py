@@ -0,0 +1,42 @@
+# flask packages
+from flask import Response, request, jsonify
+from flask_restful import Resource
+
+# project resources
+from functions.pricesweep import optimiseSweep
+from functions.timebudget import TimeBudget
+
+#external packages
+import logging
+
+
+class ProductionPlanSweepApi(Resource):
+    """
+    Flask-restful resource solving a payload for a grid of fuel prices (fuel-price sensitivity).
+    """
+    def post(self) -> Response:
+        """
+        POST response method for sweeping fuel prices.
+        Expects a payload with a 'sweep' dictionary of gas and/or kerosine prices (lists, or ranges with 'start', 'stop' and 'step'),
+        and returns the plan and global cost for every grid point, or an error message.
+        With the query parameter 'deadline_ms', the whole sweep shares that time budget,
+        and the header 'X-Optimality-Proven' tells whether all plans are proven to be optimal.
+        :return: JSON object
+        """
+        logging.info("New sweep POST request.")
+        data = request.get_json(silent=True)
+        if data == None:
+            error_message = "Unable to parse JSON. Check content of JSON file and/or the CURL command used."
+            logging.error(error_message)
+            return jsonify({'error': error_message})
+
+        budget = None
+        deadline_ms = request.args.get("deadline_ms", type=float)
+        if deadline_ms is not None:
+            budget = TimeBudget(deadline_ms)
+
+        output = optimiseSweep(data, budget=budget)
+        response = jsonify(output)
+        if budget is not None:
+            response.headers["X-Optimality-Proven"] = "true" if budget.optimal else "false"
+        return response
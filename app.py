@@ -4,21 +4,61 @@ from flask_restful import Api
 
 # local packages
 from api.routes import create_routes
+from functions.fleetcache import fleet_cache, merit_index_cache, dispatch_cache, DEFAULT_FLEET_CACHE_SIZE
+from functions.responsecache import response_cache, DEFAULT_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_TTL
+import functions.parallelsearch as parallelsearch
+from functions.logqueue import setupLogging, DEFAULT_LOG_FILE, DEFAULT_LOG_MAX_BYTES, DEFAULT_LOG_BACKUP_COUNT, DEFAULT_VERBOSE_SAMPLING
 
 # external packages
 import os
 
 
+default_config = {
+    "FLEET_CACHE_SIZE": DEFAULT_FLEET_CACHE_SIZE,
+    "RESPONSE_CACHE_SIZE": DEFAULT_RESPONSE_CACHE_SIZE,
+    "RESPONSE_CACHE_TTL": DEFAULT_RESPONSE_CACHE_TTL,
+    "LOG_FILE": DEFAULT_LOG_FILE,
+    "LOG_MAX_BYTES": DEFAULT_LOG_MAX_BYTES,
+    "LOG_BACKUP_COUNT": DEFAULT_LOG_BACKUP_COUNT,
+    "LOG_VERBOSE_SAMPLING": DEFAULT_VERBOSE_SAMPLING,
+    "SUBSET_WORKERS": parallelsearch.DEFAULT_SUBSET_WORKERS,
+}
+
 
 def get_flask_app(config: dict = None) -> app.Flask:
     """
     Initialises Flask app with given configuration.
     However no configuration is necessary to run this app.
+    Recognised keys:
+    FLEET_CACHE_SIZE: number of prepared fleets (and of merit-order indexes and last dispatches) kept in memory across requests (0 disables the cache)
+    RESPONSE_CACHE_SIZE: number of responses kept in memory for identical payloads (0 disables the cache)
+    RESPONSE_CACHE_TTL: time (in seconds) during which a response is reused for identical payloads
+    LOG_FILE: log file, appended to and written by a background thread ('{pid}' is replaced by the process id)
+    LOG_MAX_BYTES: size (in bytes) at which the log file is rotated (0 to never rotate)
+    LOG_BACKUP_COUNT: number of rotated log files kept
+    LOG_VERBOSE_SAMPLING: one verbose solver dump in this number is logged (0 to log none)
+    SUBSET_WORKERS: number of worker processes searching the subsets of cost tiers of one heavy solve (0 to search them serially)
     :param config: Configuration dictionary
     :return: app
     """
     # init flask
     flask_app = Flask(__name__)
+    flask_app.config.update(default_config)
+    if config is not None:
+        flask_app.config.update(config)
+
+    # init logging
+    setupLogging(flask_app.config["LOG_FILE"], flask_app.config["LOG_MAX_BYTES"],
+                 flask_app.config["LOG_BACKUP_COUNT"], flask_app.config["LOG_VERBOSE_SAMPLING"])
+
+    # init caches
+    fleet_cache.resize(flask_app.config["FLEET_CACHE_SIZE"])
+    merit_index_cache.resize(flask_app.config["FLEET_CACHE_SIZE"])
+    dispatch_cache.resize(flask_app.config["FLEET_CACHE_SIZE"])
+    response_cache.configure(flask_app.config["RESPONSE_CACHE_SIZE"], flask_app.config["RESPONSE_CACHE_TTL"])
+
+    # init parallel search
+    parallelsearch.configure(flask_app.config["SUBSET_WORKERS"])
 
     # init api and routes
     api = Api(app=flask_app)
@@ -0,0 +1,455 @@
+# project resources
+from app import default_config as flask_default_config
+from functions.optimisation import optimiseWithDispatch, getPreviousDispatch
+from functions.warmstart import setLastDispatch
+from functions.ndjson import LineSplitter, solveLine, formatLine
+from functions.fleetcache import fleet_cache, merit_index_cache, dispatch_cache
+from functions.responsecache import response_cache, getPayloadKey, isCacheable
+from functions.timebudget import TimeBudget
+from functions.logqueue import setupLogging
+
+# external packages
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs
+
+
+#time (in seconds) kept between the deadline given to the solver and the request deadline, to send the solution back in time
+SOLVER_DEADLINE_MARGIN = 0.1
+
+#in the worker processes: one cancellation flag per in-flight slot, shared with the server process
+cancel_flags = None
+
+
+default_config = dict(flask_default_config)
+default_config.update({
+    "SOLVER_WORKERS": os.cpu_count() or 1,
+    "MAX_INFLIGHT_SOLVES": os.cpu_count() or 1,
+    "REQUEST_TIMEOUT": 10,
+})
+
+
+def initialiseWorker(flags):
+    """
+    Initialises a worker process of the pool with the shared cancellation flags.
+    :param flags: shared array of cancellation flags, one per in-flight slot
+    """
+    global cancel_flags
+    cancel_flags = flags
+
+
+def solveInWorker(data, previous_dispatch, deadline_ms, slot):
+    """
+    Solves a payload in a worker process, within a time budget, warm-started from the last dispatch of the server process if
+    'previous' is 'last' (see optimiseWithDispatch).
+    The solve also stops as soon as the cancellation flag of its slot is set (e.g. the client has disconnected).
+    :param data: payload (as accepted by optimise)
+    :param previous_dispatch: last dispatch of the server process (see getPreviousDispatch), None if 'previous' isn't 'last'
+    :param deadline_ms: time (in milliseconds) after which the search stops with the best solution found so far
+    :param slot: in-flight slot of the solve
+    :return: [ JSON solution or error, whether the solution is proven to be optimal, its dispatch (see getResponseDispatch) ]
+    """
+    budget = TimeBudget(deadline_ms, lambda: cancel_flags[slot] != 0)
+    output, dispatch = optimiseWithDispatch(data, previous_dispatch, budget=budget)
+    return [output, budget.optimal, dispatch]
+
+
+def solveLineInWorker(line, deadline_ms, slot):
+    """
+    Solves the payload of one line of a stream in a worker process, within a time budget (see solveInWorker).
+    The line is parsed and its solution formatted in the worker, so that the server process only passes bytes around.
+    The lines are solved in parallel, so 'previous' can't be set to 'last' (see ndjson.solveLine).
+    :param line: JSON payload (bytes), None for a line which was too long
+    :param deadline_ms: time (in milliseconds) after which the search stops with the best solution found so far
+    :param slot: in-flight slot of the solve
+    :return: (bytes) NDJSON line of the solution or error
+    """
+    budget = TimeBudget(deadline_ms, lambda: cancel_flags[slot] != 0)
+    return formatLine(solveLine(line, budget=budget, last_dispatch=False))
+
+
+
+class AsyncProductionPlanApp:
+    """
+    ASGI application serving '/productionplan' without blocking on the solver.
+    The event loop only parses requests and reads the response cache, the solves are offloaded to a pool of processes.
+    The number of solves in flight is capped, and each request has a deadline (waiting for a free slot included).
+    The solver is given the time left before the deadline (or less, with the query parameter 'deadline_ms'),
+    and returns the best solution found so far when it runs out, with the header 'X-Optimality-Proven' set to 'false'.
+    A request that still can't be answered in time gets a 504 response instead of queueing behind slower ones.
+    When the client disconnects, its solve is stopped.
+    '/productionplan/stream' solves a stream of payloads, one per line (see stream).
+    Intialise:  asgi_app = AsyncProductionPlanApp(config)
+    Run:        uvicorn asgi:app --port 8888
+    """
+
+    def __init__(self, config: dict):
+        """
+        Initialise AsyncProductionPlanApp object
+        :param config: configuration dictionary (see get_asgi_app)
+        """
+        self.workers = config["SOLVER_WORKERS"]
+        self.max_inflight = config["MAX_INFLIGHT_SOLVES"]
+        self.timeout = config["REQUEST_TIMEOUT"]
+        #created on first use, so that importing the module does not spawn processes
+        self.pool = None
+        self.flags = None
+        #created on first use, so that it belongs to the running event loop
+        self.free_slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"].rstrip("/")
+        if path not in ("/productionplan", "/productionplan/stream"):
+            output = {"error":
+                      {"msg": "404 error: This route is currently not supported. See API documentation."}
+                      }
+            await self.respond(send, {'result': output}, 404)
+            return
+        if scope["method"] != "POST":
+            output = {"error":
+                      {"msg": "405 error: Only POST requests are supported by this route in async mode."}
+                      }
+            await self.respond(send, {'result': output}, 405)
+            return
+
+        deadline_ms = None
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            deadline_ms = float(query["deadline_ms"][0])
+        except (KeyError, ValueError):
+            pass
+        if path == "/productionplan/stream":
+            await self.stream(receive, send, deadline_ms)
+            return
+
+        body = await self.readBody(receive)
+        disconnected = asyncio.Event()
+        watcher = asyncio.ensure_future(self.watchDisconnect(receive, disconnected))
+        try:
+            status, output, optimal = await self.post(body, deadline_ms, disconnected)
+        finally:
+            watcher.cancel()
+        if disconnected.is_set():
+            return
+        headers = []
+        if optimal is not None:
+            headers.append((b"x-optimality-proven", b"true" if optimal else b"false"))
+        await self.respond(send, output, status, headers)
+
+    async def lifespan(self, receive, send):
+        """
+        Handles the startup and shutdown messages of the ASGI server. The process pool is shut down with the server.
+        :param receive: ASGI receive channel
+        :param send: ASGI send channel
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.pool is not None:
+                    for iSlot in range(0, self.max_inflight):
+                        self.flags[iSlot] = 1
+                    self.pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = None
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def readBody(self, receive) -> bytes:
+        """
+        Reads the whole body of a request.
+        :param receive: ASGI receive channel
+        :return: body
+        """
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    async def watchDisconnect(self, receive, disconnected: asyncio.Event):
+        """
+        Waits for the client to disconnect, once the body has been read.
+        :param receive: ASGI receive channel
+        :param disconnected: event set when the client disconnects
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                return
+
+    async def respond(self, send, output, status: int = 200, headers: list = None):
+        """
+        Sends a JSON response.
+        :param send: ASGI send channel
+        :param output: JSON-serialisable output
+        :param status: HTTP status code
+        :param headers: extra headers, as a list of (name, value) bytes
+        """
+        body = (json.dumps(output) + "\n").encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + (headers or []),
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def post(self, body: bytes, deadline_ms: float, disconnected: asyncio.Event) -> list:
+        """
+        POST response method for optimising load, same as ProductionPlanApi.post but with the solve offloaded.
+        :param body: body of the request
+        :param deadline_ms: time (in milliseconds) given to the solver by the client, None to use the whole request deadline
+        :param disconnected: event set when the client disconnects
+        :return: [ HTTP status code, JSON object, whether the solution is proven to be optimal (None if not solved) ]
+        """
+        logging.info("New POST request.")
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if data == None:
+            error_message = "Unable to parse JSON. Check content of JSON file and/or the CURL command used."
+            logging.error(error_message)
+            return [200, {'error': error_message}, None]
+
+        #identical payloads get the response computed before, as long as it hasn't expired
+        #only proven optimal responses are cached, so a cached response is always optimal
+        #payloads warm-started from a previous dispatch are always solved (see isCacheable)
+        key = getPayloadKey(data) if isCacheable(data) else None
+        cached = response_cache.get(key) if key is not None else None
+        if cached is not None:
+            logging.info("Returning cached response.")
+            output, dispatch = cached
+            #the dispatch is still the last one of the power plants, as if it had been solved again
+            if dispatch is not None:
+                setLastDispatch(dispatch)
+            return [200, output, True]
+
+        #the last dispatches are kept by the server process, since any worker may solve the next payload of the same plants
+        previous_dispatch = getPreviousDispatch(data)
+        request_deadline = asyncio.get_running_loop().time() + self.timeout
+        try:
+            result = await asyncio.wait_for(self.solve(data, previous_dispatch, deadline_ms, request_deadline, disconnected), self.timeout)
+        except asyncio.TimeoutError:
+            error_message = "Unable to solve the payload within %s seconds. Try again later or with a simpler payload." % self.timeout
+            logging.error(error_message)
+            return [504, {'error': error_message}, None]
+        except Exception:
+            error_message = "Unexpected error while solving payload."
+            logging.exception(error_message)
+            return [500, {'error': error_message}, None]
+        if result is None:
+            logging.info("Client disconnected, solve stopped.")
+            return [499, None, None]
+        output, optimal, dispatch = result
+        if dispatch is not None:
+            setLastDispatch(dispatch)
+        if key is not None and optimal:
+            response_cache.put(key, [output, dispatch])
+        return [200, output, optimal]
+
+    async def stream(self, receive, send, deadline_ms: float):
+        """
+        POST response method for solving a stream of payloads, one JSON payload per line (NDJSON), same as ProductionPlanStreamApi.post
+        but with the lines solved in parallel on the process pool.
+        The lines are submitted as they arrive, each on an in-flight slot, and the solution (or error) of each line is sent back
+        as one line as soon as it and all the lines before it are solved, so the output is in input order.
+        Memory stays bounded: when the in-flight slots are all taken, or too many solutions wait for an earlier line,
+        the body is not read any further until they are sent (the client is slowed down by the server).
+        Each line gets the time budget 'deadline_ms', or REQUEST_TIMEOUT if not given, and the solves are stopped when the client disconnects.
+        :param receive: ASGI receive channel
+        :param send: ASGI send channel
+        :param deadline_ms: time (in milliseconds) given to the solver for each line, None for the request timeout
+        """
+        logging.info("New stream POST request.")
+        solver_ms = self.timeout * 1000 if deadline_ms is None else deadline_ms
+        #solves submitted and not sent yet, in input order, ended by None
+        pending = asyncio.Queue(maxsize=self.max_inflight)
+        inflight = set()
+        disconnected = asyncio.Event()
+
+        def stopSolves():
+            for future, slot in inflight:
+                if not future.done():
+                    self.flags[slot] = 1
+
+        async def readLines():
+            splitter = LineSplitter()
+            more_body = True
+            try:
+                while more_body:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        disconnected.set()
+                        break
+                    more_body = message.get("more_body", False)
+                    lines = splitter.feed(message.get("body", b""))
+                    if not more_body:
+                        lines += splitter.close()
+                    for line in lines:
+                        slot = await self.acquireSlot()
+                        item = (self.submit(slot, solveLineInWorker, line, solver_ms), slot)
+                        inflight.add(item)
+                        await pending.put(item)
+            except Exception:
+                #the lines submitted so far are still sent back
+                logging.exception("Unexpected error while reading the stream.")
+            if not disconnected.is_set():
+                await pending.put(None)
+                await self.watchDisconnect(receive, disconnected)
+            stopSolves()
+            try:
+                pending.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        })
+        reader = asyncio.ensure_future(readLines())
+        nLines = 0
+        try:
+            while not disconnected.is_set():
+                item = await pending.get()
+                if item is None:
+                    break
+                try:
+                    line = await asyncio.wrap_future(item[0])
+                except Exception:
+                    error_message = "Unexpected error while solving payload."
+                    logging.exception(error_message)
+                    line = formatLine({'error': error_message})
+                finally:
+                    inflight.discard(item)
+                if disconnected.is_set():
+                    break
+                await send({"type": "http.response.body", "body": line, "more_body": True})
+                nLines += 1
+            if not disconnected.is_set():
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            reader.cancel()
+            stopSolves()
+        if disconnected.is_set():
+            logging.info("Client disconnected after %s lines, solves stopped.", nLines)
+        else:
+            logging.info("Streamed the solutions of %s lines.", nLines)
+
+    async def acquireSlot(self) -> int:
+        """
+        Waits for one of the in-flight slots to be free, creating the process pool on first use.
+        The slot is given back by submit, once the solve has really finished.
+        :return: slot
+        """
+        if self.pool is None:
+            self.flags = multiprocessing.RawArray('b', self.max_inflight)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=initialiseWorker, initargs=(self.flags,))
+        if self.free_slots is None:
+            self.free_slots = asyncio.Queue()
+            for iSlot in range(0, self.max_inflight):
+                self.free_slots.put_nowait(iSlot)
+        return await self.free_slots.get()
+
+    def submit(self, slot: int, function, *args):
+        """
+        Submits a solve to the process pool on an in-flight slot, which is given back when the solve has finished.
+        As long as the future is not done, the slot is still its own, and its cancellation flag can be set.
+        :param slot: in-flight slot (see acquireSlot), whose cancellation flag is reset
+        :param function: function run by the worker, called with args then the slot
+        :return: concurrent.futures.Future of the result
+        """
+        loop = asyncio.get_running_loop()
+        self.flags[slot] = 0
+        try:
+            future = self.pool.submit(function, *args, slot)
+        except Exception:
+            self.free_slots.put_nowait(slot)
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.free_slots.put_nowait, slot))
+        return future
+
+    async def solve(self, data, previous_dispatch, deadline_ms: float, request_deadline: float, disconnected: asyncio.Event):
+        """
+        Solves a payload on the process pool, once one of the in-flight slots is free.
+        The solver gets the time left before the request deadline, and its cancellation flag is set if the request is abandoned
+        (deadline passed or client disconnected), so that the worker is freed as soon as possible.
+        The slot is only given back when the solve has really finished, so that new requests never queue inside the pool.
+        :param data: payload (as accepted by optimise)
+        :param previous_dispatch: last dispatch of the server process (see getPreviousDispatch), None if 'previous' isn't 'last'
+        :param deadline_ms: time (in milliseconds) given to the solver by the client, None to use the whole request deadline
+        :param request_deadline: event loop time at which the request must be answered
+        :param disconnected: event set when the client disconnects
+        :return: [ JSON solution or error, whether the solution is proven to be optimal, its dispatch ], or None if the client disconnected
+        """
+        loop = asyncio.get_running_loop()
+        slot = await self.acquireSlot()
+        solver_ms = max(request_deadline - loop.time() - SOLVER_DEADLINE_MARGIN, 0) * 1000
+        if deadline_ms is not None:
+            solver_ms = min(solver_ms, deadline_ms)
+
+        start = time.perf_counter()
+        solved = asyncio.wrap_future(self.submit(slot, solveInWorker, data, previous_dispatch, solver_ms))
+        waiter = asyncio.ensure_future(disconnected.wait())
+        try:
+            await asyncio.wait([solved, waiter], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            self.flags[slot] = 1
+            solved.cancel()
+            raise
+        finally:
+            waiter.cancel()
+        if not solved.done():
+            self.flags[slot] = 1
+            solved.cancel()
+            return None
+        result = solved.result()
+        logging.info("Payload solved in %.3f seconds.", time.perf_counter() - start)
+        return result
+
+
+def get_asgi_app(config: dict = None) -> AsyncProductionPlanApp:
+    """
+    Initialises the ASGI app with given configuration.
+    However no configuration is necessary to run this app.
+    Recognised keys, on top of those of app.get_flask_app:
+    SOLVER_WORKERS: number of worker processes running the solver
+    MAX_INFLIGHT_SOLVES: number of solves submitted to the workers at any time, further requests wait for a free slot
+    REQUEST_TIMEOUT: time (in seconds) within which a request is answered, waiting for a free slot included,
+    with the best solution found so far if the search can't finish, or else with a 504 response
+    :param config: Configuration dictionary
+    :return: app
+    """
+    asgi_config = dict(default_config)
+    if config is not None:
+        asgi_config.update(config)
+
+    # init logging
+    setupLogging(asgi_config["LOG_FILE"], asgi_config["LOG_MAX_BYTES"],
+                 asgi_config["LOG_BACKUP_COUNT"], asgi_config["LOG_VERBOSE_SAMPLING"])
+
+    # init caches
+    fleet_cache.resize(asgi_config["FLEET_CACHE_SIZE"])
+    merit_index_cache.resize(asgi_config["FLEET_CACHE_SIZE"])
+    dispatch_cache.resize(asgi_config["FLEET_CACHE_SIZE"])
+    response_cache.configure(asgi_config["RESPONSE_CACHE_SIZE"], asgi_config["RESPONSE_CACHE_TTL"])
+
+    return AsyncProductionPlanApp(asgi_config)
+
+
+app = get_asgi_app()
@@ -0,0 +1,46 @@
+"""
+Benchmark of the load splitting in a cost tier of equivalent plants (see distributeLoadInEquivalentPlants).
+Run from the project directory:  python -m benchmarks.equivalentplants
+"""
+#internal packages
+from models.powerplant import PowerPlant
+from models.units import toPowerUnits
+from functions.optimisation import distributeLoadInEquivalentPlants
+
+# external packages
+import timeit
+
+
+def makeHomogeneousTier(nPlants):
+    """
+    Makes a cost tier of identical gas-fired plants.
+    :param nPlants: number of plants in the tier
+    :return: list of PowerPlant objects
+    """
+    plants = []
+    for iPlant in range(0, nPlants):
+        plant = PowerPlant("gasfired%s" % iPlant, "gasfired", 0.53, 100, 460)
+        plant.setCost(2528)
+        plants.append(plant)
+    return plants
+
+
+def benchmarkTier(nPlants, repeat=5, number=200):
+    """
+    Times the split of a load needing about two thirds of the tier.
+    :param nPlants: number of plants in the tier
+    :param repeat: number of timing repetitions (the best one is kept)
+    :param number: number of splits per repetition
+    :return: best time per split, in microseconds
+    """
+    plants = makeHomogeneousTier(nPlants)
+    tier_load = toPowerUnits(nPlants * 460 * 2 / 3 + 0.3)
+    timer = timeit.Timer(lambda: distributeLoadInEquivalentPlants(tier_load, plants, 0))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e6
+
+
+if __name__ == '__main__':
+    print("%10s %18s" % ("plants", "time per split"))
+    for nPlants in [5, 10, 20, 50, 100, 500]:
+        print("%10s %15.1f us" % (nPlants, benchmarkTier(nPlants)))
@@ -0,0 +1,246 @@
+"""
+Scaling benchmark of the whole optimisation, on synthetic fleets of 5 to 500 plants.
+The fleets are drawn by a seeded generator, varying the number of cost tiers, the pmin tightness and the wind share.
+Each stage of optimise is timed separately: parsing, fleet preparation (tiers and power ranges), golden path and full solve.
+Run from the project directory:  python -m benchmarks.scaling [--quick] [--json results.json]
+The table is printed, and the results (one record per case and a summary per fleet size) can be written as JSON,
+to compare the throughput and latency of two releases.
+"""
+#internal packages
+from models.units import toPowerUnits
+from functions.optimisation import parsePayload, makeOrderedPlants, prepareFleet, tryGoldenPath, solveLoad
+from functions.timebudget import TimeBudget
+import functions.vectorisedsearch as vectorisedsearch
+import functions.parallelsearch as parallelsearch
+
+# external packages
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+
+
+FLEET_SIZES = [5, 10, 20, 50, 100, 200, 500]
+TIER_COUNTS = [4, 12, 40]
+PMIN_TIGHTNESS = [0, 0.5, 0.9]
+WIND_SHARES = [0, 0.3]
+QUICK_FLEET_SIZES = [5, 20, 100]
+QUICK_TIER_COUNTS = [4, 12]
+QUICK_PMIN_TIGHTNESS = [0, 0.9]
+QUICK_WIND_SHARES = [0.3]
+
+GAS_PRICE = 13.4
+KEROSINE_PRICE = 50.8
+PLANT_SIZES = [50, 100, 150, 200, 300, 460]
+WINDTURBINE_SIZES = [36, 50, 100]
+
+
+def makePayload(rng, nPlants, nTiers, pmin_tightness, wind_share):
+    """
+    Makes a random payload, with a fleet of gas-fired plants, turbojets and wind turbines.
+    The thermal plants are spread over nTiers different efficiencies (so at most nTiers cost tiers, each of them used),
+    one in five tiers being turbojets. Their pmin is about pmin_tightness times their pmax.
+    The load is between 20% and 80% of the total capacity.
+    :param rng: random.Random object (seeded)
+    :param nPlants: number of plants
+    :param nTiers: number of cost tiers of thermal plants (capped by the number of thermal plants)
+    :param pmin_tightness: ratio pmin / pmax of the thermal plants, between 0 and 1
+    :param wind_share: share of wind turbines in the fleet, between 0 and 1
+    :return: payload
+    """
+    nWind = int(round(nPlants * wind_share))
+    nThermal = nPlants - nWind
+    nTiers = max(1, min(nTiers, nThermal))
+    plants = []
+    capacity = 0
+    wind_pc = rng.choice([25, 60, 100]) if nWind > 0 else 0
+    for iPlant in range(0, nThermal):
+        #the first plants cover every tier, the others are spread randomly
+        iTier = iPlant if iPlant < nTiers else rng.randrange(nTiers)
+        efficiency = round(0.25 + 0.35 * iTier / max(nTiers - 1, 1), 4)
+        pmax = rng.choice(PLANT_SIZES)
+        pmin = round(pmax * pmin_tightness * rng.uniform(0.8, 1), 1)
+        plants.append({
+            "name": "thermal%s" % iPlant,
+            "type": "turbojet" if iTier % 5 == 4 else "gasfired",
+            "efficiency": efficiency,
+            "pmin": pmin,
+            "pmax": pmax,
+        })
+        capacity += pmax
+    for iPlant in range(0, nWind):
+        pmax = rng.choice(WINDTURBINE_SIZES)
+        plants.append({"name": "windpark%s" % iPlant, "type": "windturbine", "efficiency": 1, "pmin": 0, "pmax": pmax})
+        capacity += pmax * wind_pc / 100
+    rng.shuffle(plants)
+    payload = {
+        "load": round(capacity * rng.uniform(0.2, 0.8), 1),
+        "fuels": {
+            "gas(euro/MWh)": GAS_PRICE,
+            "kerosine(euro/MWh)": KEROSINE_PRICE,
+            "co2(euro/ton)": 20,
+            "wind(%)": wind_pc,
+        },
+        "powerplants": plants,
+    }
+    return payload
+
+
+def timeStages(payload, engine, deadline_ms):
+    """
+    Runs optimise stage by stage on a payload, without the fleet cache, and times each stage.
+    :param payload: payload
+    :param engine: search engine (see solveLoad)
+    :param deadline_ms: time budget of the search, in milliseconds
+    :return: dictionary with the time of each stage (in milliseconds), the number of cost tiers and the outcome
+    """
+    timings = {}
+    start = time.perf_counter()
+    errors, parsed = parsePayload(payload)
+    timings["parse"] = time.perf_counter() - start
+    if len(errors) > 0:
+        raise ValueError(" ".join(errors))
+
+    start = time.perf_counter()
+    fleet = prepareFleet(makeOrderedPlants(parsed), parsed["wind_pc"])
+    timings["fleet"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    golden_path = tryGoldenPath(toPowerUnits(parsed["load"]), fleet["plants_byCostTier"], fleet["power_ranges_byCostTier"])
+    timings["golden_path"] = time.perf_counter() - start
+
+    budget = TimeBudget(deadline_ms)
+    start = time.perf_counter()
+    output = solveLoad(parsed["load"], fleet, engine, budget)
+    timings["solve"] = time.perf_counter() - start
+
+    record = {stage: round(seconds * 1000, 4) for stage, seconds in timings.items()}
+    record["total"] = round(sum(timings.values()) * 1000, 4)
+    record["tiers"] = len(fleet["plants_byCostTier"])
+    record["golden_path_hit"] = golden_path[0]
+    record["solved"] = isinstance(output, list)
+    record["optimal"] = budget.optimal
+    return record
+
+
+def runCase(rng, nPlants, nTiers, pmin_tightness, wind_share, loads, repeat, engine, deadline_ms):
+    """
+    Benchmarks one kind of fleet: a fleet is drawn, and solved for several loads.
+    Each load is timed repeat times, and the best time of each stage is kept.
+    :return: list of records, one per load
+    """
+    records = []
+    for iLoad in range(0, loads):
+        payload = makePayload(rng, nPlants, nTiers, pmin_tightness, wind_share)
+        runs = [timeStages(payload, engine, deadline_ms) for iRun in range(0, repeat)]
+        record = {
+            "plants": nPlants,
+            "requested_tiers": nTiers,
+            "pmin_tightness": pmin_tightness,
+            "wind_share": wind_share,
+            "load": payload["load"],
+            "engine": engine,
+        }
+        record.update(runs[0])
+        for stage in ["parse", "fleet", "golden_path", "solve", "total"]:
+            record[stage] = min(run[stage] for run in runs)
+        record["optimal"] = all(run["optimal"] for run in runs)
+        records.append(record)
+    return records
+
+
+def summarise(records):
+    """
+    Summarises the records by fleet size: latency percentiles and throughput.
+    Only the solved cases are timed: a case without solution (e.g. an unreachable load) can stop early,
+    so the cases without solution are only counted, in their own column.
+    :param records: list of records (see runCase)
+    :return: list of summaries, one per fleet size
+    """
+    summaries = []
+    for nPlants in sorted(set(record["plants"] for record in records)):
+        size_records = [record for record in records if record["plants"] == nPlants]
+        totals = sorted(record["total"] for record in size_records if record["solved"])
+        summaries.append({
+            "plants": nPlants,
+            "cases": len(size_records),
+            "unsolved": len(size_records) - len(totals),
+            "p50_ms": round(statistics.median(totals), 4) if totals else None,
+            "p95_ms": round(totals[min(len(totals) - 1, int(0.95 * len(totals)))], 4) if totals else None,
+            "max_ms": round(totals[-1], 4) if totals else None,
+            "throughput_per_s": round(len(totals) / (sum(totals) / 1000), 2) if sum(totals) > 0 else None,
+            "not_optimal": sum(1 for record in size_records if record["solved"] and not record["optimal"]),
+        })
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the optimisation on synthetic fleets.")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the fleet generator")
+    parser.add_argument("--quick", action="store_true", help="run a reduced grid of fleets")
+    parser.add_argument("--sizes", type=int, nargs="+", help="fleet sizes (number of plants)")
+    parser.add_argument("--loads", type=int, default=3, help="number of fleets (and loads) drawn per case")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timing repetitions (the best one is kept)")
+    parser.add_argument("--engine", default="auto", choices=["auto", "bruteforce", "dp", "bnb"], help="search engine")
+    parser.add_argument("--deadline-ms", type=float, default=2000, help="time budget of each search, in milliseconds")
+    parser.add_argument("--subset-workers", type=int, default=0, help="worker processes searching the subsets of tiers of a solve (0 for serial)")
+    parser.add_argument("--json", help="file where the results are written as JSON")
+    args = parser.parse_args()
+
+    #the solver logs every request, which would be timed as well
+    logging.disable(logging.CRITICAL)
+    parallelsearch.configure(args.subset_workers)
+
+    sizes = args.sizes or (QUICK_FLEET_SIZES if args.quick else FLEET_SIZES)
+    tier_counts = QUICK_TIER_COUNTS if args.quick else TIER_COUNTS
+    tightnesses = QUICK_PMIN_TIGHTNESS if args.quick else PMIN_TIGHTNESS
+    wind_shares = QUICK_WIND_SHARES if args.quick else WIND_SHARES
+
+    rng = random.Random(args.seed)
+    records = []
+    print("%7s %6s %6s %5s %10s %10s %10s %10s %10s %8s" % (
+        "plants", "tiers", "pmin", "wind", "parse ms", "fleet ms", "golden ms", "solve ms", "total ms", "optimal"))
+    for nPlants in sizes:
+        for nTiers in tier_counts:
+            for pmin_tightness in tightnesses:
+                for wind_share in wind_shares:
+                    case_records = runCase(rng, nPlants, nTiers, pmin_tightness, wind_share,
+                                           args.loads, args.repeat, args.engine, args.deadline_ms)
+                    for record in case_records:
+                        print("%7s %6s %6s %5s %10.3f %10.3f %10.3f %10.3f %10.3f %8s" % (
+                            nPlants, record["tiers"], pmin_tightness, wind_share, record["parse"], record["fleet"],
+                            record["golden_path"], record["solve"], record["total"], record["optimal"]))
+                    records += case_records
+
+    summaries = summarise(records)
+    print()
+    print("%7s %6s %9s %10s %10s %10s %12s %12s" % ("plants", "cases", "unsolved", "p50 ms", "p95 ms", "max ms", "solves/s", "not optimal"))
+    for summary in summaries:
+        print("%7s %6s %9s %10s %10s %10s %12s %12s" % (
+            summary["plants"], summary["cases"], summary["unsolved"], summary["p50_ms"], summary["p95_ms"], summary["max_ms"],
+            summary["throughput_per_s"], summary["not_optimal"]))
+
+    if args.json:
+        results = {
+            "benchmark": "scaling",
+            "seed": args.seed,
+            "engine": args.engine,
+            "deadline_ms": args.deadline_ms,
+            "subset_workers": args.subset_workers,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": vectorisedsearch.isAvailable(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "records": records,
+            "summary": summaries,
+        }
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
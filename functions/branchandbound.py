@@ -0,0 +1,220 @@
+"""
+Exact branch-and-bound unit-commitment engine.
+The search branches on/off for each plant in merit order.
+Every node is bounded from below by a continuous relaxation (pmin of the undecided plants ignored),
+and from above by a greedy fill, which gives a feasible solution and updates the incumbent.
+Branches whose lower bound is not below the incumbent are pruned.
+The powers are in power units (0.1 MW) and the costs integers (see models.units), so the bounds are compared exactly.
+"""
+#internal packages
+from functions.timebudget import isExpired, BUDGET_CHECK_INTERVAL
+
+
+def getPlantData(ordered_plants, wind_pc, load_units):
+    """
+    Gets the data needed for the search, for the plants which can be switched on.
+    The plants are sorted by cost, then by pmin and pmax, so that identical plants are next to each other.
+    :param ordered_plants: list of PowerPlant objects sorted by cost, with their cost already set
+    :param wind_pc: wind percentage
+    :param load_units: load in power units
+    :return: list of [ PowerPlant, cost per power unit, min power, max power ] (powers in power units)
+    """
+    plant_data = []
+    for plant in ordered_plants:
+        power_range = plant.getRange(wind_pc)
+        min_units = power_range["min"]
+        max_units = power_range["max"]
+        if max_units <= 0 or min_units > load_units:
+            continue
+        plant_data.append([plant, plant.cost, min_units, max_units])
+    plant_data = sorted(plant_data, key=lambda d: (d[1], d[2], d[3]))
+    return plant_data
+
+
+def isIdenticalToPrevious(plant_data, iPlant):
+    """
+    Checks if a plant has the same cost and range as the previous plant in the list.
+    :param plant_data: list of plant data (see getPlantData)
+    :param iPlant: index of the plant
+    :return: (boolean) whether the plants are identical
+    """
+    if iPlant == 0:
+        return False
+    return plant_data[iPlant][1:] == plant_data[iPlant-1][1:]
+
+
+def dispatchCommittedPlants(load_units, plant_data, decisions):
+    """
+    Function that finds the cheapest dispatch for a fixed set of committed plants.
+    All committed plants get their minimum power, then the remaining load is given in merit order.
+    :param load_units: load in power units
+    :param plant_data: list of plant data (see getPlantData)
+    :param decisions: list of booleans telling which plants are switched on
+    :return: [ whether dispatch is possible, cost, list of powers in power units ]
+    """
+    powers = [0] * len(plant_data)
+    remaining_units = load_units
+    cost = 0
+    for iPlant in range(0, len(decisions)):
+        if decisions[iPlant]:
+            powers[iPlant] = plant_data[iPlant][2]
+            remaining_units -= plant_data[iPlant][2]
+            cost += plant_data[iPlant][1] * plant_data[iPlant][2]
+    if remaining_units < 0:
+        return [False, 0, powers]
+    for iPlant in range(0, len(decisions)):
+        if remaining_units == 0:
+            break
+        if decisions[iPlant]:
+            extra_units = min(plant_data[iPlant][3] - plant_data[iPlant][2], remaining_units)
+            powers[iPlant] += extra_units
+            remaining_units -= extra_units
+            cost += plant_data[iPlant][1] * extra_units
+    if remaining_units > 0:
+        return [False, 0, powers]
+    return [True, cost, powers]
+
+
+def getLowerBound(load_units, plant_data, decisions):
+    """
+    Function that computes a lower bound of the cost for all solutions below a node of the search tree.
+    The committed plants get their minimum power.
+    The rest of the load is given in merit order, to the headroom of the committed plants and to the full range of the undecided plants.
+    :param load_units: load in power units
+    :param plant_data: list of plant data (see getPlantData)
+    :param decisions: list of booleans telling which plants are switched on, for the plants decided so far
+    :return: [ whether the node can be feasible, lower bound ]
+    """
+    nDecided = len(decisions)
+    remaining_units = load_units
+    bound = 0
+    for iPlant in range(0, nDecided):
+        if decisions[iPlant]:
+            remaining_units -= plant_data[iPlant][2]
+            bound += plant_data[iPlant][1] * plant_data[iPlant][2]
+    if remaining_units < 0:
+        return [False, 0]
+    for iPlant in range(0, len(plant_data)):
+        if remaining_units == 0:
+            break
+        if iPlant < nDecided:
+            if not decisions[iPlant]:
+                continue
+            capacity = plant_data[iPlant][3] - plant_data[iPlant][2]
+        else:
+            capacity = plant_data[iPlant][3]
+        extra_units = min(capacity, remaining_units)
+        remaining_units -= extra_units
+        bound += plant_data[iPlant][1] * extra_units
+    if remaining_units > 0:
+        return [False, 0]
+    return [True, bound]
+
+
+def getGreedyCompletion(load_units, plant_data, decisions):
+    """
+    Function that completes the decisions of a node greedily, to get a feasible solution (and an upper bound).
+    Undecided plants are switched on in merit order, as long as their minimum power still fits in the load.
+    :param load_units: load in power units
+    :param plant_data: list of plant data (see getPlantData)
+    :param decisions: list of booleans telling which plants are switched on, for the plants decided so far
+    :return: [ whether a solution is found, cost, list of powers in power units ]
+    """
+    completed = list(decisions)
+    min_sum = 0
+    for iPlant in range(0, len(decisions)):
+        if decisions[iPlant]:
+            min_sum += plant_data[iPlant][2]
+    for iPlant in range(len(decisions), len(plant_data)):
+        if min_sum + plant_data[iPlant][2] <= load_units:
+            completed.append(True)
+            min_sum += plant_data[iPlant][2]
+        else:
+            completed.append(False)
+    return dispatchCommittedPlants(load_units, plant_data, completed)
+
+
+def branchAndBoundSolution(load_units, ordered_plants, wind_pc, budget=None, upper_bound=None):
+    """
+    Function that searches for the cheapest dispatch by branch and bound.
+    The search tree is explored depth first, switching plants on before switching them off, in merit order.
+    At each node, the greedy completion may improve the incumbent, and the node is pruned if its lower bound is not below the incumbent.
+    Identical plants are only switched on in their order of appearance, so that symmetric branches are not explored twice.
+    When the time budget runs out, the search stops and the incumbent is used (budget.optimal is then False).
+    With an upper bound (e.g. the cost of a repaired previous dispatch, see warmstart), only solutions cheaper than it are searched for.
+    The correct power is assigned to the PowerPlant objects of the solution.
+    :param load_units: total load to be distributed, in power units
+    :param ordered_plants: list of PowerPlant objects sorted by cost, with their cost already set
+    :param wind_pc: wind percentage
+    :param budget: TimeBudget of the solve, None for no time limit
+    :param upper_bound: cost of a known solution, None if there is none
+    :return: [ whether solution (cheaper than the upper bound) is found, global cost (in units of 0.1 cent) ]
+    """
+    plant_data = getPlantData(ordered_plants, wind_pc, load_units)
+    nPlants = len(plant_data)
+
+    incumbent_cost = upper_bound
+    incumbent_powers = None
+    stack = [[]]
+    nNodes = 0
+    while stack:
+        if nNodes % BUDGET_CHECK_INTERVAL == 0 and isExpired(budget):
+            break
+        nNodes += 1
+        decisions = stack.pop()
+        lower_bound = getLowerBound(load_units, plant_data, decisions)
+        if not lower_bound[0]:
+            continue
+        if incumbent_cost is not None and lower_bound[1] >= incumbent_cost:
+            continue
+
+        greedy = getGreedyCompletion(load_units, plant_data, decisions)
+        if greedy[0] and (incumbent_cost is None or greedy[1] < incumbent_cost):
+            incumbent_cost = greedy[1]
+            incumbent_powers = greedy[2]
+            if lower_bound[1] >= incumbent_cost:
+                continue
+
+        iPlant = len(decisions)
+        if iPlant == nPlants:
+            continue
+        #last pushed is explored first: 'off' goes below 'on'
+        stack.append(decisions + [False])
+        if not (isIdenticalToPrevious(plant_data, iPlant) and not decisions[iPlant-1]):
+            stack.append(decisions + [True])
+
+    for plant in ordered_plants:
+        plant.p = 0
+    if incumbent_powers is None:
+        return [False, 0]
+    for iPlant in range(0, nPlants):
+        if incumbent_powers[iPlant] > 0:
+            plant_data[iPlant][0].setPower(incumbent_powers[iPlant])
+
+    output = [True, incumbent_cost]
+    return output
+
+
+def greedySolution(load_units, ordered_plants, wind_pc, upper_bound=None):
+    """
+    Function that dispatches the load greedily, without search (see getGreedyCompletion).
+    This gives a solution when a search which has no incumbent before its end (e.g. the dynamic programme) runs out of time.
+    The correct power is assigned to the PowerPlant objects of the solution.
+    :param load_units: total load to be distributed, in power units
+    :param ordered_plants: list of PowerPlant objects sorted by cost, with their cost already set
+    :param wind_pc: wind percentage
+    :param upper_bound: cost of a known solution, None if there is none
+    :return: [ whether solution (cheaper than the upper bound) is found, global cost (in units of 0.1 cent) ]
+    """
+    plant_data = getPlantData(ordered_plants, wind_pc, load_units)
+    greedy = getGreedyCompletion(load_units, plant_data, [])
+    for plant in ordered_plants:
+        plant.p = 0
+    if not greedy[0] or (upper_bound is not None and greedy[1] >= upper_bound):
+        return [False, 0]
+    for iPlant in range(0, len(plant_data)):
+        if greedy[2][iPlant] > 0:
+            plant_data[iPlant][0].setPower(greedy[2][iPlant])
+
+    output = [True, greedy[1]]
+    return output
@@ -0,0 +1,159 @@
+"""
+Dynamic-programming dispatch engine working in power units (0.1 MW), see models.units.
+Plants are considered one by one in merit order (knapsack style), carrying for every reachable load the minimal cost.
+The costs are integers (in units of 0.1 cent), so they are compared exactly.
+The per-plant setpoints are then obtained by backtracking.
+The runtime grows with (number of plants) x (load resolution) instead of exponentially with the number of cost tiers.
+"""
+#external packages
+from array import array
+from collections import deque
+
+#internal packages
+from functions.timebudget import isExpired
+
+
+#above this number of entries (plants x loads), the table of chosen powers is too large to be kept by every worker (32 MB in 16-bit integers)
+MAX_TABLE_ENTRIES = 1 << 24
+
+
+def getGridRange(plant, wind_pc, load_units):
+    """
+    Gets the range of power a plant can supply when switched on, in power units, capped by the load.
+    :param plant: PowerPlant object
+    :param wind_pc: wind percentage
+    :param load_units: load in power units
+    :return: [ min power, max power ] in power units, or None if the plant can never be used
+    """
+    power_range = plant.getRange(wind_pc)
+    min_units = power_range["min"]
+    max_units = min(power_range["max"], load_units)
+    if max_units <= 0 or min_units > max_units:
+        return None
+    if min_units < 1:
+        min_units = 1
+    return [min_units, max_units]
+
+
+def addPlantToCosts(costs, unit_cost, min_units, max_units, fixed_cost=0):
+    """
+    Adds one plant to the table of minimal costs by reachable load.
+    For a load l, switching the plant on at power p costs costs[l-p] + unit_cost*p (+ fixed_cost).
+    Writing j = l-p, this is (costs[j] - unit_cost*j) + unit_cost*l, with j in [l-max_units, l-min_units].
+    The minimum over that sliding window is maintained with a monotonic deque, so the update is linear in the load.
+    Ties keep the cost without the plant, so that a plant is only switched on if it makes the load strictly cheaper.
+    :param costs: list of minimal costs by reachable load (in power units), None when the load is not reachable
+    :param unit_cost: cost per power unit of the plant
+    :param min_units: minimum power of the plant in power units
+    :param max_units: maximum power of the plant in power units
+    :param fixed_cost: cost of switching the plant on, e.g. 1 to count the plants used
+    :return: [ new list of minimal costs, array of chosen power (power units) by load ]
+    """
+    nLoads = len(costs)
+    new_costs = list(costs)
+    #the chosen power is at most max_units, kept in 16-bit integers when it fits
+    choices = array('H', bytes(2 * nLoads)) if max_units < (1 << 16) else array('i', bytes(4 * nLoads))
+    window = deque()
+    for iLoad in range(min_units, nLoads):
+        #the newest candidate entering the window is j = iLoad - min_units
+        jNew = iLoad - min_units
+        if costs[jNew] is not None:
+            value = costs[jNew] - unit_cost * jNew
+            while window and window[-1][1] >= value:
+                window.pop()
+            window.append((jNew, value))
+        #the oldest allowed candidate is j = iLoad - max_units
+        while window and window[0][0] < iLoad - max_units:
+            window.popleft()
+        if not window:
+            continue
+        candidate = window[0][1] + unit_cost * iLoad + fixed_cost
+        if new_costs[iLoad] is None or candidate < new_costs[iLoad]:
+            new_costs[iLoad] = candidate
+            choices[iLoad] = iLoad - window[0][0]
+    return [new_costs, choices]
+
+
+def isTableTooLarge(nPlants, load_units):
+    """
+    Checks if the table of chosen powers of the dynamic programme would be too large to be kept (see MAX_TABLE_ENTRIES).
+    :param nPlants: number of plants added to the table
+    :param load_units: load in power units
+    :return: (boolean) whether the table is too large
+    """
+    return nPlants * (load_units + 1) > MAX_TABLE_ENTRIES
+
+
+def addPlantsToCosts(costs, plants, wind_pc, load_units, budget=None):
+    """
+    Adds plants one by one to the table of minimal costs by reachable load (see addPlantToCosts).
+    :param costs: list of minimal costs by reachable load (in power units), None when the load is not reachable
+    :param plants: list of PowerPlant objects, with their cost already set
+    :param wind_pc: wind percentage
+    :param load_units: load in power units
+    :param budget: TimeBudget of the solve, None for no time limit
+    :return: [ new list of minimal costs, chosen power by load for each plant (None for a plant which can't be used) ],
+    or None if the time budget ran out
+    """
+    choices_byPlant = []
+    for plant in plants:
+        if isExpired(budget):
+            return None
+        grid_range = getGridRange(plant, wind_pc, load_units)
+        if grid_range is None:
+            choices_byPlant.append(None)
+            continue
+        costs, choices = addPlantToCosts(costs, plant.cost, grid_range[0], grid_range[1])
+        choices_byPlant.append(choices)
+    return [costs, choices_byPlant]
+
+
+def setPowersFromChoices(plants, choices_byPlant, load_units):
+    """
+    Backtracks the chosen powers from a given load, from the last plant added to the table to the first one,
+    and assigns the power to the PowerPlant objects (0 for the plants which are off).
+    :param plants: list of PowerPlant objects, in the order they were added (see addPlantsToCosts)
+    :param choices_byPlant: chosen power by load for each plant
+    :param load_units: load in power units
+    :return: load left for the plants added before these ones, in power units
+    """
+    remaining_units = load_units
+    for iPlant in range(len(plants) - 1, -1, -1):
+        plant = plants[iPlant]
+        plant.p = 0
+        if choices_byPlant[iPlant] is None:
+            continue
+        chosen_units = choices_byPlant[iPlant][remaining_units]
+        if chosen_units > 0:
+            plant.setPower(chosen_units)
+            remaining_units -= chosen_units
+    return remaining_units
+
+
+def dynamicProgrammingSolution(load_units, ordered_plants, wind_pc, budget=None):
+    """
+    Function that searches for the cheapest dispatch with a knapsack-style dynamic programme.
+    The plants are processed in merit order. After each plant, the table holds the minimal cost of every load reachable with the plants seen so far.
+    Each plant is either off, or on with a power between its pmin and pmax (exactly its wind power for a windturbine).
+    The chosen power of each plant is recorded, so that the setpoints can be recovered by backtracking from the requested load.
+    The correct power is assigned to the PowerPlant objects of the solution.
+    There is no solution before the last plant is processed: if the time budget runs out, no solution is returned (budget.optimal is then False).
+    :param load_units: total load to be distributed, in power units
+    :param ordered_plants: list of PowerPlant objects sorted by cost, with their cost already set
+    :param wind_pc: wind percentage
+    :param budget: TimeBudget of the solve, None for no time limit
+    :return: [ whether solution is found, global cost (in units of 0.1 cent) ]
+    """
+    costs = [None] * (load_units + 1)
+    costs[0] = 0
+
+    table = addPlantsToCosts(costs, ordered_plants, wind_pc, load_units, budget)
+    if table is None:
+        return [False, 0]
+    costs, choices_byPlant = table
+    if costs[load_units] is None:
+        return [False, 0]
+
+    setPowersFromChoices(ordered_plants, choices_byPlant, load_units)
+    output = [True, costs[load_units]]
+    return output
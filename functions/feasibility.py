@@ -0,0 +1,148 @@
+"""
+Reachability of a load by the subsets of cost tiers, kept in bitsets: bit w is set if w power units (0.1 MW) are reachable.
+A subset of tiers only holds a solution using all of its tiers if the load is the sum of one power of each tier,
+each tier supplying at least one power unit. Adding a tier to a bitset is a shift-or per interval of its power range.
+A bitset for every subset of the power set would cost more than merging the power ranges, since the sums of a few tiers
+are a few long intervals. Instead the tiers are split in two halves (meet in the middle): the cheaper half gets a bitset of
+the reachable loads for each subset of its tiers, and the other half a bitset of the loads from which the load is reachable
+(bit w set if load - w is reachable, as in windensemble.solveWithWindFreeTable).
+A subset is then checked with a single AND of the bitsets of its two halves.
+The bitsets only go up to the load, so they are made for each search, and only for the subsets of the halves met.
+"""
+#internal packages
+
+# external packages
+
+
+
+class SubsetReachability:
+    """
+    Bitsets of the loads reachable by the subsets of cost tiers, for one load, filled on demand.
+    The subsets of each half of the tiers are numbered by bitmask (bit i set if the i-th tier of the half belongs to the subset).
+    Intialise:  reachability = SubsetReachability(load, power_ranges_byCostTier)
+    """
+    __slots__ = ("mask", "nLow", "power_ranges_byCostTier", "bits_byLowSubSet", "bits_byHighSubSet")
+
+
+    def __init__(self, load, power_ranges_byCostTier):
+        """
+        Initialise SubsetReachability object
+        :param load: total load to be distributed, in power units
+        :param power_ranges_byCostTier: power ranges for all cost tiers
+        """
+        nTiers = len(power_ranges_byCostTier)
+        self.mask = (1 << (load + 1)) - 1
+        self.nLow = nTiers // 2
+        self.power_ranges_byCostTier = power_ranges_byCostTier
+        #without tiers, only a load of 0 is reachable
+        self.bits_byLowSubSet = [None] * (1 << self.nLow)
+        self.bits_byLowSubSet[0] = 1
+        #without tiers, the load is reachable only from itself
+        self.bits_byHighSubSet = [None] * (1 << (nTiers - self.nLow))
+        self.bits_byHighSubSet[0] = 1 << load
+
+    def getLowBits(self, iSubSet):
+        """
+        Gets the bitset of the loads reachable by a subset of the cheaper half of the tiers, using all of them.
+        It is made from the bitset of the subset without its first tier, which is made first if needed.
+        :param iSubSet: bitmask of the subset
+        :return: bitset (bit w set if w is reachable)
+        """
+        bits = self.bits_byLowSubSet[iSubSet]
+        if bits is None:
+            iTier = (iSubSet & -iSubSet).bit_length() - 1
+            bits = addRangeToBits(self.getLowBits(iSubSet & (iSubSet - 1)), self.power_ranges_byCostTier[iTier], self.mask)
+            self.bits_byLowSubSet[iSubSet] = bits
+        return bits
+
+    def getHighBits(self, iSubSet):
+        """
+        Gets the bitset of the loads from which the load is reachable by a subset of the other half of the tiers, using all of them.
+        It is made from the bitset of the subset without its first tier, which is made first if needed.
+        :param iSubSet: bitmask of the subset
+        :return: bitset (bit w set if load - w is reachable)
+        """
+        bits = self.bits_byHighSubSet[iSubSet]
+        if bits is None:
+            iTier = (iSubSet & -iSubSet).bit_length() - 1
+            bits = subtractRangeFromBits(self.getHighBits(iSubSet & (iSubSet - 1)), self.power_ranges_byCostTier[self.nLow + iTier], self.mask)
+            self.bits_byHighSubSet[iSubSet] = bits
+        return bits
+
+    def isReachable(self, subset):
+        """
+        Checks if the load is reachable by a subset of tiers, using all of them:
+        some load w is reachable by its cheaper tiers, and the rest of the load (load - w) by its other tiers.
+        :param subset: subset of tiers
+        :return: (boolean) whether the load is reachable
+        """
+        iLowSubSet = 0
+        iHighSubSet = 0
+        for iTier in subset:
+            if iTier < self.nLow:
+                iLowSubSet |= 1 << iTier
+            else:
+                iHighSubSet |= 1 << (iTier - self.nLow)
+        return (self.getLowBits(iLowSubSet) & self.getHighBits(iHighSubSet)) != 0
+
+
+
+def getTierIntervals(power_range, mask):
+    """
+    Gets the intervals of a power range which can be used by a tier, at least one power unit and at most the load.
+    :param power_range: power range of the tier (IntervalSet)
+    :param mask: bitset of all loads up to the load
+    :return: list of [ min, max ] intervals
+    """
+    load = mask.bit_length() - 1
+    intervals = []
+    for lmin, lmax in power_range:
+        lmin = max(lmin, 1)
+        lmax = min(lmax, load)
+        if lmin <= lmax:
+            intervals.append([lmin, lmax])
+    return intervals
+
+
+def addRangeToBits(bits, power_range, mask):
+    """
+    Adds the power range of a tier to a bitset of reachable loads: bit w + p is set for each bit w set and each power p of the range.
+    For each interval, the bitset is shifted by its minimum, then spread over its width by shift-ors doubling the width covered.
+    :param bits: bitset (bit w set if w is reachable)
+    :param power_range: power range of the tier (IntervalSet)
+    :param mask: bitset of all loads up to the load
+    :return: new bitset, up to the load
+    """
+    new_bits = 0
+    for lmin, lmax in getTierIntervals(power_range, mask):
+        spread = (bits << lmin) & mask
+        width = lmax - lmin + 1
+        covered = 1
+        while covered < width and spread:
+            step = min(covered, width - covered)
+            spread |= spread << step
+            covered += step
+        new_bits |= spread
+    return new_bits & mask
+
+
+def subtractRangeFromBits(bits, power_range, mask):
+    """
+    Subtracts the power range of a tier from a bitset of the loads from which the load is reachable:
+    bit w - p is set for each bit w set and each power p of the range (see addRangeToBits).
+    :param bits: bitset (bit w set if load - w is reachable)
+    :param power_range: power range of the tier (IntervalSet)
+    :param mask: bitset of all loads up to the load
+    :return: new bitset
+    """
+    new_bits = 0
+    for lmin, lmax in getTierIntervals(power_range, mask):
+        spread = bits >> lmin
+        width = lmax - lmin + 1
+        covered = 1
+        while covered < width and spread:
+            step = min(covered, width - covered)
+            spread |= spread >> step
+            covered += step
+        new_bits |= spread
+    return new_bits
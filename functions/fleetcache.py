@@ -0,0 +1,143 @@
+"""
+In-process cache of the prepared fleets (see optimisation.prepareFleet).
+The cost tiers and the power ranges only depend on the power plants, the fuel prices and the wind percentage, not on the load.
+A repeated fleet can then skip straight to the load-dependent search.
+"""
+#external packages
+from collections import OrderedDict
+import threading
+
+
+#default number of fleets kept in the cache
+DEFAULT_FLEET_CACHE_SIZE = 128
+
+
+def getFleetKey(parsed):
+    """
+    Gets the canonical key of a fleet: the power plants (in input order), the fuel prices and the wind percentage.
+    :param parsed: parsed data (see optimisation.parsePayload)
+    :return: (tuple) fleet key
+    """
+    plants_key = (
+        tuple(parsed["names"]),
+        tuple(parsed["types"]),
+        tuple(parsed["efficiencies"]),
+        tuple(parsed["pmins"]),
+        tuple(parsed["pmaxs"]),
+    )
+    return (plants_key, parsed["gas_price"], parsed["kerosine_price"], parsed["wind_pc"])
+
+
+def getMeritIndexKey(parsed):
+    """
+    Gets the key of the merit-order index of a fleet: the power plants (in input order) and the wind percentage, without the fuel prices.
+    :param parsed: parsed data (see optimisation.parsePayload)
+    :return: (tuple) merit-order index key
+    """
+    fleet_key = getFleetKey(parsed)
+    return (fleet_key[0], fleet_key[3])
+
+
+def getDispatchKey(parsed):
+    """
+    Gets the key of the last dispatch of a fleet: the power plants (in input order) only.
+    The dispatch of the previous quarter-hour is then found whatever the fuel prices and the wind percentage.
+    :param parsed: parsed data (see optimisation.parsePayload)
+    :return: (tuple) dispatch key
+    """
+    return getFleetKey(parsed)[0]
+
+
+
+class FleetCache:
+    """
+    Bounded cache of prepared fleets, with least-recently-used eviction and hit/miss counters.
+    Intialise:  cache = FleetCache(max_entries)
+    A max_entries of 0 disables the cache.
+    """
+
+
+    def __init__(self, max_entries=DEFAULT_FLEET_CACHE_SIZE):
+        """
+        Initialise FleetCache object
+        :param max_entries: maximum number of fleets kept in the cache
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, make_fleet):
+        """
+        Gets the fleet for a given key, making it (and storing it) if it is not in the cache.
+        The fleet gets a lock which must be held while solving, since solving sets the power of its PowerPlant objects.
+        :param key: fleet key (see getFleetKey)
+        :param make_fleet: function without arguments returning the fleet dictionary
+        :return: fleet dictionary
+        """
+        with self.lock:
+            fleet = self.entries.get(key)
+            if fleet is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return fleet
+            self.misses += 1
+
+        fleet = make_fleet()
+        fleet["lock"] = threading.Lock()
+        if self.max_entries > 0:
+            with self.lock:
+                self.entries[key] = fleet
+                self.entries.move_to_end(key)
+                self.evict()
+        return fleet
+
+    def evict(self):
+        """
+        Removes the least recently used fleets until the cache is within its size.
+        """
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def resize(self, max_entries):
+        """
+        Changes the maximum number of fleets kept in the cache.
+        :param max_entries: maximum number of fleets
+        """
+        with self.lock:
+            self.max_entries = max_entries
+            self.evict()
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Gets the statistics of the cache.
+        :return: dictionary with the size, maximum size, hits, misses and hit rate
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups > 0 else 0,
+            }
+
+
+
+#caches shared by all requests of the process
+fleet_cache = FleetCache()
+#merit-order indexes (see meritorder.MeritOrderIndex), by fleet without the fuel prices
+merit_index_cache = FleetCache()
+#last dispatches (see warmstart.WarmStart), by power plants
+dispatch_cache = FleetCache()
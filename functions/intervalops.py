@@ -1,182 +1,179 @@
 """
 Custom library with functions useful for operations on intervals and sets.
 """
-
-
-def getPowerSet(llist):
-    """
-    Get the power set (set of all subsets) of a given set.
+#external packages
+from bisect import bisect_right
+import heapq
+
+
+
+class IntervalSet:
+    """
+    Immutable, sorted set of disjoint closed intervals of integers, e.g. a power range in power units (0.1 MW).
+    Intialise:  power_range = IntervalSet([[min1, max1], [min2, max2], ...])
+    The intervals given may overlap and be in any order, they are merged in a single sort-and-sweep pass.
+    Since only integers belong to the set, adjacent intervals ([a, b] and [b+1, c]) are merged as well,
+    which keeps fewer intervals (and fewer interval combinations to search) than with real bounds.
+    Membership is checked by bisection, the minimum and maximum are obtained in constant time.
+    """
+    __slots__ = ("_intervals", "_mins")
+
+
+    def __init__(self, intervals=()):
+        """
+        Initialise IntervalSet object
+        :param intervals: iterable of [min, max] intervals (lists, tuples or another IntervalSet)
+        """
+        if isinstance(intervals, IntervalSet):
+            self._intervals = intervals._intervals
+            self._mins = intervals._mins
+            return
+        self._setSorted(sorted([(interval[0], interval[1]) for interval in intervals]))
+
+    def _setSorted(self, sorted_intervals):
+        """
+        Sets the intervals of a new object from (min, max) tuples sorted by min, merging them in a single sweep.
+        :param sorted_intervals: iterable of (min, max) tuples sorted by min
+        """
+        merged = sweepSortedIntervals(sorted_intervals)
+        self._intervals = tuple(merged)
+        self._mins = tuple([interval[0] for interval in merged])
+
+    @classmethod
+    def fromSorted(cls, sorted_intervals):
+        """
+        Builds an IntervalSet from intervals already sorted by their minimum, skipping the sort.
+        :param sorted_intervals: iterable of (min, max) tuples sorted by min
+        :return: IntervalSet
+        """
+        interval_set = cls.__new__(cls)
+        interval_set._setSorted(sorted_intervals)
+        return interval_set
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self._intervals)
+
+    def __getitem__(self, index):
+        return self._intervals[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._intervals == other._intervals
+
+    def __hash__(self):
+        return hash(self._intervals)
+
+    def __contains__(self, number):
+        """
+        Checks if a given number belongs to one of the intervals, by bisection.
+        :param number: number to be checked
+        :return: (boolean) whether the number belongs to the set
+        """
+        index = bisect_right(self._mins, number) - 1
+        return index >= 0 and number <= self._intervals[index][1]
+
+    def __str__(self):
+        return str([list(interval) for interval in self._intervals])
+
+    def __repr__(self):
+        return "IntervalSet(%s)" % self
+
+    def min(self):
+        """
+        Gets minimum number belonging to the set (0 if the set is empty).
+        :return: minimum number
+        """
+        return self._intervals[0][0] if self._intervals else 0
+
+    def max(self):
+        """
+        Gets maximum number belonging to the set (0 if the set is empty).
+        :return: maximum number
+        """
+        return self._intervals[-1][1] if self._intervals else 0
+
+    def add(self, other):
+        """
+        Useful for when a new power plant or a new set of power plants is taken into consideration.
+        Returns the union of this set, the other set, and all sums of one interval from each set (Minkowski sum).
+        Each of these runs of intervals is already sorted, so they are merged lazily with a k-way merge (heapq.merge),
+        and coalesced as they come out of it: the n x m sums are never held in a list.
+        :param other: IntervalSet (or iterable of intervals) to be added
+        :return: new IntervalSet
+        """
+        if not isinstance(other, IntervalSet):
+            other = IntervalSet(other)
+        if not self._intervals:
+            return other
+        if not other._intervals:
+            return self
+        runs = [self._intervals, other._intervals]
+        for new_min, new_max in other._intervals:
+            runs.append(shiftIntervals(self._intervals, new_min, new_max))
+        return IntervalSet.fromSorted(heapq.merge(*runs))
+
+    def reducedBy(self, number):
+        """
+        Reduces by a given number the minimum and maximum boundaries of all intervals.
+        If the minimum and maximum would be set below zero, set them to zero instead.
+        :param number: number used to reduce the intervals
+        :return: new IntervalSet
+        """
+        return IntervalSet.fromSorted([(max(lmin - number, 0), max(lmax - number, 0)) for lmin, lmax in self._intervals])
+
+
+
+def sweepSortedIntervals(sorted_intervals):
+    """
+    Merges all overlapping or adjacent intervals of integers in intervals sorted by their minimum, in a single pass.
+    :param sorted_intervals: iterable of (min, max) tuples sorted by min
+    :return: list of disjoint (min, max) tuples
+    """
+    merged = []
+    for interval in sorted_intervals:
+        if merged and interval[0] <= merged[-1][1] + 1:
+            if interval[1] > merged[-1][1]:
+                merged[-1] = (merged[-1][0], interval[1])
+        else:
+            merged.append(interval)
+    return merged
+
+
+def shiftIntervals(intervals, shift_min, shift_max):
+    """
+    Generates the sums of intervals with one interval, in the order of the intervals (see IntervalSet.add).
+    The sums are made one at a time, when the merge asks for them.
+    :param intervals: sorted (min, max) tuples
+    :param shift_min: minimum of the interval added
+    :param shift_max: maximum of the interval added
+    :return: generator of (min, max) tuples
+    """
+    for lmin, lmax in intervals:
+        yield (lmin + shift_min, lmax + shift_max)
+
+
+
+def iteratePowerSet(llist, iFirst=1, iLast=None):
+    """
+    Generates the subsets of a given set one by one (the empty set excluded), from their bitmask:
+    subset number iPower is made of the elements whose bit is set in iPower.
+    The power set is never held in memory, so that a search over it can stop early (e.g. at the end of its time budget).
     :param llist: input list (set)
-    :return: power set
+    :param iFirst: number of the first subset
+    :param iLast: number of the subset after the last one, 2^len(llist) by default
+    :return: generator of subsets
     """
-    power_set_size = pow(2, len(llist))
-    
-    power_set=[]
-    for iPower in range(1, power_set_size):
+    if iLast is None:
+        iLast = 1 << len(llist)
+    for iPower in range(max(iFirst, 1), iLast):
         subset = []
-        for iSet in range(0, len(llist)):
-            if (iPower & (1 << iSet)) > 0:
-                subset.append(llist[iSet])
-        if subset != []: power_set.append(subset)
-    return power_set
-
-
-
-def mergeIntervals(interval1, interval2):
-    """
-    Function that checks if two intervals overlap and if they do, merges them.
-    Two intervals [a, b] and [c, d] overlap if e.g. a <= c <= b <= d.
-    In that case, the function will return [ True, [a, d] ]
-    :param interval1: first interval
-    :param interval2: second interval
-    :return: [ merge_successful, new_interval ]
-    """
-    interval_out = []
-    merge_successful = False
-    lmin = 0
-    rmin = 0
-    lmax = 0
-    rmax = 0
-    if interval1[0] <= interval2[0]:
-        lmin = interval1[0]
-        rmin = interval1[1]
-        lmax = interval2[0]
-        rmax = interval2[1]
-    else:
-        lmin = interval2[0]
-        rmin = interval2[1]
-        lmax = interval1[0]
-        rmax = interval1[1]
-
-    if lmin <= lmax <= rmin <= rmax:
-        interval_out = [lmin, rmax]
-        merge_successful = True
-    elif lmin <= lmax <= rmax <= rmin:
-        interval_out = [lmin, rmin]
-        merge_successful = True
-    else:
-        merge_successful = False
-
-    output = [merge_successful, interval_out]
-    return output
-
-
-def mergeIntervalsInList(list_of_intervals):
-    """
-    Merges all intervals that can be merged in a list of intervals, and returns a cleaned up list of intervals.
-    :param list_of_intervals: original list of intervals
-    :return: new list of intervals
-    """
-    list_cleaned = []
-    list_copy=list_of_intervals.copy()
-    iInd1 = 0
-    while iInd1 < len(list_copy):
-        interval1 = list_copy[iInd1]
-            
-        iInd2 = iInd1 + 1
-        bMerge = False
-        while iInd2 < len(list_copy):
-            interval2 = list_copy[iInd2]
-            merging = mergeIntervals(interval1, interval2)
-
-            if merging[0]:
-                list_copy[iInd1] = merging[1]
-                list_copy.pop(iInd2)
-                bMerge = True
-                break
-            else:
-                iInd2 += 1
-
-        if not bMerge or iInd1 == len(list_copy)-1:
-            list_cleaned.append(list_copy[iInd1])
-            iInd1 += 1
-    list_cleaned = sorted(list_cleaned, key=lambda r: r[0])
-    return list_cleaned
-
-
-def belongsToInterval(number, list_of_intervals):
-    """
-    Checks if a given number belongs to one of the intervals in a list of intervals.
-    :param number: number to be checked
-    :param list_of_intervals: list of intervals
-    :return: (boolean) whether the condition is True
-    """
-    belongs = False
-    for interval in list_of_intervals:
-        if interval[0] <= number <= interval[1]:
-            belongs = True
-            break
-    return belongs
-
-
-
-def addToPowerRange(old_power_range, new_element):
-    """
-    Useful for when a new power plant or a new set of power plants is taken into consideration.
-    Will return a new global power range, with which e.g. we can check the compatibility of a given load.
-    In more technical detail:
-    Updates an old power range (list of intervals) when a new power range (list of intervals) is taken into consideration.
-    The function first copies the old power range, then appends the new power range.
-    Then it also appends all possible interval sums between one interval in the old range and one in the new range.
-    Finally, it merges all intervals that can be merged.
-    :param old_power_range: old power range
-    :param new_element: new element to be added to the power range
-    :return: increased power range
-    """
-    new_power_range = old_power_range.copy()
-    for new_sub_range in new_element:
-        new_power_range.append(new_sub_range)
-        for old_sub_range in old_power_range:
-            sum_min = old_sub_range[0] + new_sub_range[0]
-            sum_max = old_sub_range[1] + new_sub_range[1]
-            new_power_range.append([sum_min, sum_max])
-    cleaned_power_range = mergeIntervalsInList(new_power_range)
-    return cleaned_power_range
-
-
-
-def getMaxPower(power_range):
-    """
-    Gets maximum number belonging to an ordered list of intervals.
-    (Gets maximum power in a power range.)
-    :param power_range: ordered list of intervals
-    :return: maximum number
-    """
-    max_power = 0
-    if len(power_range) > 0:
-        last_element = power_range[-1]
-        max_power = last_element[1]
-    return max_power
-
-
-def getMinPower(power_range):
-    """
-    Gets minimum number belonging to an ordered list of intervals.
-    (Gets minimum power in a power range.)
-    :param power_range: ordered list of intervals
-    :return: minimum number
-    """
-    min_power = 0
-    if len(power_range) > 0:
-        first_element = power_range[0]
-        min_power = first_element[0]
-    return min_power
-
-
-def reduceRangeBy(power_range, number):
-    """
-    Reduces by a given number the minimum and maximum boundaries of all intervals in a list of intervals.
-    If the minimum and maximum would be set below zero, set them to zero instead.
-    :param power_range: list of intervals
-    :param number: number used to reduce the intervals
-    :return: new list of intervals
-    """
-    subtracted_range = []
-    for tmp_ran in power_range:
-        sub_min = tmp_ran[0] - number
-        if sub_min < 0: sub_min = 0
-        sub_max = tmp_ran[1] - number
-        if sub_max < 0: sub_max = 0
-        
-        subtracted_range.append([sub_min, sub_max])
-    return subtracted_range
+        bits = iPower
+        while bits:
+            lowest_bit = bits & -bits
+            subset.append(llist[lowest_bit.bit_length() - 1])
+            bits ^= lowest_bit
+        yield subset
@@ -0,0 +1,172 @@
+"""
+Queued logging: the request threads only put the log records on a queue, and a background thread writes them to a rotating file.
+The messages are formatted by the background thread as well, and the verbose dumps of the solver
+(power ranges, solution by tier) are logged at the VERBOSE level, of which only one record in N is kept.
+The file is opened in append mode and rotated by size. Worker processes forked from a configured process get their own writer thread;
+with several independent processes (e.g. gunicorn workers), '{pid}' in the file name gives each process its own file.
+"""
+#external packages
+import atexit
+import itertools
+import logging
+import logging.handlers
+import multiprocessing.util
+import os
+import queue
+
+
+#level of the verbose solver dumps, between DEBUG and INFO
+VERBOSE = 15
+logging.addLevelName(VERBOSE, "VERBOSE")
+
+DEFAULT_LOG_FILE = "error_and_info.log"
+#size (in bytes) at which the file is rotated, and number of rotated files kept
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+#one verbose record in this number is kept (0 drops them all, 1 keeps them all)
+DEFAULT_VERBOSE_SAMPLING = 100
+LOG_FORMAT = "%(levelname)s: %(message)s"
+
+#current configuration of this process: None until setupLogging is called
+log_setup = None
+
+
+
+class VerboseSampler(logging.Filter):
+    """
+    Filter keeping one VERBOSE record in every 'sampling' records, and all records of the other levels.
+    Each kind of verbose record (i.e. each message before formatting) is counted separately,
+    so that the dumps of a same request are kept or dropped together.
+    Intialise:  sampler = VerboseSampler(sampling)
+    """
+
+
+    def __init__(self, sampling):
+        """
+        Initialise VerboseSampler object
+        :param sampling: one verbose record in this number is kept (0 drops them all)
+        """
+        super().__init__()
+        self.sampling = sampling
+        self.counters = {}
+
+    def filter(self, record):
+        if record.levelno != VERBOSE:
+            return True
+        if self.sampling <= 0:
+            return False
+        counter = self.counters.get(record.msg)
+        if counter is None:
+            counter = self.counters.setdefault(record.msg, itertools.count())
+        return next(counter) % self.sampling == 0
+
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler which leaves the formatting of the message to the writer thread.
+    The standard QueueHandler formats the message in the calling thread (so that the record can be pickled),
+    which is not needed with a queue between threads of the same process.
+    The arguments of a log call must then not be modified after the call, which holds for the solver (power ranges are immutable).
+    """
+
+    def prepare(self, record):
+        return record
+
+
+
+def makeFileHandler(setup):
+    """
+    Makes the handler writing the log file, in append mode, rotated by size.
+    :param setup: logging configuration (see setupLogging)
+    :return: file handler
+    """
+    log_file = setup["log_file"].format(pid=os.getpid())
+    log_dir = os.path.dirname(log_file)
+    if log_dir != "" and not os.path.isdir(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
+    if setup["rotate"]:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, mode="a", maxBytes=setup["max_bytes"], backupCount=setup["backup_count"], delay=True)
+    else:
+        #reopens the file when another process has rotated it
+        file_handler = logging.handlers.WatchedFileHandler(log_file, mode="a", delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return file_handler
+
+
+def startWriter(setup):
+    """
+    Starts the writer thread of this process, and routes the records of the root logger to its queue.
+    :param setup: logging configuration (see setupLogging)
+    """
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+
+    record_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(record_queue)
+    queue_handler.addFilter(VerboseSampler(setup["verbose_sampling"]))
+    file_handler = makeFileHandler(setup)
+    listener = logging.handlers.QueueListener(record_queue, file_handler)
+    listener.start()
+
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(VERBOSE if setup["verbose_sampling"] > 0 else logging.INFO)
+    setup["listener"] = listener
+    setup["file_handler"] = file_handler
+    setup["pid"] = os.getpid()
+
+
+def restartWriterInChild():
+    """
+    Called in a forked child process: the writer thread of the parent is not running in the child, so the child starts its own.
+    Unless the file name contains '{pid}', the child appends to the same file as the parent, and leaves the rotation to the parent.
+    """
+    global log_setup
+    if log_setup is None or log_setup["pid"] == os.getpid():
+        return
+    log_setup = dict(log_setup)
+    if "{pid}" not in log_setup["log_file"]:
+        log_setup["rotate"] = False
+    startWriter(log_setup)
+    #worker processes of a pool exit without running the atexit functions
+    multiprocessing.util.Finalize(None, stopLogging, exitpriority=10)
+
+
+def stopLogging():
+    """
+    Stops the writer thread of this process, after it has written all records in the queue.
+    """
+    if log_setup is not None and log_setup["pid"] == os.getpid() and log_setup["listener"] is not None:
+        log_setup["listener"].stop()
+        log_setup["listener"] = None
+        log_setup["file_handler"].close()
+
+
+def setupLogging(log_file=DEFAULT_LOG_FILE, max_bytes=DEFAULT_LOG_MAX_BYTES, backup_count=DEFAULT_LOG_BACKUP_COUNT,
+                 verbose_sampling=DEFAULT_VERBOSE_SAMPLING):
+    """
+    Sets up queued logging for the root logger of this process. Calling it again replaces the previous configuration.
+    :param log_file: log file name, '{pid}' is replaced by the process id
+    :param max_bytes: size (in bytes) at which the file is rotated, 0 to never rotate
+    :param backup_count: number of rotated files kept
+    :param verbose_sampling: one verbose record in this number is kept (0 drops them all, 1 keeps them all)
+    """
+    global log_setup
+    stopLogging()
+    log_setup = {
+        "log_file": log_file,
+        "max_bytes": max_bytes,
+        "backup_count": backup_count,
+        "verbose_sampling": verbose_sampling,
+        "rotate": max_bytes > 0,
+        "listener": None,
+        "file_handler": None,
+        "pid": None,
+    }
+    startWriter(log_setup)
+
+
+os.register_at_fork(after_in_child=restartWriterInChild)
+atexit.register(stopLogging)
@@ -0,0 +1,162 @@
+"""
+Merit-order index of a fleet, for re-solving quickly when only the fuel prices change.
+The plants of each fuel keep their relative order whatever the price (the most efficient ones are the cheapest),
+so the fleet is kept as one sorted list per fuel, and the merit order for new prices is a merge of these lists.
+Only the costs of the fuels whose price changed are recomputed.
+The power ranges of the cost tiers (by set of plants) and of the first tiers of the merit order are kept,
+so that the tiers which don't change with the prices are not recomputed (see optimisation.prepareFleet).
+"""
+#internal packages
+from models.fleet import Fleet, WINDTURBINE, GASFIRED, TURBOJET
+from models.units import toCostUnits
+
+#external packages
+from array import array
+import heapq
+
+
+#above this number of tier power ranges kept, the oldest ones are forgotten
+MAX_TIER_RANGES = 4096
+
+
+
+class MeritOrderIndex:
+    """
+    Fuel-sorted lists of the plants of a fleet, with the power ranges already computed for it.
+    The index belongs to one set of plants and one wind percentage, and must only be used by one thread at a time.
+    Intialise:  merit_index = MeritOrderIndex(parsed)
+    """
+
+
+    def __init__(self, parsed):
+        """
+        Initialise MeritOrderIndex object
+        :param parsed: parsed data (see optimisation.parsePayload), the fuel prices are not used
+        """
+        self.fleet = Fleet(parsed["names"], parsed["types"], parsed["efficiencies"], parsed["pmins"], parsed["pmaxs"])
+        nPlants = len(self.fleet)
+        #plants which cost nothing whatever the prices: wind turbines, and plants without efficiency
+        self.free_plants = []
+        self.plants_byFuel = {GASFIRED: [], TURBOJET: []}
+        for iPlant in range(0, nPlants):
+            code = self.fleet.types[iPlant]
+            if code == WINDTURBINE or self.fleet.efficiency[iPlant] <= 0:
+                self.free_plants.append(iPlant)
+            else:
+                self.plants_byFuel[code].append(iPlant)
+        for code in self.plants_byFuel:
+            self.plants_byFuel[code].sort(key=lambda iPlant: (-self.fleet.efficiency[iPlant], iPlant))
+
+        self.costs = array('q', bytes(8 * nPlants))
+        self.prices = {GASFIRED: None, TURBOJET: None}
+        #power range by set of plants of a tier (tuple of plant indices)
+        self.ranges_byTier = {}
+        #tiers of the last merit order, and power ranges of its first tiers
+        self.last_tiers = []
+        self.last_prefix_ranges = []
+
+    def updateCosts(self, gas_price, kerosine_price):
+        """
+        Sets the cost per MWh of the plants of the fuels whose price changed, in cost units (as in Fleet.setCosts).
+        :param gas_price: gas price
+        :param kerosine_price: kerosine price
+        """
+        for code, price in [(GASFIRED, gas_price), (TURBOJET, kerosine_price)]:
+            if self.prices[code] == price:
+                continue
+            for iPlant in self.plants_byFuel[code]:
+                self.costs[iPlant] = toCostUnits(price / self.fleet.efficiency[iPlant])
+            self.prices[code] = price
+
+    def getSortedFuelList(self, code):
+        """
+        Gets the plants of a fuel sorted by (cost, index).
+        The plants are already sorted by cost, but two plants of different efficiency may get the same cost once rounded:
+        these short runs are put back in input order.
+        :param code: fuel type code
+        :return: list of plant indices
+        """
+        plants = self.plants_byFuel[code]
+        costs = self.costs
+        sorted_plants = []
+        iStart = 0
+        while iStart < len(plants):
+            iStop = iStart + 1
+            while iStop < len(plants) and costs[plants[iStop]] == costs[plants[iStart]]:
+                iStop += 1
+            if iStop - iStart > 1:
+                sorted_plants += sorted(plants[iStart:iStop])
+            else:
+                sorted_plants.append(plants[iStart])
+            iStart = iStop
+        return sorted_plants
+
+    def getOrder(self, gas_price, kerosine_price):
+        """
+        Gets the merit order for given fuel prices, as plant indices sorted by (cost, index). The costs are updated as well.
+        :param gas_price: gas price
+        :param kerosine_price: kerosine price
+        :return: list of plant indices
+        """
+        self.updateCosts(gas_price, kerosine_price)
+        costs = self.costs
+        fuel_lists = [self.free_plants, self.getSortedFuelList(GASFIRED), self.getSortedFuelList(TURBOJET)]
+        return list(heapq.merge(*fuel_lists, key=lambda iPlant: (costs[iPlant], iPlant)))
+
+    def orderPlants(self, gas_price, kerosine_price):
+        """
+        Gets the plants in merit order for given fuel prices, same as Fleet.setCosts then Fleet.meritOrder.
+        The plants are those of a new Fleet (sharing the columns which don't change), so that they can be solved independently.
+        :param gas_price: gas price
+        :param kerosine_price: kerosine price
+        :return: list of PlantView objects sorted by cost
+        """
+        order = self.getOrder(gas_price, kerosine_price)
+        fleet = self.fleet.copy()
+        fleet.cost = array('q', self.costs)
+        return [fleet.views[iPlant] for iPlant in order]
+
+    def getTierKeys(self, gas_price, kerosine_price):
+        """
+        Gets the cost tiers of the merit order for given fuel prices (grouped as in optimisation.makeListOfCostTiers),
+        without making the plants. The costs are updated as well.
+        :param gas_price: gas price
+        :param kerosine_price: kerosine price
+        :return: (tuple) tier keys (see getTierKey), in merit order
+        """
+        order = self.getOrder(gas_price, kerosine_price)
+        costs = self.costs
+        tier_keys = []
+        iStart = 0
+        for iOrder in range(1, len(order) + 1):
+            if iOrder == len(order) or costs[order[iOrder]] != costs[order[iStart]]:
+                tier_keys.append(tuple(order[iStart:iOrder]))
+                iStart = iOrder
+        return tuple(tier_keys)
+
+    def getTierKey(self, tier):
+        """
+        Gets the key of a cost tier: the indices of its plants.
+        :param tier: list of PlantView objects
+        :return: (tuple) tier key
+        """
+        return tuple([plant.index for plant in tier])
+
+    def getCommonPrefix(self, tier_keys):
+        """
+        Gets the number of first tiers which are the same as in the last merit order.
+        :param tier_keys: keys of the tiers of the new merit order
+        :return: number of tiers
+        """
+        nCommon = 0
+        nMax = min(len(tier_keys), len(self.last_tiers))
+        while nCommon < nMax and tier_keys[nCommon] == self.last_tiers[nCommon]:
+            nCommon += 1
+        return nCommon
+
+    def forgetRanges(self):
+        """
+        Empties the tier power ranges when there are too many of them.
+        """
+        if len(self.ranges_byTier) > MAX_TIER_RANGES:
+            self.ranges_byTier = {}
@@ -0,0 +1,212 @@
+"""
+In-process metrics of the solver: counters and latency histograms, rendered in the Prometheus text format.
+The stages of optimise (validation, power ranges, golden path, search, distribution) are timed,
+and the whole solve of a load is timed by solve path (golden path, search engine, or no solution).
+Each process has its own metrics: with several workers, each worker is scraped separately.
+"""
+#external packages
+from bisect import bisect_left
+import threading
+
+
+#upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def formatValue(value):
+    """
+    Formats a number for the Prometheus text format.
+    :param value: number
+    :return: (str) formatted number
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def formatLabels(labels):
+    """
+    Formats labels for the Prometheus text format.
+    :param labels: list of (name, value) pairs
+    :return: (str) formatted labels, empty if there are none
+    """
+    if len(labels) == 0:
+        return ""
+    escaped = ['%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in labels]
+    return "{" + ",".join(escaped) + "}"
+
+
+
+class Counter:
+    """
+    Monotonic counter, optionally with one label.
+    Intialise:  counter = Counter(name, help_text, label_name)
+    """
+
+
+    def __init__(self, name, help_text, label_name=None):
+        """
+        Initialise Counter object
+        :param name: metric name
+        :param help_text: description of the metric
+        :param label_name: name of the label, None for a counter without label
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, label_value=None):
+        """
+        Increases the counter.
+        :param amount: increase, must be positive
+        :param label_value: value of the label, None for a counter without label
+        """
+        with self.lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def value(self, label_value=None):
+        return self.values.get(label_value, 0)
+
+    def render(self):
+        """
+        Renders the counter in the Prometheus text format.
+        :return: list of lines
+        """
+        lines = ["# HELP %s %s" % (self.name, self.help_text), "# TYPE %s counter" % self.name]
+        with self.lock:
+            values = sorted(self.values.items(), key=lambda item: str(item[0]))
+        if len(values) == 0 and self.label_name is None:
+            values = [(None, 0)]
+        for label_value, value in values:
+            labels = [] if self.label_name is None else [(self.label_name, label_value)]
+            lines.append("%s%s %s" % (self.name, formatLabels(labels), formatValue(value)))
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+
+
+class Histogram:
+    """
+    Histogram of durations (in seconds), with cumulative buckets, optionally with one label.
+    Intialise:  histogram = Histogram(name, help_text, label_name, buckets)
+    """
+
+
+    def __init__(self, name, help_text, label_name=None, buckets=LATENCY_BUCKETS):
+        """
+        Initialise Histogram object
+        :param name: metric name
+        :param help_text: description of the metric
+        :param label_name: name of the label, None for a histogram without label
+        :param buckets: sorted upper bounds of the buckets
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.buckets = tuple(buckets)
+        #by label value: [ count by bucket (the last one is +Inf), sum ]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, seconds, label_value=None):
+        """
+        Records one observation. Only the bucket of the observation is increased, the buckets are made cumulative when rendered.
+        :param seconds: observed duration
+        :param label_value: value of the label, None for a histogram without label
+        """
+        iBucket = bisect_left(self.buckets, seconds)
+        with self.lock:
+            value = self.values.get(label_value)
+            if value is None:
+                value = [[0] * (len(self.buckets) + 1), 0]
+                self.values[label_value] = value
+            value[0][iBucket] += 1
+            value[1] += seconds
+
+    def count(self, label_value=None):
+        value = self.values.get(label_value)
+        return 0 if value is None else sum(value[0])
+
+    def render(self):
+        """
+        Renders the histogram in the Prometheus text format.
+        :return: list of lines
+        """
+        lines = ["# HELP %s %s" % (self.name, self.help_text), "# TYPE %s histogram" % self.name]
+        with self.lock:
+            values = [(label_value, list(value[0]), value[1]) for label_value, value in self.values.items()]
+        for label_value, bucket_counts, total in sorted(values, key=lambda item: str(item[0])):
+            labels = [] if self.label_name is None else [(self.label_name, label_value)]
+            cumulative = 0
+            for iBucket in range(0, len(bucket_counts)):
+                cumulative += bucket_counts[iBucket]
+                upper_bound = self.buckets[iBucket] if iBucket < len(self.buckets) else float("inf")
+                lines.append("%s_bucket%s %s" % (self.name, formatLabels(labels + [("le", formatValue(upper_bound))]), cumulative))
+            lines.append("%s_sum%s %s" % (self.name, formatLabels(labels), formatValue(total)))
+            lines.append("%s_count%s %s" % (self.name, formatLabels(labels), cumulative))
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+
+
+stage_duration = Histogram(
+    "productionplan_stage_duration_seconds",
+    "Time spent in each stage of the optimisation.",
+    "stage",
+)
+solve_duration = Histogram(
+    "productionplan_solve_duration_seconds",
+    "Time spent distributing a load, by solve path.",
+    "path",
+)
+golden_path_hits = Counter(
+    "productionplan_golden_path_hits_total",
+    "Number of loads distributed by the golden path, without search.",
+)
+warm_start_hits = Counter(
+    "productionplan_warm_start_hits_total",
+    "Number of loads distributed by repairing the previous dispatch, proven optimal without search.",
+)
+subsets_explored = Counter(
+    "productionplan_subsets_explored_total",
+    "Number of subsets of cost tiers explored by the brute force search.",
+)
+combinations_evaluated = Counter(
+    "productionplan_combinations_evaluated_total",
+    "Number of interval combinations evaluated by the brute force search.",
+)
+fleet_preparations = Counter(
+    "productionplan_fleet_preparations_total",
+    "Number of fleets prepared (cost tiers and power ranges), i.e. fleet cache misses.",
+)
+
+all_metrics = [stage_duration, solve_duration, golden_path_hits, warm_start_hits, subsets_explored, combinations_evaluated, fleet_preparations]
+
+
+def render():
+    """
+    Renders all metrics in the Prometheus text format.
+    :return: (str) metrics
+    """
+    lines = []
+    for metric in all_metrics:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def clear():
+    """
+    Resets all metrics.
+    """
+    for metric in all_metrics:
+        metric.clear()
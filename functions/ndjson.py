@@ -0,0 +1,122 @@
+"""
+Newline-delimited JSON (NDJSON, or JSON lines): one payload per line in, one solution (or error) per line out.
+The lines are split from the chunks of a stream as they arrive, so that a stream of any length is solved with a bounded amount of memory:
+only the current line is buffered, and a line longer than the limit is answered with an error instead of being buffered.
+"""
+#internal packages
+from functions.optimisation import optimise
+from functions.warmstart import LAST_DISPATCH
+
+# external packages
+import json
+import logging
+
+
+#above this size (in bytes), a line is not buffered and gets an error
+MAX_LINE_BYTES = 1 << 20
+#size (in bytes) of the chunks read from a stream
+STREAM_CHUNK_BYTES = 1 << 16
+
+
+
+class LineSplitter:
+    """
+    Splits the chunks of a byte stream into lines, buffering at most one line of up to max_line_bytes.
+    A line which is too long is given as None, and the rest of it is skipped.
+    Blank lines are skipped.
+    Intialise:  splitter = LineSplitter(max_line_bytes)
+    """
+
+
+    def __init__(self, max_line_bytes=MAX_LINE_BYTES):
+        """
+        Initialise LineSplitter object
+        :param max_line_bytes: maximum size (in bytes) of a line
+        """
+        self.max_line_bytes = max_line_bytes
+        self.buffer = b""
+        self.skipping = False
+
+    def feed(self, chunk):
+        """
+        Takes the next chunk of the stream.
+        :param chunk: bytes
+        :return: list of the lines completed by the chunk (None for a line too long)
+        """
+        lines = []
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            if self.skipping:
+                self.skipping = False
+            else:
+                self.addLine(lines, self.buffer + chunk[start:end])
+            self.buffer = b""
+            start = end + 1
+        if not self.skipping:
+            self.buffer += chunk[start:]
+            if len(self.buffer) > self.max_line_bytes:
+                lines.append(None)
+                self.buffer = b""
+                self.skipping = True
+        return lines
+
+    def close(self):
+        """
+        Ends the stream: the last line doesn't need to end with a newline.
+        :return: list with the last line, if any
+        """
+        lines = []
+        if not self.skipping:
+            self.addLine(lines, self.buffer)
+        self.buffer = b""
+        self.skipping = False
+        return lines
+
+    def addLine(self, lines, line):
+        if len(line) > self.max_line_bytes:
+            lines.append(None)
+        elif line.strip():
+            lines.append(line)
+
+
+
+def solveLine(line, engine="auto", budget=None, last_dispatch=True):
+    """
+    Solves the payload of one line.
+    When the lines are solved in parallel, which line is solved first is arbitrary, and so would be the last dispatch:
+    'previous' can't be set to 'last' then.
+    :param line: JSON payload (bytes or str), None for a line which was too long
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget of the solve, None for no time limit
+    :param last_dispatch: whether 'previous' can be set to 'last' (False when the lines are solved in parallel)
+    :return: JSON solution or error
+    """
+    if line is None:
+        error_message = "Line longer than %s bytes. Each line must hold one JSON payload." % MAX_LINE_BYTES
+        logging.error(error_message)
+        return {'error': error_message}
+    try:
+        data = json.loads(line)
+    except ValueError:
+        data = None
+    if data == None:
+        error_message = "Unable to parse JSON. Check content of JSON file and/or the CURL command used."
+        logging.error(error_message)
+        return {'error': error_message}
+    if not last_dispatch and isinstance(data, dict) and data.get("previous") == LAST_DISPATCH:
+        error_message = "'previous' can't be '%s' for lines solved in parallel. Give the previous dispatch instead." % LAST_DISPATCH
+        logging.error(error_message)
+        return {"msg:": error_message}
+    return optimise(data, engine, budget)
+
+
+def formatLine(output):
+    """
+    Formats a solution (or error) as one line of NDJSON.
+    :param output: JSON-serialisable output
+    :return: (bytes) line, ending with a newline
+    """
+    return (json.dumps(output) + "\n").encode("utf-8")
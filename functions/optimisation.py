@@ -1,9 +1,31 @@
 #internal packages
-from models.powerplant import PowerPlant
+from models.fleet import Fleet
+from models.units import toPowerUnits, toMW, toEuros
 import functions.intervalops as intervalops
+from functions.intervalops import IntervalSet
+from functions.dynamicprogramming import dynamicProgrammingSolution, addPlantToCosts, isTableTooLarge
+from functions.branchandbound import branchAndBoundSolution, greedySolution
+from functions.fleetcache import fleet_cache, merit_index_cache, getFleetKey, getMeritIndexKey, getDispatchKey
+from functions.meritorder import MeritOrderIndex
+from functions.warmstart import LAST_DISPATCH, WarmStart, getWarmStart, rememberDispatch, setLastDispatch, repairDispatch, isLowerBound, applyDispatch
+from functions.feasibility import SubsetReachability
+import functions.vectorisedsearch as vectorisedsearch
+import functions.parallelsearch as parallelsearch
+from functions.timebudget import isExpired, BUDGET_CHECK_INTERVAL
+from functions.logqueue import VERBOSE
+import functions.metrics as metrics
 
 # external packages
 import logging
+import time
+
+
+#above this number of cost tiers, the power set search is too slow and branch and bound is used instead
+MAX_BRUTEFORCE_TIERS = 12
+#above this number of cost tiers, even an explicit brute force search goes to branch and bound (over a million subsets)
+MAX_FORCED_BRUTEFORCE_TIERS = 20
+#below this number of interval combinations, the NumPy overhead is not worth it and combinations are evaluated one by one
+VECTORISE_MIN_COMBINATIONS = 16
 
 
 def makeListOfCostTiers(ordered_plants):
@@ -36,18 +58,16 @@ def getPowerRanges(plants_byTier, wind_pc):
     Each cost tier may be composed of several plants, so the calculation of the allowed power range may not be trivial.
     :param plants_byTier: list of cost tiers
     :param wind_pc: wind percentage
-    :return: power ranges by cost tier
+    :return: power ranges by cost tier, in power units
     """
     power_ranges_byCostTier = []
     for iCostTier in range(0, len(plants_byTier)):
-        power_range_sums = []
+        power_range_sums = IntervalSet()
         for iPlant in range(0, len(plants_byTier[iCostTier])):
             power_range = plants_byTier[iCostTier][iPlant].getRange(wind_pc)
-            power_range_sample = [ [power_range["min"], power_range["max"]] ]
-            power_range_sums = intervalops.addToPowerRange(power_range_sums, power_range_sample)
-        power_range_cleaned = intervalops.mergeIntervalsInList(power_range_sums)
-        #power_range_cleaned = power_range_total
-        power_ranges_byCostTier.append(power_range_cleaned)
+            power_range_sample = IntervalSet([ [power_range["min"], power_range["max"]] ])
+            power_range_sums = power_range_sums.add(power_range_sample)
+        power_ranges_byCostTier.append(power_range_sums)
     return power_ranges_byCostTier
 
 
@@ -56,7 +76,7 @@ def initialiseSol(nTiers):
     """
     Function that intialises the solution by tier with the proper format.
     The solution by tier is not supposed to be the final solution with power supplied by individual plants.
-    Instead, it's the power supplied by each cost tier.
+    Instead, it's the power supplied by each cost tier (in power units), and its cost (in units of 0.1 cent, see models.units).
     :param nTiers: number of cost tiers
     :return: initialised solution by tier
     """
@@ -79,7 +99,7 @@ def tryGoldenPath(load, plants_byCostTier, power_ranges_byCostTier):
     Returns a boolean telling whether a solution was found, and if so, the solution (by tier).
     The 'obvious' solution is to set as much power as possible on the cheaper tiers and only then move on to more expensive tiers.
     This may not be possible due to minimum power constraints.
-    :param load: total load to be distributed 
+    :param load: total load to be distributed, in power units
     :param plants_byCostTier: list of plants by cost tier
     :param power_ranges_byCostTier: list of power ranges by cost tier
     :return: [ whether solution is found, solution by tier ]
@@ -91,19 +111,20 @@ def tryGoldenPath(load, plants_byCostTier, power_ranges_byCostTier):
     global_cost = 0
     for iTier in range(0, nTiers):
         tmp_range = power_ranges_byCostTier[iTier]
-        if intervalops.belongsToInterval(tmp_load, tmp_range):
+        if tmp_load in tmp_range:
             done = True
             cost = plants_byCostTier[iTier][0].cost * tmp_load
             global_cost += cost
-            solution["detailsbytier"][iTier]["load"] = round(tmp_load, 1)
-            solution["detailsbytier"][iTier]["cost"] = round(cost, 2)
-            solution["globalcost"] = round(global_cost, 2)
+            solution["detailsbytier"][iTier]["load"] = tmp_load
+            solution["detailsbytier"][iTier]["cost"] = cost
+            solution["globalcost"] = global_cost
             break
-        elif tmp_load > intervalops.getMaxPower(tmp_range):
-            tmp_load = tmp_load - intervalops.getMaxPower(tmp_range)
-            cost = plants_byCostTier[iTier][0].cost * intervalops.getMaxPower(tmp_range)
-            solution["detailsbytier"][iTier]["load"] = round(intervalops.getMaxPower(tmp_range), 1)
-            solution["detailsbytier"][iTier]["cost"] = round(cost, 2)
+        elif tmp_load > tmp_range.max():
+            tmp_load = tmp_load - tmp_range.max()
+            cost = plants_byCostTier[iTier][0].cost * tmp_range.max()
+            global_cost += cost
+            solution["detailsbytier"][iTier]["load"] = tmp_range.max()
+            solution["detailsbytier"][iTier]["cost"] = cost
         else:
             done = False
             break
@@ -119,30 +140,71 @@ def checkIfAllNeeded(load, subset, power_ranges_byCostTier):
     It does so by distributing the load by giving the minimum possible power to each tier belonging to the subset.
     The power ranges of each tier are updated accordingly.
     If the remaining load is positive and can still be distributed to the updated power range, then all tiers can be used.
-    :param load: total load to be distributed 
+    :param load: total load to be distributed, in power units
     :param subset: subset of tiers to be considered 
     :param power_ranges_byCostTier: power ranges for all cost tiers
     :return: (boolean) whether the tiers in the subset can all be used
     """
     all_needed = False
     tmp_load = load
-    range_after_subtraction = []
+    range_after_subtraction = IntervalSet()
     for iTier in subset:
-        min_power = intervalops.getMinPower(power_ranges_byCostTier[iTier])
-        if min_power < 0.1:
-            min_power = 0.1
+        #a tier is only used if it supplies at least one power unit
+        min_power = max(power_ranges_byCostTier[iTier].min(), 1)
         tmp_load = tmp_load - min_power
-        tmp_ran = intervalops.reduceRangeBy(power_ranges_byCostTier[iTier], min_power)
-        range_after_subtraction = intervalops.addToPowerRange(range_after_subtraction, tmp_ran)
+        tmp_ran = power_ranges_byCostTier[iTier].reducedBy(min_power)
+        range_after_subtraction = range_after_subtraction.add(tmp_ran)
         
         
-    if tmp_load >= 0 and intervalops.belongsToInterval(tmp_load, range_after_subtraction):
+    if tmp_load >= 0 and tmp_load in range_after_subtraction:
         all_needed = True
     return all_needed
 
 
 
-def bruteForceSolution(load, subset, plants_byCostTier, power_ranges_byCostTier):
+def getTierBounds(plants_byCostTier, power_ranges_byCostTier):
+    """
+    Function that gets what the lower bounds of the subsets need from each tier (see getSubsetLowerBound).
+    :param plants_byCostTier: list of plants by cost tier
+    :param power_ranges_byCostTier: power ranges for all cost tiers
+    :return: list of [ cost, minimum power (at least one power unit), headroom above the minimum ] by cost tier
+    """
+    tier_bounds = []
+    for iTier in range(0, len(power_ranges_byCostTier)):
+        min_power = max(power_ranges_byCostTier[iTier].min(), 1)
+        headroom = max(power_ranges_byCostTier[iTier].max() - min_power, 0)
+        tier_bounds.append([plants_byCostTier[iTier][0].cost, min_power, headroom])
+    return tier_bounds
+
+
+
+def getSubsetLowerBound(load, subset, tier_bounds):
+    """
+    Function that computes a lower bound of the cost of the solutions using all tiers of a subset.
+    Each tier gets its minimum power (at least one power unit), then the rest of the load is given in merit order
+    to the headroom of the tiers, as if their power ranges had no gaps.
+    A subset whose lower bound is not below the cost of the incumbent can't improve it, and doesn't need to be searched.
+    :param load: total load to be distributed, in power units
+    :param subset: subset of tiers to be considered (sorted by cost)
+    :param tier_bounds: cost, minimum power and headroom by cost tier (see getTierBounds)
+    :return: lower bound of the cost
+    """
+    tmp_load = load
+    lower_bound = 0
+    for iTier in subset:
+        tmp_load = tmp_load - tier_bounds[iTier][1]
+        lower_bound += tier_bounds[iTier][0] * tier_bounds[iTier][1]
+    for iTier in subset:
+        if tmp_load <= 0:
+            break
+        extra_power = min(tier_bounds[iTier][2], tmp_load)
+        tmp_load = tmp_load - extra_power
+        lower_bound += tier_bounds[iTier][0] * extra_power
+    return lower_bound
+
+
+
+def bruteForceSolution(load, subset, plants_byCostTier, power_ranges_byCostTier, budget=None):
     """
     Function that searches for solutions by tier (like tryGoldenPath).
     This function considers a subset of cost tiers and searches for all possible solutions that make use of ALL cost tiers in the subset.
@@ -154,18 +216,19 @@ def bruteForceSolution(load, subset, plants_byCostTier, power_ranges_byCostTier)
     (2) For each interval combination, check if a solution can be found using ALL intervals.
     (3) If that's possible, assign the minimum load to each interval.
     (4) Then assign the maximum load to intervals ordered by cheapness, until done.
-    (5) Append solution to list of possible solutions.
-    Then sort the solutions by cost and return cheapest.
-    This will be the cheapest solution using ALL tiers in the subset.
+    (5) Keep the solution if it is cheaper than the cheapest found so far (the incumbent).
+    The incumbent is then returned: this will be the cheapest solution using ALL tiers in the subset.
+    If the time budget runs out, the search stops and the incumbent is returned (budget.optimal is then False).
+    When NumPy is available and there are many combinations, steps (2) to (4) are evaluated for all combinations at once
+    (see vectorisedsearch.findBestCombination), and only the cheapest combination is turned into a solution.
     Attention: the function assumes the existence of a solution!
-    :param load: total load to be distributed 
+    :param load: total load to be distributed, in power units
     :param subset: subset of tiers to be considered 
     :param plants_byCostTier: list of plants by cost tier
     :param power_ranges_byCostTier: list of power ranges by cost tier
-    :return: cheapest solution using all tiers in the subset
+    :param budget: TimeBudget of the solve, None for no time limit
+    :return: cheapest solution using all tiers in the subset (None if there is none after all)
     """
-    nTiers = len(power_ranges_byCostTier)
-
     number_of_combinations = 1
     combinations = {}
     for iSub in range(0, len(subset)):
@@ -173,352 +236,784 @@ def bruteForceSolution(load, subset, plants_byCostTier, power_ranges_byCostTier)
         combinations[iTier] = [number_of_combinations, len(power_ranges_byCostTier[iTier])]
         number_of_combinations = number_of_combinations * len(power_ranges_byCostTier[iTier])
 
-    list_of_solutions = []
+    if vectorisedsearch.isAvailable() and number_of_combinations >= VECTORISE_MIN_COMBINATIONS:
+        best_combination, nEvaluated = vectorisedsearch.findBestCombination(load, subset, plants_byCostTier, power_ranges_byCostTier, budget)
+        metrics.combinations_evaluated.inc(nEvaluated)
+        if best_combination is None:
+            #no combination is feasible, or the time budget ran out: the scalar search would not find any either
+            return None
+        tmp_interval_list = makeIntervalCombination(subset, best_combination, power_ranges_byCostTier)
+        solution = solveIntervalCombination(load, tmp_interval_list, plants_byCostTier)
+        if solution is not None:
+            return solution
+
+    best_solution = None
+    nEvaluated = 0
     for iComb in range(0, number_of_combinations):
-        tmp_interval_list = []
-        for iTier in range(0, len(power_ranges_byCostTier)):
-            if iTier in subset:
-                divide = int(combinations[iTier][0])
-                modulo = int(combinations[iTier][1])
-                iInt = (iComb//divide) % modulo
-                tmp_interval_list.append([power_ranges_byCostTier[iTier][iInt]])
-            else:
-                tmp_interval_list.append([])
+        if iComb % BUDGET_CHECK_INTERVAL == 0 and isExpired(budget):
+            logging.info("Time budget exhausted after %s of %s interval combinations.", iComb, number_of_combinations)
+            break
+        nEvaluated += 1
+        interval_indices = []
+        for iTier in subset:
+            divide = int(combinations[iTier][0])
+            modulo = int(combinations[iTier][1])
+            interval_indices.append((iComb//divide) % modulo)
+        tmp_interval_list = makeIntervalCombination(subset, interval_indices, power_ranges_byCostTier)
 
         if not checkIfAllNeeded(load, subset, tmp_interval_list):
             continue
         else:
-            solution = initialiseSol(nTiers)
-            global_cost = 0
-            tmp_load = load
-            tmp_interval_after_subtraction = []
-            for iTier in range(0, len(tmp_interval_list)):
-                if len(tmp_interval_list[iTier]) == 0:
-                    tmp_interval_after_subtraction.append([])
-                else:
-                    min_power = intervalops.getMinPower(tmp_interval_list[iTier])
-                    tmp_load = tmp_load - min_power
-                    tmp_load = round(tmp_load, 1)
-                    cost = plants_byCostTier[iTier][0].cost * min_power
-                    global_cost += cost
-                    solution["detailsbytier"][iTier]["load"] = round(min_power, 1)
-                    solution["detailsbytier"][iTier]["cost"] = round(cost, 2)
-                    tmp_ran = intervalops.reduceRangeBy(tmp_interval_list[iTier], min_power)
-                    tmp_interval_after_subtraction.append(tmp_ran)
-            for iTier in range(0, len(tmp_interval_after_subtraction)):
-                if len(tmp_interval_after_subtraction[iTier]) == 0:
-                    continue
-                else:
-                    tmp_range = tmp_interval_after_subtraction[iTier]
-                    if intervalops.belongsToInterval(tmp_load, tmp_range):
-                        cost = plants_byCostTier[iTier][0].cost * tmp_load
-                        global_cost += cost
-                        solution["detailsbytier"][iTier]["load"] += tmp_load
-                        solution["detailsbytier"][iTier]["load"] = round(solution["detailsbytier"][iTier]["load"], 1)
-                        solution["detailsbytier"][iTier]["cost"] += cost
-                        solution["detailsbytier"][iTier]["cost"] = round(solution["detailsbytier"][iTier]["cost"], 2)
-                        solution["globalcost"] = round(global_cost, 2)
-                        list_of_solutions.append(solution)
-                        break
-                    elif tmp_load > intervalops.getMaxPower(tmp_range):
-                        tmp_load = tmp_load - intervalops.getMaxPower(tmp_range)
-                        tmp_load = round(tmp_load, 1)
-                        cost = plants_byCostTier[iTier][0].cost * intervalops.getMaxPower(tmp_range)
-                        global_cost += cost
-                        solution["detailsbytier"][iTier]["load"] += intervalops.getMaxPower(tmp_range)
-                        solution["detailsbytier"][iTier]["load"] = round(solution["detailsbytier"][iTier]["load"], 1)
-                        solution["detailsbytier"][iTier]["cost"] += cost
-                        solution["detailsbytier"][iTier]["cost"] = round(solution["detailsbytier"][iTier]["cost"], 2)
-                    else:
-                        pass #this shouldn't happen
-                        
-
-    list_of_solutions = sorted(list_of_solutions, key=lambda s: s["globalcost"])
-    return list_of_solutions[0]
+            solution = solveIntervalCombination(load, tmp_interval_list, plants_byCostTier)
+            if solution is not None and (best_solution is None or solution["globalcost"] < best_solution["globalcost"]):
+                best_solution = solution
+
+    metrics.combinations_evaluated.inc(nEvaluated)
+    #None can only happen if the time budget ran out
+    return best_solution
+
+
+
+def searchSubsets(load, subsets, plants_byCostTier, power_ranges_byCostTier, incumbent_cost=None, budget=None, shared_cost=None):
+    """
+    Function that searches a list of subsets of tiers for the cheapest solution, see searchSolution.
+    For each subset which can reach the load using all its tiers (see feasibility.SubsetReachability),
+    and which can't be skipped (see getSubsetLowerBound), the cheapest solution using all its tiers is searched for (see bruteForceSolution).
+    A solution is only kept if it is cheaper than the incumbent, so with several subsets of the same cost the first one is kept.
+    With a search split in chunks, the shared cost is the cheapest solution found by all chunks (see parallelsearch.SharedCost):
+    the subsets whose lower bound is above it are skipped, but not the ones whose lower bound is equal to it,
+    which may be the first subsets of that cost.
+    The time budget is checked before each subset: when it runs out, the search stops (budget.optimal is then False).
+    :param load: total load to be distributed, in power units
+    :param subsets: iterable of subsets of tiers (see intervalops.iteratePowerSet)
+    :param plants_byCostTier: list of plants by cost tier
+    :param power_ranges_byCostTier: power ranges for all cost tiers
+    :param incumbent_cost: cost of the incumbent, None if there is none
+    :param budget: TimeBudget of the solve, None for no time limit
+    :param shared_cost: SharedCost of a search split in chunks, None if there is none
+    :return: [ cheapest solution cheaper than the incumbent (None if there is none), number of subsets explored ]
+    """
+    tier_bounds = getTierBounds(plants_byCostTier, power_ranges_byCostTier)
+    reachability = SubsetReachability(load, power_ranges_byCostTier)
+    best_solution = None
+    nExplored = 0
+    for subset in subsets:
+        if isExpired(budget):
+            logging.info("Time budget exhausted, stopping the search with the best solution found so far.")
+            break
+        nExplored += 1
+        if not reachability.isReachable(subset):
+            continue
+        if incumbent_cost is not None or shared_cost is not None:
+            lower_bound = getSubsetLowerBound(load, subset, tier_bounds)
+            if (incumbent_cost is not None and lower_bound >= incumbent_cost) or (shared_cost is not None and lower_bound > shared_cost.get()):
+                continue
+        tmp_loc_sol = bruteForceSolution(load, subset, plants_byCostTier, power_ranges_byCostTier, budget)
+        if tmp_loc_sol is not None and (incumbent_cost is None or tmp_loc_sol["globalcost"] < incumbent_cost):
+            best_solution = tmp_loc_sol
+            incumbent_cost = tmp_loc_sol["globalcost"]
+            if shared_cost is not None:
+                shared_cost.offer(incumbent_cost)
+    return [best_solution, nExplored]
+
+
+
+def makeIntervalCombination(subset, interval_indices, power_ranges_byCostTier):
+    """
+    Function that builds one combination of intervals: one interval for each tier of the subset, nothing for the other tiers.
+    :param subset: subset of tiers to be considered
+    :param interval_indices: index of the interval chosen in each tier of the subset
+    :param power_ranges_byCostTier: list of power ranges by cost tier
+    :return: list of power ranges (IntervalSet) by cost tier
+    """
+    tmp_interval_list = [IntervalSet()] * len(power_ranges_byCostTier)
+    for iSub in range(0, len(subset)):
+        iTier = subset[iSub]
+        tmp_interval_list[iTier] = IntervalSet([power_ranges_byCostTier[iTier][interval_indices[iSub]]])
+    return tmp_interval_list
+
+
+
+def solveIntervalCombination(load, tmp_interval_list, plants_byCostTier):
+    """
+    Function that distributes the load to a combination of intervals (at most one per tier), see steps (3) and (4) of bruteForceSolution.
+    :param load: total load to be distributed, in power units
+    :param tmp_interval_list: list of power ranges (IntervalSet) by cost tier, each with at most one interval
+    :param plants_byCostTier: list of plants by cost tier
+    :return: solution by tier, or None if the load can't be distributed
+    """
+    nTiers = len(tmp_interval_list)
+    solution = initialiseSol(nTiers)
+    global_cost = 0
+    tmp_load = load
+    tmp_interval_after_subtraction = []
+    for iTier in range(0, len(tmp_interval_list)):
+        if len(tmp_interval_list[iTier]) == 0:
+            tmp_interval_after_subtraction.append(IntervalSet())
+        else:
+            min_power = tmp_interval_list[iTier].min()
+            tmp_load = tmp_load - min_power
+            cost = plants_byCostTier[iTier][0].cost * min_power
+            global_cost += cost
+            solution["detailsbytier"][iTier]["load"] = min_power
+            solution["detailsbytier"][iTier]["cost"] = cost
+            tmp_ran = tmp_interval_list[iTier].reducedBy(min_power)
+            tmp_interval_after_subtraction.append(tmp_ran)
+    for iTier in range(0, len(tmp_interval_after_subtraction)):
+        if len(tmp_interval_after_subtraction[iTier]) == 0:
+            continue
+        else:
+            tmp_range = tmp_interval_after_subtraction[iTier]
+            if tmp_load in tmp_range:
+                cost = plants_byCostTier[iTier][0].cost * tmp_load
+                global_cost += cost
+                solution["detailsbytier"][iTier]["load"] += tmp_load
+                solution["detailsbytier"][iTier]["cost"] += cost
+                solution["globalcost"] = global_cost
+                return solution
+            elif tmp_load > tmp_range.max():
+                tmp_load = tmp_load - tmp_range.max()
+                cost = plants_byCostTier[iTier][0].cost * tmp_range.max()
+                global_cost += cost
+                solution["detailsbytier"][iTier]["load"] += tmp_range.max()
+                solution["detailsbytier"][iTier]["cost"] += cost
+            else:
+                pass #this shouldn't happen
+    return None
+
+
+
+def splitLoadBySweep(load_units, plant_ranges):
+    """
+    Function that tries to split a load between equivalent plants with a feasibility sweep.
+    The plants are sorted by decreasing pmax (then increasing pmin), and the smallest prefix whose pmax sum reaches the load is considered.
+    No smaller set of plants can reach the load, so if the pmin sum of that prefix does not exceed the load, it is the minimal set.
+    :param load_units: load to be distributed, in power units
+    :param plant_ranges: list of [ min power, max power ] by plant, in power units
+    :return: list of powers by plant in power units, or None if the sweep fails
+    """
+    order = sorted(range(0, len(plant_ranges)), key=lambda iPlant: (-plant_ranges[iPlant][1], plant_ranges[iPlant][0]))
+    min_sum = 0
+    max_sum = 0
+    nUsed = 0
+    for iPlant in order:
+        min_sum += plant_ranges[iPlant][0]
+        max_sum += plant_ranges[iPlant][1]
+        nUsed += 1
+        if max_sum >= load_units:
+            break
+    if max_sum < load_units or min_sum > load_units:
+        return None
+
+    powers = [0] * len(plant_ranges)
+    remaining_units = load_units - min_sum
+    for iPlant in order[:nUsed]:
+        extra_units = min(plant_ranges[iPlant][1] - plant_ranges[iPlant][0], remaining_units)
+        powers[iPlant] = plant_ranges[iPlant][0] + extra_units
+        remaining_units -= extra_units
+    return powers
+
+
+
+def splitLoadByGrid(load_units, plant_ranges):
+    """
+    Function that splits a load between equivalent plants in power units (0.1 MW), using the fewest plants possible.
+    This is the dynamic programme of dynamicProgrammingSolution, where each plant switched on costs 1.
+    It is exact and polynomial in (number of plants) x (load resolution), and is only used when the sweep fails.
+    :param load_units: load to be distributed, in power units
+    :param plant_ranges: list of [ min power, max power ] by plant, in power units
+    :return: list of powers by plant in power units, or None if there is no solution
+    """
+    counts = [None] * (load_units + 1)
+    counts[0] = 0
+    choices_byPlant = []
+    for plant_range in plant_ranges:
+        min_units = max(plant_range[0], 1)
+        max_units = min(plant_range[1], load_units)
+        if min_units > max_units:
+            choices_byPlant.append(None)
+            continue
+        counts, choices = addPlantToCosts(counts, 0, min_units, max_units, fixed_cost=1)
+        choices_byPlant.append(choices)
+    if counts[load_units] is None:
+        return None
+
+    powers = [0] * len(plant_ranges)
+    remaining_units = load_units
+    for iPlant in range(len(plant_ranges) - 1, -1, -1):
+        if choices_byPlant[iPlant] is None:
+            continue
+        powers[iPlant] = choices_byPlant[iPlant][remaining_units]
+        remaining_units -= powers[iPlant]
+    return powers
 
 
 
 def distributeLoadInEquivalentPlants(tier_load, plants, wind_pc):
     """
     Function that distributes a given load to a list of equivalent power plants (belonging to the same tier).
-    It considers the power set of plants and tries to find a solution for each subset.
-    When there is a solution, the search terminates and the function returns the subset for which a solution exists.
+    Since all plants of the tier have the same cost, the cheapest solution is any set of plants whose range contains the load.
+    A feasibility sweep over the plants sorted by pmax gives the minimal set in most cases (see splitLoadBySweep),
+    otherwise the load is split exactly in power units (see splitLoadByGrid).
+    Both are polynomial, instead of going through the power set of the plants.
     The correct power is assigned to the PowerPlant objects in the solution subset.
     Attention: the function assumes the existence of a solution!
-    :param tier_load: load to be distributed 
+    :param tier_load: load to be distributed, in power units
     :param plants: list of PowerPlant objects
     :param wind_pc: wind percentage
     :return: subset of power plants for which there is a solution
     """
-    powerset_plants = intervalops.getPowerSet(plants)
+    if tier_load <= 0:
+        return []
+    plant_ranges = []
+    for plant in plants:
+        range_dic = plant.getRange(wind_pc)
+        plant_ranges.append([range_dic["min"], range_dic["max"]])
+
+    powers = splitLoadBySweep(tier_load, plant_ranges)
+    if powers is None:
+        powers = splitLoadByGrid(tier_load, plant_ranges)
+    if powers is None:
+        logging.error("Unable to distribute load '%s' in equivalent plants.", toMW(tier_load))
+        return []
+
     output_plants = []
-    for subset in powerset_plants:
-        tmp_range = []
-        for plant in subset:
-            range_dic = plant.getRange(wind_pc)
-            range_list = [[range_dic["min"], range_dic["max"]]]
-            plant.setRange(range_list[0])
-            tmp_range = intervalops.addToPowerRange(tmp_range, range_list)
-
-        tmp_load = tier_load
-        if intervalops.belongsToInterval(tier_load, tmp_range):
-            for plant in subset:
-                min_power = plant.rrange[0]
-                plant.setPower(min_power)
-                tmp_load = tmp_load - plant.rrange[0]
-                tmp_load = round(tmp_load, 1)
-            if tmp_load < 0:
-                continue
-            else:
-                for plant in subset:
-                    if tmp_load > plant.rrange[1] - plant.rrange[0]:
-                        plant.setPower(plant.rrange[1])
-                        tmp_load = tmp_load - plant.rrange[1] + plant.rrange[0]
-                        tmp_load = round(tmp_load, 1)
-                    elif 0.1 <= tmp_load <= plant.rrange[1] - plant.rrange[0]:
-                        plant.setPower(plant.rrange[0]+tmp_load)
-                        output_plants = subset.copy()
-                        break
-                    elif 0 <= tmp_load < 0.1:
-                        output_plants = subset.copy()
-                        break
-        if len(output_plants) > 0: break
+    for iPlant in range(0, len(plants)):
+        if powers[iPlant] > 0:
+            plants[iPlant].setPower(powers[iPlant])
+            output_plants.append(plants[iPlant])
     return output_plants
-                    
 
 
-def optimiseCheckForErrors(data):
+
+def parsePayload(data):
     """
-    Function that takes the raw JSON data and makes sure
+    Function that walks the raw JSON data once, and both checks and parses it.
+    It makes sure
     (1) It's in the proper format (variable types, dictionary keys)
     (2) Variables are in the allowed ranges
-    If everything is fine, it returns the input data with no modification.
-    Otherwise it returns an error message.
+    All errors are collected (not only the first one). The power plants are parsed into typed columns, ready to build a Fleet.
     :param data: input data
-    :return: data or error
+    :return: [ list of error messages, parsed data dictionary ]
     """
+    errors = []
+    def addError(error_output):
+        if not error_output in errors:
+            logging.error(error_output)
+            errors.append(error_output)
+
+    parsed = {
+        "load": 0,
+        "gas_price": 0,
+        "kerosine_price": 0,
+        "wind_pc": 0,
+        "names": [],
+        "types": [],
+        "efficiencies": [],
+        "pmins": [],
+        "pmaxs": [],
+        "previous": None,
+    }
+
     #check input format
-    load = 0
-    gas_price = 0
-    kerosine_price = 0
-    wind_pc = 0
     try:
-        load = float(data["load"])
-        gas_price = float(data["fuels"]["gas(euro/MWh)"])
-        kerosine_price = float(data["fuels"]["kerosine(euro/MWh)"])
-        wind_pc = float(data["fuels"]["wind(%)"])
+        fuels = data["fuels"]
+        parsed["load"] = float(data["load"])
+        parsed["gas_price"] = float(fuels["gas(euro/MWh)"])
+        parsed["kerosine_price"] = float(fuels["kerosine(euro/MWh)"])
+        parsed["wind_pc"] = float(fuels["wind(%)"])
     except KeyError:
-        error_output = "Key error in payload. At least one of the 'load' or 'fuel' keys is wrong. Check JSON file."
-        logging.error(error_output)
-        return {"msg:": error_output}
+        addError("Key error in payload. At least one of the 'load' or 'fuel' keys is wrong. Check JSON file.")
     except TypeError:
-        error_output = "Type error in payload. Got list when expecting dictionary or vice-versa. Check JSON file."
-        logging.error(error_output)
-        return {"msg:": error_output}
+        addError("Type error in payload. Got list when expecting dictionary or vice-versa. Check JSON file.")
     except ValueError:
-        error_output = "Value error in payload. Expecting floats in 'load' and 'fuel', but at least one of the values is not a float. Check JSON file."
-        logging.error(error_output)
-        return {"msg:": error_output}
+        addError("Value error in payload. Expecting floats in 'load' and 'fuel', but at least one of the values is not a float. Check JSON file.")
+    else:
+        if parsed["load"] < 0 or parsed["gas_price"] < 0 or parsed["kerosine_price"] < 0:
+            addError("Negative load or fuel price. Values must be >=0. Check JSON.")
+        if parsed["wind_pc"] < 0 or parsed["wind_pc"] > 100:
+            addError("Wind percentage '%s' not valid. Value needs to be between 0 and 100. Check JSON." %parsed["wind_pc"])
 
-    if load < 0 or gas_price < 0 or kerosine_price < 0:
-        error_output = "Negative load or fuel price. Values must be >=0. Check JSON."
-        logging.error(error_output)
-        return {"msg:": error_output}
-    if wind_pc < 0 or wind_pc > 100:
-        error_output = "Wind percentage '%s' not valid. Value needs to be between 0 and 100. Check JSON."%wind_pc
-        logging.error(error_output)
-        return {"msg:": error_output}
-        
+    #previous dispatch, for a warm start (see warmstart.getWarmStart)
+    try:
+        previous = data.get("previous")
+    except AttributeError:
+        previous = None
+    if previous is not None and previous != LAST_DISPATCH:
+        try:
+            parsed["previous"] = [[str(plant["name"]), float(plant["p"])] for plant in previous]
+        except (KeyError, TypeError, ValueError):
+            addError("Error in 'previous' dispatch. Expecting a list of power plants with 'name' and 'p' (the output of a previous request), or '%s'. Check JSON file." %LAST_DISPATCH)
+    else:
+        parsed["previous"] = previous
 
-    nPlants = 0
+    powerplants = []
     try:
-        nPlants = len(data["powerplants"])
+        powerplants = data["powerplants"]
+        len(powerplants)
     except KeyError:
-        error_output = "Key error: can't find 'powerplants' entry. Check JSON file."
-        logging.error(error_output)
-        return {"msg:": error_output}
+        addError("Key error: can't find 'powerplants' entry. Check JSON file.")
+        powerplants = []
     except TypeError:
-        error_output = "Type error in payload. Got list when expecting dictionary or vice-versa. Check JSON file."
-        logging.error(error_output)
-        return {"msg:": error_output}
-    
-        
-    powerplants = []
-    for iPlant in range(0, nPlants):
+        addError("Type error in payload. Got list when expecting dictionary or vice-versa. Check JSON file.")
+        powerplants = []
+
+    acceptable_types = ["gasfired", "turbojet", "windturbine"]
+    for iPlant in range(0, len(powerplants)):
+        plant = powerplants[iPlant]
         try:
-            tmp_powerplant = PowerPlant(
-                str(data["powerplants"][iPlant]["name"]),
-                str(data["powerplants"][iPlant]["type"]),
-                float(data["powerplants"][iPlant]["efficiency"]),
-                float(data["powerplants"][iPlant]["pmin"]),
-                float(data["powerplants"][iPlant]["pmax"]),
-            )
+            name = str(plant["name"])
+            ttype = str(plant["type"])
+            efficiency = float(plant["efficiency"])
+            pmin = float(plant["pmin"])
+            pmax = float(plant["pmax"])
         except KeyError:
-            error_output = "Key error in powerplant number %s. Check JSON file." %iPlant
-            logging.error(error_output)
-            return {"msg:": error_output}
+            addError("Key error in powerplant number %s. Check JSON file." %iPlant)
+            continue
         except TypeError:
-            error_output = "Type error in payload. Got list when expecting dictionary or vice-versa. Check JSON file."
-            logging.error(error_output)
-            return {"msg:": error_output}
+            addError("Type error in payload. Got list when expecting dictionary or vice-versa. Check JSON file.")
+            continue
         except ValueError:
-            error_output = "Value error in powerplant number %s. Check JSON file." %iPlant
-            logging.error(error_output)
-            return {"msg:": error_output}
-        
-        acceptable_types = ["gasfired", "turbojet", "windturbine"]
-        if not tmp_powerplant.ttype in acceptable_types:
-            error_output = "Type '%s' of power plant number %s not valid. Type needs to be one of %s. Check JSON file." %(tmp_powerplant.ttype, iPlant, acceptable_types)
-            logging.error(error_output)
-            return {"msg:": error_output}
-        if tmp_powerplant.efficiency <= 0 or tmp_powerplant.efficiency > 1:
-            error_output = "Efficiency '%s' of power plant number %s not valid. Value needs to be: 0 < '%s' <= 1. Check JSON file." %(tmp_powerplant.efficiency, iPlant, tmp_powerplant.efficiency)
-            logging.error(error_output)
-            return {"msg:": error_output}
-        if tmp_powerplant.pmin < 0 or tmp_powerplant.pmax < 0 or tmp_powerplant.pmax < tmp_powerplant.pmin:
-            error_output = "[pmin, pmax] = '[%s, %s]' of power plant number %s not valid. Both values need to be positive, and pmax >= pmin. Check JSON file." %(tmp_powerplant.pmin, tmp_powerplant.pmax, iPlant)
-            logging.error(error_output)
-            return {"msg:": error_output}
+            addError("Value error in powerplant number %s. Check JSON file." %iPlant)
+            continue
+
+        if not ttype in acceptable_types:
+            addError("Type '%s' of power plant number %s not valid. Type needs to be one of %s. Check JSON file." %(ttype, iPlant, acceptable_types))
+        if efficiency <= 0 or efficiency > 1:
+            addError("Efficiency '%s' of power plant number %s not valid. Value needs to be: 0 < '%s' <= 1. Check JSON file." %(efficiency, iPlant, efficiency))
+        if pmin < 0 or pmax < 0 or pmax < pmin:
+            addError("[pmin, pmax] = '[%s, %s]' of power plant number %s not valid. Both values need to be positive, and pmax >= pmin. Check JSON file." %(pmin, pmax, iPlant))
+
+        parsed["names"].append(name)
+        parsed["types"].append(ttype)
+        parsed["efficiencies"].append(efficiency)
+        parsed["pmins"].append(pmin)
+        parsed["pmaxs"].append(pmax)
+
+    return [errors, parsed]
+
+
+
+def makeErrorOutput(errors):
+    """
+    Function that makes the JSON error output from a list of error messages, all in one message.
+    :param errors: list of error messages
+    :return: JSON error
+    """
+    return {"msg:": " ".join(errors)}
+
 
-    #if everything is fine just return the data
-    return data
 
+def makeOrderedPlants(parsed):
+    """
+    Function that builds the compact Fleet from the parsed input data, sets the costs of all plants and orders them by cost.
+    :param parsed: parsed data (see parsePayload)
+    :return: list of plants (PlantView objects) sorted by cost
+    """
+    fleet = Fleet(parsed["names"], parsed["types"], parsed["efficiencies"], parsed["pmins"], parsed["pmaxs"])
+    fleet.setCosts(parsed["gas_price"], parsed["kerosine_price"])
+    return fleet.meritOrder()
 
 
-def optimise(data_raw):
+
+def prepareFleet(ordered_plants, wind_pc, plants_byCostTier=None, merit_index=None):
+    """
+    Function that computes everything the search needs which does not depend on the load.
+    The plants are organised by cost tiers (plants with same cost), and the range of power available for each tier is calculated.
+    The power ranges of the subsets made of the first n tiers are calculated as well,
+    the last one being the global power range available.
+    With a merit-order index of the same plants, the ranges already computed for other fuel prices are reused:
+    the range of a tier made of the same plants, and the ranges of the first tiers, as long as they are the same as the last time.
+    :param ordered_plants: list of PowerPlant objects sorted by cost
+    :param wind_pc: wind percentage
+    :param plants_byCostTier: list of cost tiers, if already known
+    :param merit_index: MeritOrderIndex the plants come from (see getFleet), None if there is none
+    :return: fleet dictionary
+    """
+    if plants_byCostTier is None:
+        plants_byCostTier = makeListOfCostTiers(ordered_plants)
+
+    nReused = 0
+    prefix_ranges = []
+    if merit_index is None:
+        power_ranges_byCostTier = getPowerRanges(plants_byCostTier, wind_pc)
+    else:
+        merit_index.forgetRanges()
+        tier_keys = [merit_index.getTierKey(tier) for tier in plants_byCostTier]
+        new_tiers = [iTier for iTier in range(0, len(tier_keys)) if not tier_keys[iTier] in merit_index.ranges_byTier]
+        new_ranges = getPowerRanges([plants_byCostTier[iTier] for iTier in new_tiers], wind_pc)
+        for iNew in range(0, len(new_tiers)):
+            merit_index.ranges_byTier[tier_keys[new_tiers[iNew]]] = new_ranges[iNew]
+        power_ranges_byCostTier = [merit_index.ranges_byTier[tier_key] for tier_key in tier_keys]
+        nReused = merit_index.getCommonPrefix(tier_keys)
+        prefix_ranges = merit_index.last_prefix_ranges[0:nReused]
+
+    tmp_pow_ran = IntervalSet()
+    for iTier in range(0, len(power_ranges_byCostTier)):
+        if iTier < nReused:
+            tmp_pow_ran = prefix_ranges[iTier]
+        else:
+            tmp_pow_ran = tmp_pow_ran.add(power_ranges_byCostTier[iTier])
+            prefix_ranges.append(tmp_pow_ran)
+
+    if merit_index is not None:
+        merit_index.last_tiers = tier_keys
+        merit_index.last_prefix_ranges = prefix_ranges
+
+    fleet = {
+        "ordered_plants": ordered_plants,
+        "plants_byCostTier": plants_byCostTier,
+        "wind_pc": wind_pc,
+        "power_ranges_byCostTier": power_ranges_byCostTier,
+        "global_power_range": tmp_pow_ran,
+    }
+    return fleet
+
+
+
+def optimise(data_raw, engine="auto", budget=None):
     """
     Function that takes the raw JSON data.
-    If there is a formatting error, this information is passed through to the API interface.
+    The data is checked and parsed in a single pass (see parsePayload).
+    If there are formatting errors, this information is passed through to the API interface.
     If not, the optimisation attempt starts.
-    The PowerPlant objects are initialised, put on a list and ordered by cost.
-    Then a list of cost tiers is established, with each tier containing a list of PowerPlant objects with the same cost per MWh.
-    The global power range available is calculate and the function checks if the load is one of the allowed intervals.
-    If not, an error is returned.
-    If there is a solution, the function tries to find an obvious solution (see tryGoldenPath).
-    If that's not possible, a search for all possible solutions starts.
-    The power set of the cost tiers is obtained, and for each subset an allowed power range is calculated.
-    For power ranges which contain the load as a solution, a brute force search for solutions is performed (see bruteForceSolution).
-    The cheapest solution of each subset is appended to a list of possible solutions.
-    Then the list of possible solutions is ordered by cost, and the cheapest is retained.
-    The correct power is distributed to the PowerPlant objects in each tier of the solution.
-    The JSON output is constructed and returned.
+    The plants are initialised in a compact Fleet, and ordered by cost.
+    Then a list of cost tiers is established, with each tier containing a list of plants with the same cost per MWh (see prepareFleet).
+    This does not depend on the load, so it is kept in the fleet cache for the next requests with the same fleet (see getFleet).
+    The load is then distributed (see solveLoad), warm-started from the previous dispatch given under 'previous' if any (see getWarmStart).
+    The new dispatch is kept as the last dispatch of the power plants, for a later payload with 'previous' set to 'last'.
+    If 'load' is a list, the payload is a time series and is solved by optimiseTimeSeries instead.
     :param data: input data
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget of the solve, None for no time limit (budget.optimal tells if the solution is proven to be optimal)
     :return: JSON solution or error
     """
-    #check input format and value ranges
-    data = optimiseCheckForErrors(data_raw)
-    if "msg:" in data.keys():
+    if isinstance(data_raw, dict) and isinstance(data_raw.get("load"), list):
+        return optimiseTimeSeries(data_raw, engine, budget)
+
+    #check input format and value ranges, and parse the data in one pass
+    stage_start = time.perf_counter()
+    errors, parsed = parsePayload(data_raw)
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "validation")
+    if len(errors) > 0:
         #return error message if any
-        return data
+        return makeErrorOutput(errors)
     #now we're assured data is in the proper format
-    
-    load = float(data["load"])
-    gas_price = float(data["fuels"]["gas(euro/MWh)"])
-    kerosine_price = float(data["fuels"]["kerosine(euro/MWh)"])
-    wind_pc = float(data["fuels"]["wind(%)"])
-        
 
-    nPlants = len(data["powerplants"])
-    powerplants = []
-    for iPlant in range(0, nPlants):
-        tmp_powerplant = PowerPlant(
-            str(data["powerplants"][iPlant]["name"]),
-            str(data["powerplants"][iPlant]["type"]),
-            float(data["powerplants"][iPlant]["efficiency"]),
-            float(data["powerplants"][iPlant]["pmin"]),
-            float(data["powerplants"][iPlant]["pmax"]),
-        )
-        cost = round(tmp_powerplant.costPerMWh(gas_price, kerosine_price), 2)
-        tmp_powerplant.setCost(cost)
-        powerplants.append(tmp_powerplant)
-        
+    fleet = getFleet(parsed)
+    warm_start = getWarmStart(parsed)
+    with fleet["lock"]:
+        output = solveLoad(parsed["load"], fleet, engine, budget, warm_start)
+    rememberDispatch(parsed, warm_start)
+    return output
 
-    #list of plants by cost
-    ordered_plants = sorted(powerplants, key=lambda plant: plant.cost)
 
-    #organisation by cost tiers (plants with same cost), range of power available for each tier
-    plants_byCostTier = makeListOfCostTiers(ordered_plants)
-    power_ranges_byCostTier = getPowerRanges(plants_byCostTier, wind_pc)
-    
 
-    power_ranges_bySubSet = {}
-    subset_tiers = []
-    tmp_pow_ran = []
-    global_solution_flag = False
-    for iTier in range(0, len(power_ranges_byCostTier)):
-        subset_tiers.append(iTier)
-        tmp_pow_ran = intervalops.addToPowerRange(tmp_pow_ran, power_ranges_byCostTier[iTier])
-        tuple_subset = tuple(subset_tiers)
-        power_ranges_bySubSet[tuple_subset] = tmp_pow_ran
-        if intervalops.belongsToInterval(load, tmp_pow_ran):
-            global_solution_flag = True
-
-    logging.info("Load is '%s'. Available power range is '%s'", load, tmp_pow_ran)
-    if not global_solution_flag:
+def getResponseDispatch(data_raw, output):
+    """
+    Function that gets the dispatch of a response, to be kept with it in the response cache:
+    a response served from the cache is then kept as the last dispatch of its power plants (see warmstart.setLastDispatch)
+    without parsing its payload again, as the solve it stands for would have, for a later payload with 'previous' set to 'last'.
+    For a time series, the dispatch of the last timestep solved is kept.
+    :param data_raw: input data
+    :param output: JSON solution (or error) of the input data
+    :return: [ dispatch key (see getDispatchKey), set of indices of the plants switched on ], or None if there is no dispatch
+    """
+    if isinstance(data_raw, dict) and isinstance(data_raw.get("load"), list):
+        solutions = [solution for solution in output if isinstance(solution, list)] if isinstance(output, list) else []
+        output = solutions[-1] if len(solutions) > 0 else None
+        data_raw = getTimeStep(data_raw, 0)
+    if not isinstance(output, list):
+        return None
+    errors, parsed = parsePayload(data_raw)
+    if len(errors) > 0:
+        return None
+    warm_start = WarmStart.fromPrevious([[plant["name"], plant["p"]] for plant in output], parsed["names"])
+    return [getDispatchKey(parsed), warm_start.committed]
+
+
+
+def getPreviousDispatch(data_raw):
+    """
+    Function that gets the last dispatch of this process that a payload with 'previous' set to 'last' is warm-started from (see getWarmStart),
+    to be passed along with the payload to a worker process, whose own last dispatches depend on the payloads it happened to solve.
+    :param data_raw: input data
+    :return: [ dispatch key, set of indices of the plants switched on (None for a cold start) ], or None if 'previous' isn't 'last'
+    """
+    if not isinstance(data_raw, dict) or data_raw.get("previous") != LAST_DISPATCH:
+        return None
+    if isinstance(data_raw.get("load"), list) and len(data_raw["load"]) > 0:
+        data_raw = getTimeStep(data_raw, 0)
+    errors, parsed = parsePayload(data_raw)
+    if len(errors) > 0:
+        return None
+    return [getDispatchKey(parsed), getWarmStart(parsed).committed]
+
+
+
+def optimiseWithDispatch(data_raw, previous_dispatch, engine="auto", budget=None):
+    """
+    Function that solves a payload in a worker process (see optimise), where 'previous' set to 'last' is the dispatch
+    given by the server process (see getPreviousDispatch), and gets the dispatch of the solution for the server process to keep.
+    :param data_raw: input data
+    :param previous_dispatch: last dispatch of the server process (see getPreviousDispatch), None if 'previous' isn't 'last'
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget of the solve, None for no time limit
+    :return: [ JSON solution or error, its dispatch (see getResponseDispatch) ]
+    """
+    if previous_dispatch is not None:
+        setLastDispatch(previous_dispatch)
+    output = optimise(data_raw, engine, budget)
+    return [output, getResponseDispatch(data_raw, output)]
+
+
+
+def getFleet(parsed):
+    """
+    Function that gets the prepared fleet (see prepareFleet) from the fleet cache, or makes it.
+    Each cached fleet has its own plants, and its lock must be held while solving with it.
+    A fleet is made from the merit-order index of its plants (see MeritOrderIndex), kept in its own cache,
+    so that a fleet which was already prepared with other fuel prices is only partly recomputed.
+    :param parsed: parsed data (see parsePayload)
+    :return: fleet dictionary
+    """
+    def makeFleet():
+        stage_start = time.perf_counter()
+        merit_entry = getMeritIndex(parsed)
+        with merit_entry["lock"]:
+            merit_index = merit_entry["index"]
+            ordered_plants = merit_index.orderPlants(parsed["gas_price"], parsed["kerosine_price"])
+            fleet = prepareFleet(ordered_plants, parsed["wind_pc"], merit_index=merit_index)
+        metrics.stage_duration.observe(time.perf_counter() - stage_start, "power_ranges")
+        metrics.fleet_preparations.inc()
+        return fleet
+
+    key = getFleetKey(parsed)
+    return fleet_cache.get(key, makeFleet)
+
+
+
+def getMeritIndex(parsed):
+    """
+    Function that gets the merit-order index of the plants and wind percentage of the parsed data from its cache, or makes it.
+    The lock of the cache entry must be held while using the index.
+    :param parsed: parsed data (see parsePayload)
+    :return: cache entry, with the MeritOrderIndex under 'index'
+    """
+    def makeMeritIndex():
+        return {"index": MeritOrderIndex(parsed)}
+
+    return merit_index_cache.get(getMeritIndexKey(parsed), makeMeritIndex)
+
+
+
+def solveLoad(load, fleet, engine="auto", budget=None, warm_start=None):
+    """
+    Function that distributes a load to a prepared fleet (see searchSolution),
+    and records the time spent in the metrics, by solve path.
+    :param load: total load to be distributed
+    :param fleet: fleet dictionary
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget of the solve, None for no time limit
+    :param warm_start: WarmStart with the previous dispatch, updated with the new one, None for a cold start
+    :return: JSON solution or error
+    """
+    start = time.perf_counter()
+    path, output = searchSolution(load, fleet, engine, budget, warm_start)
+    metrics.solve_duration.observe(time.perf_counter() - start, path)
+    return output
+
+
+
+def searchSolution(load, fleet, engine="auto", budget=None, warm_start=None):
+    """
+    Function that distributes a load to a prepared fleet (see prepareFleet).
+    The function checks if the load is in the global power range available. If not, an error is returned.
+    With a warm start, the plants of the previous dispatch are kept on and the load is split again between them (see repairDispatch).
+    If the cost of this repaired dispatch is the lower bound of the fleet, it is optimal and returned without search.
+    Otherwise it is the first incumbent of the search, and is returned if the search finds nothing cheaper.
+    If there is a solution, the function tries to find an obvious solution (see tryGoldenPath).
+    If that's not possible, a search for all possible solutions starts.
+    The power set of the cost tiers is obtained, and for each subset the reachability of the load using all its tiers is checked
+    in bitsets of the reachable loads (see feasibility.SubsetReachability).
+    For subsets which can reach the load, a brute force search for solutions is performed (see bruteForceSolution).
+    The cheapest solution found so far over all subsets (the incumbent) is retained,
+    and the subsets whose lower bound is not below its cost are skipped (see searchSubsets).
+    The time budget is checked before each subset: when it runs out, the search stops and the incumbent is used (budget.optimal is then False).
+    With subset workers configured and enough tiers, the power set is split in chunks searched on a pool of processes,
+    with the same result (see parallelsearch).
+    The correct power is distributed to the PowerPlant objects in each tier of the solution.
+    Alternatively, the search can be done by dynamic programming over the plants (see dynamicProgrammingSolution),
+    or by branch and bound over the plants (see branchAndBoundSolution).
+    The dynamic programme is the default, as long as its table (the number of plants times the load) isn't too large (see isTableTooLarge).
+    Otherwise branch and bound is used when there are more than MAX_BRUTEFORCE_TIERS cost tiers, since its bounds prune most of the tree
+    on these fleets, and the brute force search below.
+    Branch and bound also stops at the end of the time budget, with its incumbent, while dynamic programming has no solution before the end:
+    the load is then dispatched greedily (see greedySolution).
+    An explicit brute force search is done by branch and bound above MAX_FORCED_BRUTEFORCE_TIERS cost tiers,
+    and so is an explicit dynamic programme whose table would be too large (see isTableTooLarge).
+    The load is converted to power units (0.1 MW) here, and the search is done in power units and cost units (see models.units).
+    The JSON output is constructed and returned, with the solve path taken:
+    'out_of_range', 'warm_start', 'golden_path', or the search engine used ('bruteforce', 'dp', 'bnb').
+    The warm start is updated with the plants used by the new dispatch.
+    :param load: total load to be distributed, in MW
+    :param fleet: fleet dictionary
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget of the solve, None for no time limit
+    :param warm_start: WarmStart with the previous dispatch, None for a cold start
+    :return: [ solve path, JSON solution or error ]
+    """
+    ordered_plants = fleet["ordered_plants"]
+    plants_byCostTier = fleet["plants_byCostTier"]
+    wind_pc = fleet["wind_pc"]
+    power_ranges_byCostTier = fleet["power_ranges_byCostTier"]
+    subset_tiers = list(range(0, len(power_ranges_byCostTier)))
+
+    logging.info("Load is '%s'.", load)
+    load = toPowerUnits(load)
+    #verbose dumps are sampled (see logqueue), and only formatted when written
+    logging.log(VERBOSE, "Available power range (in 0.1 MW) is '%s'", fleet["global_power_range"])
+    if not load in fleet["global_power_range"]:
         error_output = "Unable to distribute load. No solution found."
         logging.error(error_output)
-        return {"msg:": error_output}
+        return ["out_of_range", {"msg:": error_output}]
+
+    def useRepairedDispatch():
+        logging.info("Solution total cost: %s", toEuros(repaired[1]))
+        used_plants = applyDispatch(ordered_plants, repaired[2])
+        warm_start.remember(used_plants)
+        return makeOutputList(plants_byCostTier, used_plants)
+
+    repaired = [False, 0, []]
+    if warm_start is not None and warm_start.committed:
+        stage_start = time.perf_counter()
+        repaired = repairDispatch(load, ordered_plants, wind_pc, warm_start.committed)
+        proven_optimal = repaired[0] and isLowerBound(repaired[1], load, ordered_plants, wind_pc)
+        metrics.stage_duration.observe(time.perf_counter() - stage_start, "warm_start")
+        if proven_optimal:
+            logging.info("Repaired the previous dispatch, which is optimal.")
+            metrics.warm_start_hits.inc()
+            return ["warm_start", useRepairedDispatch()]
 
     global_solution_byCostTier = []
+    stage_start = time.perf_counter()
     golden_path = tryGoldenPath(load, plants_byCostTier, power_ranges_byCostTier)
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "golden_path")
+    if engine == "auto":
+        engine = getAutoEngine(len(ordered_plants), len(plants_byCostTier), load)
+    elif engine == "bruteforce" and len(plants_byCostTier) > MAX_FORCED_BRUTEFORCE_TIERS:
+        logging.info("Too many cost tiers (%s) for a brute force search, using branch and bound.", len(plants_byCostTier))
+        engine = "bnb"
+    elif engine == "dp" and isTableTooLarge(len(ordered_plants), load):
+        logging.info("Table of the dynamic programme too large (%s plants, %s power units), using branch and bound.", len(ordered_plants), load)
+        engine = "bnb"
+    stage_start = time.perf_counter()
     if golden_path[0]:
         global_solution_byCostTier = golden_path[1]
         logging.info("Found straightforward solution.")
+        metrics.golden_path_hits.inc()
+        engine = "golden_path"
+    elif engine in ("dp", "bnb"):
+        if engine == "dp":
+            logging.info("Found no straightforward solution, using dynamic programming.")
+            plant_solution = dynamicProgrammingSolution(load, ordered_plants, wind_pc, budget)
+            if not plant_solution[0] and budget is not None and not budget.optimal:
+                logging.info("Time budget exhausted before the end of the dynamic programme, dispatching greedily.")
+                plant_solution = greedySolution(load, ordered_plants, wind_pc, repaired[1] if repaired[0] else None)
+        else:
+            logging.info("Found no straightforward solution, using branch and bound.")
+            plant_solution = branchAndBoundSolution(load, ordered_plants, wind_pc, budget, repaired[1] if repaired[0] else None)
+        metrics.stage_duration.observe(time.perf_counter() - stage_start, "search")
+        if not plant_solution[0]:
+            if repaired[0]:
+                logging.info("Found no solution cheaper than the repaired previous dispatch.")
+                return [engine, useRepairedDispatch()]
+            if budget is not None and not budget.optimal:
+                error_output = "Unable to distribute load. No solution found within the time budget."
+            else:
+                error_output = "Unable to distribute load. No solution found."
+            logging.error(error_output)
+            return [engine, {"msg:": error_output}]
+        logging.info("Solution total cost: %s", toEuros(plant_solution[1]))
+        stage_start = time.perf_counter()
+        output = makeOutputList(plants_byCostTier, ordered_plants)
+        if warm_start is not None:
+            warm_start.remember(ordered_plants)
+        metrics.stage_duration.observe(time.perf_counter() - stage_start, "distribution")
+        return [engine, output]
     else:
         logging.info("Found no straightforward solution, brute forcing.")
-        local_solutions = []
-        powerset_tiers = intervalops.getPowerSet(subset_tiers)
-
-        for subset in powerset_tiers:
-            subset_tuple = tuple(subset)
-            if not subset_tuple in power_ranges_bySubSet.keys():
-                tmp_subset = subset.copy()
-                last_sub = -1
-                for iSub in range(1, len(subset)):
-                    tmp_subset.pop()
-                    tmp_tuple = tuple(tmp_subset)
-                    if tmp_tuple in power_ranges_bySubSet.keys():
-                        last_sub = iSub
-                        break
-                    
-                if last_sub >= 1:
-                    tmp_range = power_ranges_bySubSet[tmp_tuple]
-                else:
-                    tmp_range = []
-                    last_sub = 0
-                    
-                for iSub in range(last_sub, len(subset)):
-                    iTier = subset[iSub]
-                    tmp_range = intervalops.addToPowerRange(tmp_range, power_ranges_byCostTier[iTier])
-
-                power_ranges_bySubSet[subset_tuple] = tmp_range
-
-
-            if intervalops.belongsToInterval(load, power_ranges_bySubSet[subset_tuple]):
-                if not checkIfAllNeeded(load, subset, power_ranges_byCostTier):
-                    continue
-                else:
-                    tmp_loc_sol = bruteForceSolution(load, subset, plants_byCostTier, power_ranges_byCostTier)
-                    local_solutions.append(tmp_loc_sol)
-                    
-
-        local_solutions = sorted(local_solutions, key=lambda s: s["globalcost"])
-        global_solution_byCostTier = local_solutions[0]
-
-    logging.info("Solution total cost: %s", global_solution_byCostTier["globalcost"])
-    logging.info("Solution details by cost tier: %s", global_solution_byCostTier["detailsbytier"])
+        incumbent_cost = repaired[1] if repaired[0] else None
+        if parallelsearch.isEnabled(len(subset_tiers)):
+            best_solution, nExplored = parallelsearch.searchSubsetsInParallel(load, fleet, incumbent_cost, budget)
+        else:
+            #the subsets are made one at a time from their bitmask, so that the power set is never held in memory
+            best_solution, nExplored = searchSubsets(load, intervalops.iteratePowerSet(subset_tiers), plants_byCostTier, power_ranges_byCostTier,
+                                                     incumbent_cost, budget)
+        metrics.subsets_explored.inc(nExplored)
+        metrics.stage_duration.observe(time.perf_counter() - stage_start, "search")
+
+        if best_solution is None:
+            if repaired[0]:
+                logging.info("Found no solution cheaper than the repaired previous dispatch.")
+                return [engine, useRepairedDispatch()]
+            if budget is not None and not budget.optimal:
+                error_output = "Unable to distribute load. No solution found within the time budget."
+            else:
+                error_output = "Unable to distribute load. No solution found."
+            logging.error(error_output)
+            return [engine, {"msg:": error_output}]
+        global_solution_byCostTier = best_solution
+
+    logging.info("Solution total cost: %s", toEuros(global_solution_byCostTier["globalcost"]))
+    logging.log(VERBOSE, "Solution details by cost tier (in 0.1 MW and 0.1 cent): %s", global_solution_byCostTier["detailsbytier"])
     
-    output_list = []
+    stage_start = time.perf_counter()
+    used_plants = []
     for iTier in range(0, len(global_solution_byCostTier["detailsbytier"])):
         tier_load = global_solution_byCostTier["detailsbytier"][iTier]["load"]
-        tmp_plants = distributeLoadInEquivalentPlants(tier_load, plants_byCostTier[iTier], wind_pc)
+        used_plants += distributeLoadInEquivalentPlants(tier_load, plants_byCostTier[iTier], wind_pc)
+
+    output = makeOutputList(plants_byCostTier, used_plants)
+    if warm_start is not None:
+        warm_start.remember(used_plants)
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "distribution")
+    return [engine, output]
+
+
+
+def getAutoEngine(nPlants, nTiers, load_units):
+    """
+    Function that chooses the search engine of 'auto': the dynamic programme if its table isn't too large (see isTableTooLarge),
+    otherwise branch and bound above MAX_BRUTEFORCE_TIERS cost tiers, and the brute force search below.
+    :param nPlants: number of plants
+    :param nTiers: number of cost tiers
+    :param load_units: load in power units
+    :return: search engine, one of 'bruteforce', 'dp', 'bnb'
+    """
+    if not isTableTooLarge(nPlants, load_units):
+        return "dp"
+    return "bnb" if nTiers > MAX_BRUTEFORCE_TIERS else "bruteforce"
+
 
+
+def makeOutputList(plants_byCostTier, used_plants):
+    """
+    Function that constructs the JSON output from the PowerPlant objects, in order of cost tiers.
+    The powers are converted from power units back to MW.
+    Plants that are not used by the solution are given a power of zero.
+    :param plants_byCostTier: list of plants by cost tier
+    :param used_plants: list of PowerPlant objects used by the solution, with their power set
+    :return: JSON solution
+    """
+    output_list = []
+    for iTier in range(0, len(plants_byCostTier)):
         for plant in plants_byCostTier[iTier]:
             output_element = {}
-            if plant in tmp_plants:
+            if plant in used_plants:
                 output_element = {
                     "name": plant.name,
-                    "p": plant.p
+                    "p": toMW(plant.p)
                 }
             else:
                 output_element = {
@@ -528,3 +1023,97 @@ def optimise(data_raw):
             output_list.append(output_element.copy())
 
     return output_list
+
+
+
+def checkTimeSeriesForErrors(data):
+    """
+    Function that checks the time series of a payload: 'load' must be a non-empty list,
+    and 'wind(%)' either a single value or a list with one value per timestep.
+    The value ranges are checked by parsePayload, one timestep at a time.
+    :param data: input data with a time series of loads
+    :return: error message, or None if the time series is fine
+    """
+    nSteps = len(data["load"])
+    if nSteps == 0:
+        error_output = "Empty 'load' list in payload. Check JSON file."
+        logging.error(error_output)
+        return {"msg:": error_output}
+    try:
+        wind_pc = data["fuels"]["wind(%)"]
+    except (KeyError, TypeError):
+        #reported by parsePayload
+        return None
+    if isinstance(wind_pc, list) and len(wind_pc) != nSteps:
+        error_output = "The 'wind(%%)' list has %s values but the 'load' list has %s. Check JSON file." %(len(wind_pc), nSteps)
+        logging.error(error_output)
+        return {"msg:": error_output}
+    return None
+
+
+
+def getTimeStep(data, iStep):
+    """
+    Function that extracts a single timestep from a time series payload.
+    The list of power plants is shared, not copied.
+    :param data: input data with a time series of loads
+    :param iStep: index of the timestep
+    :return: input data of the timestep
+    """
+    step_data = dict(data)
+    step_data["load"] = data["load"][iStep]
+    if isinstance(data.get("fuels"), dict) and isinstance(data["fuels"].get("wind(%)"), list):
+        step_data["fuels"] = dict(data["fuels"])
+        step_data["fuels"]["wind(%)"] = data["fuels"]["wind(%)"][iStep]
+    return step_data
+
+
+
+def optimiseTimeSeries(data_raw, engine="auto", budget=None):
+    """
+    Function that takes raw JSON data where 'load' (and possibly 'wind(%)') is a list, one value per timestep,
+    and returns one solution (or error) per timestep.
+    The plants, the cost tiers and the power ranges (of the tiers and of the subsets of first tiers) are built only once
+    per wind percentage (see getFleet), and shared by the timesteps with that wind percentage.
+    Each timestep is warm-started from the dispatch of the previous one (the first one from 'previous', if given, see getWarmStart),
+    so a timestep may get another plan of the same cost as the one it would get on its own.
+    :param data_raw: input data with a time series of loads
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget shared by all timesteps, None for no time limit
+    :return: list of JSON solutions or errors, or a single error if the payload is not valid
+    """
+    stage_start = time.perf_counter()
+    error = checkTimeSeriesForErrors(data_raw)
+    if error is not None:
+        return error
+
+    errors, first_step = parsePayload(getTimeStep(data_raw, 0))
+    if len(errors) > 0:
+        return {"msg:": "Timestep 0: %s" % makeErrorOutput(errors)["msg:"]}
+
+    #the power plants are the same for every timestep, they only need to be checked once
+    data_without_plants = dict(data_raw)
+    data_without_plants["powerplants"] = []
+    nSteps = len(data_raw["load"])
+    step_data = [first_step]
+    for iStep in range(1, nSteps):
+        errors, tmp_data = parsePayload(getTimeStep(data_without_plants, iStep))
+        if len(errors) > 0:
+            return {"msg:": "Timestep %s: %s" %(iStep, makeErrorOutput(errors)["msg:"])}
+        step_data.append(tmp_data)
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "validation")
+
+    fleets_byWind = {}
+    warm_start = getWarmStart(first_step)
+    output_list = []
+    for iStep in range(0, nSteps):
+        load = step_data[iStep]["load"]
+        wind_pc = step_data[iStep]["wind_pc"]
+        if not wind_pc in fleets_byWind.keys():
+            step_fleet = dict(first_step)
+            step_fleet["wind_pc"] = wind_pc
+            fleets_byWind[wind_pc] = getFleet(step_fleet)
+        with fleets_byWind[wind_pc]["lock"]:
+            output_list.append(solveLoad(load, fleets_byWind[wind_pc], engine, budget, warm_start))
+    rememberDispatch(first_step, warm_start)
+    return output_list
@@ -0,0 +1,209 @@
+"""
+Parallel search of the subsets of cost tiers, within a single solve (see optimisation.searchSolution).
+The power set of the tiers is split in chunks of consecutive subsets, searched independently on a pool of processes:
+each worker gets the power ranges of the tiers once per chunk, builds the reachability bitsets of its own subsets,
+and returns the cheapest solution of its chunk. The cheapest solution over all chunks is kept, the first one in case of a tie,
+so the result is the same as the serial search (see optimisation.searchSubsets).
+The chunks share the cost of the cheapest solution found so far (see SharedCost), starting from the cost of a greedy dispatch,
+to skip the subsets which can't be optimal.
+The search is only spread when the number of tiers makes it worth the overhead of the pool,
+and only from the main process: solves already running on a pool of workers (batch, ASGI, offline solver) stay serial.
+"""
+#internal packages
+import functions.optimisation as optimisation
+import functions.intervalops as intervalops
+from functions.branchandbound import getPlantData, getGreedyCompletion
+from functions.timebudget import TimeBudget
+import functions.metrics as metrics
+
+# external packages
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+#default number of worker processes searching the subsets of one solve (0 or 1 to search them serially)
+DEFAULT_SUBSET_WORKERS = 0
+#below this number of cost tiers, the search is too short to be worth the overhead of the pool
+PARALLEL_MIN_TIERS = 8
+#number of chunks of the power set per worker, so that a worker which got cheap subsets picks up another chunk
+CHUNKS_PER_WORKER = 4
+#shared cost when no solution is known
+NO_COST = (1 << 63) - 1
+
+subset_workers = DEFAULT_SUBSET_WORKERS
+#the pool is created on first use, so that importing the module does not spawn processes
+process_pool = None
+#cost shared by the parent and the workers of the pool
+shared_cost = None
+#one search at a time uses the pool, since the chunks of a search share its cost
+search_lock = threading.Lock()
+
+
+
+class SharedCost:
+    """
+    Cost of the cheapest solution found so far by all chunks of a search, in memory shared by the processes of the pool.
+    Intialise:  shared_cost = SharedCost()
+    """
+    __slots__ = ("value",)
+
+
+    def __init__(self):
+        """
+        Initialise SharedCost object
+        """
+        self.value = multiprocessing.Value('q', NO_COST)
+
+    def get(self):
+        """
+        Gets the cost of the cheapest solution found so far.
+        :return: cost (NO_COST if there is none)
+        """
+        return self.value.value
+
+    def offer(self, cost):
+        """
+        Offers the cost of a new solution, kept if it is cheaper.
+        :param cost: cost of the solution
+        """
+        with self.value.get_lock():
+            if cost < self.value.value:
+                self.value.value = cost
+
+    def reset(self, cost):
+        """
+        Sets the cost at the start of a search.
+        :param cost: cost of a known solution, NO_COST if there is none
+        """
+        with self.value.get_lock():
+            self.value.value = cost
+
+
+
+def configure(workers):
+    """
+    Sets the number of worker processes searching the subsets of one solve. The pool is made again on next use if it changes.
+    :param workers: number of worker processes, 0 or 1 to search serially
+    """
+    global subset_workers, process_pool
+    with search_lock:
+        if workers != subset_workers and process_pool is not None:
+            process_pool.shutdown(wait=False)
+            process_pool = None
+        subset_workers = workers
+
+
+def isEnabled(nTiers):
+    """
+    Checks if the subsets of tiers of a solve are searched in parallel.
+    :param nTiers: number of cost tiers
+    :return: (boolean) whether the search is spread over the pool
+    """
+    return subset_workers > 1 and nTiers >= PARALLEL_MIN_TIERS and multiprocessing.parent_process() is None
+
+
+def initialiseWorker(cost):
+    """
+    Initialises a worker process of the pool with the shared cost.
+    :param cost: SharedCost of the pool
+    """
+    global shared_cost
+    shared_cost = cost
+
+
+def getProcessPool() -> ProcessPoolExecutor:
+    """
+    Gets the process pool used to search the subsets, creating it (and its shared cost) on first use.
+    :return: process pool
+    """
+    global process_pool, shared_cost
+    if process_pool is None:
+        shared_cost = SharedCost()
+        process_pool = ProcessPoolExecutor(max_workers=subset_workers, initializer=initialiseWorker, initargs=(shared_cost,))
+    return process_pool
+
+
+def getRemainingMs(budget):
+    """
+    Gets the time left in a budget, to give the workers their own deadline.
+    :param budget: TimeBudget, or None for no budget
+    :return: time left in milliseconds, None for no time limit
+    """
+    if budget is None or budget.deadline is None:
+        return None
+    return max(budget.deadline - time.monotonic(), 0) * 1000
+
+
+
+def searchChunk(load, iFirst, iLast, plants_byCostTier, power_ranges_byCostTier, incumbent_cost, deadline_ms):
+    """
+    Searches a chunk of the power set of the tiers in a worker process (see optimisation.searchSubsets).
+    Subset number iPower is made of the tiers whose bit is set in iPower (see intervalops.iteratePowerSet).
+    :param load: total load to be distributed, in power units
+    :param iFirst: number of the first subset of the chunk
+    :param iLast: number of the subset after the last one of the chunk
+    :param plants_byCostTier: list of plants by cost tier
+    :param power_ranges_byCostTier: power ranges for all cost tiers
+    :param incumbent_cost: cost of the incumbent, None if there is none
+    :param deadline_ms: time left for the search (in milliseconds), None for no time limit
+    :return: [ cheapest solution of the chunk (None if there is none), subsets explored, combinations evaluated, whether the chunk was fully searched ]
+    """
+    budget = TimeBudget(deadline_ms) if deadline_ms is not None else None
+    nTiers = len(power_ranges_byCostTier)
+    subsets = intervalops.iteratePowerSet(list(range(0, nTiers)), iFirst, iLast)
+    nCombinations = metrics.combinations_evaluated.value()
+    best_solution, nExplored = optimisation.searchSubsets(load, subsets, plants_byCostTier, power_ranges_byCostTier,
+                                                          incumbent_cost, budget, shared_cost)
+    nCombinations = metrics.combinations_evaluated.value() - nCombinations
+    optimal = budget is None or budget.optimal
+    return [best_solution, nExplored, nCombinations, optimal]
+
+
+def searchSubsetsInParallel(load, fleet, incumbent_cost=None, budget=None):
+    """
+    Searches all subsets of tiers for the cheapest solution cheaper than the incumbent, on the pool of processes.
+    The power set is split in CHUNKS_PER_WORKER chunks per worker, and the chunks are reduced in order,
+    keeping a solution only if it is cheaper than the ones of the previous chunks.
+    The workers get the time left in the budget: if one of them runs out of time, budget.optimal is set to False.
+    :param load: total load to be distributed, in power units
+    :param fleet: fleet dictionary (see optimisation.prepareFleet)
+    :param incumbent_cost: cost of the incumbent, None if there is none
+    :param budget: TimeBudget of the solve, None for no time limit
+    :return: [ cheapest solution cheaper than the incumbent (None if there is none), number of subsets explored ]
+    """
+    plants_byCostTier = fleet["plants_byCostTier"]
+    power_ranges_byCostTier = fleet["power_ranges_byCostTier"]
+    nSubsets = (1 << len(power_ranges_byCostTier)) - 1
+    greedy = getGreedyCompletion(load, getPlantData(fleet["ordered_plants"], fleet["wind_pc"], load), [])
+
+    with search_lock:
+        pool = getProcessPool()
+        nChunks = min(subset_workers * CHUNKS_PER_WORKER, nSubsets)
+        chunk_size = -(-nSubsets // nChunks)
+        logging.info("Searching %s subsets of tiers in %s chunks on %s workers.", nSubsets, nChunks, subset_workers)
+        shared_cost.reset(greedy[1] if greedy[0] else NO_COST)
+        deadline_ms = getRemainingMs(budget)
+        futures = []
+        for iFirst in range(1, nSubsets + 1, chunk_size):
+            iLast = min(iFirst + chunk_size, nSubsets + 1)
+            futures.append(pool.submit(searchChunk, load, iFirst, iLast, plants_byCostTier, power_ranges_byCostTier,
+                                       incumbent_cost, deadline_ms))
+
+        best_solution = None
+        nExplored = 0
+        for future in futures:
+            solution, nChunkExplored, nCombinations, optimal = future.result()
+            nExplored += nChunkExplored
+            metrics.combinations_evaluated.inc(nCombinations)
+            if not optimal and budget is not None:
+                budget.optimal = False
+            if solution is not None and (incumbent_cost is None or solution["globalcost"] < incumbent_cost):
+                best_solution = solution
+                incumbent_cost = solution["globalcost"]
+
+    if budget is not None and not budget.optimal:
+        logging.info("Time budget exhausted, stopping the search with the best solution found so far.")
+    return [best_solution, nExplored]
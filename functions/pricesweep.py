@@ -0,0 +1,265 @@
+"""
+Fuel-price sensitivity sweep: the production plan and its global cost for every point of a grid of gas and/or kerosine prices.
+Most neighbouring prices give the same dispatch, so only a few grid points of a price line are actually solved:
+the global cost of a dispatch (the power of each plant) is linear in the fuel price, and the dispatches possible don't depend on it,
+so the cost of the optimal plan is the minimum of linear functions of the price.
+A dispatch which is optimal at two prices is then also optimal at all prices in between.
+The ends of the line are solved. Where their dispatches differ, the two grid points around the price at which their costs cross are solved:
+if they still have the same dispatches, each dispatch is optimal on its side, otherwise the same is done on each side with the new dispatches.
+This solves about two points per change of dispatch, instead of every point of the line.
+The merit order of every grid point is computed from the merit-order index (see MeritOrderIndex.getTierKeys), which is cheap,
+and gives the order of the plants in the plan and their costs.
+Knowing where the merit order changes is not enough on its own: with minimum powers, the cheapest dispatch may change
+while the merit order stays the same.
+The costs of the plants are rounded to the cent (see Fleet.setCosts), so a dispatch filled in this way is optimal up to that rounding;
+with two dispatches of (almost) the same cost, it may not be the one an independent solve would have returned.
+"""
+#internal packages
+from models.units import toPowerUnits, toMW, toEuros
+from functions.optimisation import parsePayload, makeErrorOutput, getFleet, getMeritIndex, solveLoad
+
+# external packages
+from array import array
+from bisect import bisect_right
+import logging
+
+
+#above this number of grid points, the sweep is refused
+MAX_SWEEP_POINTS = 10000
+FUEL_KEYS = {"gas_price": "gas(euro/MWh)", "kerosine_price": "kerosine(euro/MWh)"}
+
+
+def parsePriceGrid(prices, key, errors):
+    """
+    Function that parses the prices of one fuel: either a list of prices, or a range {"start": ..., "stop": ..., "step": ...},
+    where 'stop' is included (up to rounding).
+    :param prices: raw prices
+    :param key: name of the fuel in the payload, for the error messages
+    :param errors: list of error messages, to which errors are added
+    :return: list of prices, None if not valid
+    """
+    if isinstance(prices, dict):
+        try:
+            start = float(prices["start"])
+            stop = float(prices["stop"])
+            step = float(prices["step"])
+        except KeyError:
+            errors.append("Key error in the '%s' range of the sweep. Expecting 'start', 'stop' and 'step'. Check JSON file." %key)
+            return None
+        except (TypeError, ValueError):
+            errors.append("Value error in the '%s' range of the sweep. Expecting floats. Check JSON file." %key)
+            return None
+        if step <= 0 or stop < start:
+            errors.append("Range of '%s' in the sweep not valid. 'step' needs to be > 0, and 'stop' >= 'start'. Check JSON." %key)
+            return None
+        nPrices = int((stop - start) / step + 1e-9) + 1
+        if nPrices > MAX_SWEEP_POINTS:
+            errors.append("Too many '%s' prices in the sweep. At most %s grid points are allowed." %(key, MAX_SWEEP_POINTS))
+            return None
+        prices = [round(start + iPrice * step, 10) for iPrice in range(0, nPrices)]
+    elif not isinstance(prices, list) or len(prices) == 0:
+        errors.append("The '%s' prices of the sweep need to be a non-empty list or a range. Check JSON file." %key)
+        return None
+
+    try:
+        prices = [float(price) for price in prices]
+    except (TypeError, ValueError):
+        errors.append("Value error in the '%s' prices of the sweep. Expecting floats. Check JSON file." %key)
+        return None
+    if min(prices) < 0:
+        errors.append("Negative '%s' price in the sweep. Values must be >=0. Check JSON." %key)
+        return None
+    return prices
+
+
+
+def parseSweep(data):
+    """
+    Function that checks and parses a sweep payload: a payload (see parsePayload), with a single load,
+    and a 'sweep' dictionary with the gas and/or kerosine prices of the grid.
+    A fuel without prices in the sweep keeps the price of the payload.
+    :param data: input data
+    :return: [ list of error messages, parsed data dictionary, { 'gas_price': prices, 'kerosine_price': prices } ]
+    """
+    payload_errors, parsed = parsePayload(data)
+    errors = []
+    grid = {}
+    try:
+        sweep = data["sweep"]
+        sweep.keys()
+    except (KeyError, TypeError, AttributeError):
+        errors.append("Key error: can't find the 'sweep' dictionary with the fuel prices to sweep. Check JSON file.")
+        sweep = None
+    if isinstance(data, dict) and isinstance(data.get("load"), list):
+        errors.append("A sweep needs a single load, not a time series. Check JSON file.")
+    if sweep is None:
+        sweep = {}
+    elif not any(key in sweep for key in FUEL_KEYS.values()):
+        errors.append("The sweep needs prices for at least one of %s. Check JSON file." %list(FUEL_KEYS.values()))
+
+    for price_name, key in FUEL_KEYS.items():
+        if key in sweep:
+            prices = parsePriceGrid(sweep[key], key, errors)
+        else:
+            prices = [parsed[price_name]]
+        if prices is not None:
+            grid[price_name] = prices
+    if len(grid) == len(FUEL_KEYS) and len(grid["gas_price"]) * len(grid["kerosine_price"]) > MAX_SWEEP_POINTS:
+        errors.append("Too many grid points in the sweep. At most %s grid points are allowed." %MAX_SWEEP_POINTS)
+
+    #the errors of the payload itself are logged by parsePayload
+    for error in errors:
+        logging.error(error)
+    return [payload_errors + errors, parsed, grid]
+
+
+
+def getDispatch(plan, plant_order, nPlants):
+    """
+    Function that turns a plan into the power of each plant, in input order.
+    :param plan: JSON solution (see optimisation.makeOutputList), with the plants in merit order
+    :param plant_order: plant indices in the same order as the plan
+    :param nPlants: number of plants
+    :return: (tuple) power by plant, in power units
+    """
+    powers = [0] * nPlants
+    for iPlant in range(0, len(plan)):
+        powers[plant_order[iPlant]] = toPowerUnits(plan[iPlant]["p"])
+    return tuple(powers)
+
+
+
+def getDispatchCost(dispatch, costs):
+    """
+    Function that computes the global cost of a dispatch at given fuel prices.
+    :param dispatch: power by plant (see getDispatch)
+    :param costs: cost per MWh of each plant at these prices, in cost units
+    :return: global cost, in units of 0.1 cent
+    """
+    global_cost = 0
+    for iPlant in range(0, len(dispatch)):
+        global_cost += dispatch[iPlant] * costs[iPlant]
+    return global_cost
+
+
+
+def sweepPriceLine(parsed, points, engine="auto", budget=None):
+    """
+    Function that solves the grid points of one price line (one fuel price varying, in increasing order), see the module description.
+    :param parsed: parsed data (see parsePayload)
+    :param points: list of (gas price, kerosine price)
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget shared by the whole sweep, None for no time limit
+    :return: [ list of results by point, number of points solved ]
+    """
+    merit_entry = getMeritIndex(parsed)
+    plant_orders = []
+    costs = []
+    with merit_entry["lock"]:
+        merit_index = merit_entry["index"]
+        for gas_price, kerosine_price in points:
+            tier_keys = merit_index.getTierKeys(gas_price, kerosine_price)
+            plant_orders.append([iPlant for tier_key in tier_keys for iPlant in tier_key])
+            costs.append(array('q', merit_index.costs))
+
+    nPlants = len(parsed["names"])
+    #power by plant of each point, or the error of the solve
+    dispatches = [None] * len(points)
+    nSolved = 0
+    def solvePoint(iPoint):
+        nonlocal nSolved
+        if dispatches[iPoint] is None:
+            nSolved += 1
+            point_parsed = dict(parsed, gas_price=points[iPoint][0], kerosine_price=points[iPoint][1])
+            fleet = getFleet(point_parsed)
+            with fleet["lock"]:
+                output = solveLoad(parsed["load"], fleet, engine, budget)
+            if isinstance(output, list):
+                output = getDispatch(output, plant_orders[iPoint], nPlants)
+            dispatches[iPoint] = output
+
+    #price varying along the line
+    iAxis = 0 if points[0][0] != points[-1][0] else 1
+    prices = [point[iAxis] for point in points]
+    def getSplit(iFirst, iLast):
+        #last point before the price where the costs of the two dispatches cross, the middle point if they don't
+        first_dispatch = dispatches[iFirst]
+        last_dispatch = dispatches[iLast]
+        iMiddle = (iFirst + iLast) // 2
+        if not isinstance(first_dispatch, tuple) or not isinstance(last_dispatch, tuple):
+            return iMiddle
+        first_gap = getDispatchCost(last_dispatch, costs[iFirst]) - getDispatchCost(first_dispatch, costs[iFirst])
+        last_gap = getDispatchCost(last_dispatch, costs[iLast]) - getDispatchCost(first_dispatch, costs[iLast])
+        if first_gap - last_gap <= 0:
+            return iMiddle
+        crossing_price = prices[iFirst] + (prices[iLast] - prices[iFirst]) * first_gap / (first_gap - last_gap)
+        iSplit = bisect_right(prices, crossing_price, iFirst, iLast + 1) - 1
+        return min(max(iSplit, iFirst), iLast - 1)
+
+    def fillLine(iFirst, iLast):
+        #both ends are solved. Which loads can be distributed doesn't depend on the prices either, so an error is filled in as well
+        if iLast - iFirst <= 1:
+            return
+        if dispatches[iFirst] == dispatches[iLast]:
+            for iPoint in range(iFirst + 1, iLast):
+                dispatches[iPoint] = dispatches[iFirst]
+            return
+        #if the dispatches of the ends are still the cheapest on both sides of the crossing, the line is done
+        iSplit = getSplit(iFirst, iLast)
+        solvePoint(iSplit)
+        solvePoint(iSplit + 1)
+        fillLine(iFirst, iSplit)
+        fillLine(iSplit + 1, iLast)
+
+    solvePoint(0)
+    solvePoint(len(points) - 1)
+    fillLine(0, len(points) - 1)
+
+    results = []
+    names = parsed["names"]
+    for iPoint in range(0, len(points)):
+        result = {FUEL_KEYS["gas_price"]: points[iPoint][0], FUEL_KEYS["kerosine_price"]: points[iPoint][1]}
+        dispatch = dispatches[iPoint]
+        if isinstance(dispatch, tuple):
+            result["globalcost"] = toEuros(getDispatchCost(dispatch, costs[iPoint]))
+            result["plan"] = [{"name": names[iPlant], "p": toMW(dispatch[iPlant])} for iPlant in plant_orders[iPoint]]
+        else:
+            result.update(dispatch)
+        results.append(result)
+    return [results, nSolved]
+
+
+
+def optimiseSweep(data_raw, engine="auto", budget=None):
+    """
+    Function that takes raw JSON data with a 'sweep' of fuel prices (see parseSweep),
+    and returns the plan and global cost for every point of the price grid, kerosine prices first then gas prices.
+    The grid is swept line by line along the fuel with the most prices (see sweepPriceLine).
+    :param data_raw: input data with a sweep of fuel prices
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget shared by the whole sweep, None for no time limit
+    :return: list of results by grid point (the plan, or the error of that point), or a single error if the payload is not valid
+    """
+    errors, parsed, grid = parseSweep(data_raw)
+    if len(errors) > 0:
+        return makeErrorOutput(errors)
+
+    gas_prices = grid["gas_price"]
+    kerosine_prices = grid["kerosine_price"]
+    along_gas = len(gas_prices) >= len(kerosine_prices)
+    results_byPoint = {}
+    nSolved = 0
+    for fixed_price in (kerosine_prices if along_gas else gas_prices):
+        line_prices = sorted(set(gas_prices if along_gas else kerosine_prices))
+        if along_gas:
+            points = [(price, fixed_price) for price in line_prices]
+        else:
+            points = [(fixed_price, price) for price in line_prices]
+        line_results, nLineSolved = sweepPriceLine(parsed, points, engine, budget)
+        nSolved += nLineSolved
+        for iPoint in range(0, len(points)):
+            results_byPoint[points[iPoint]] = line_results[iPoint]
+
+    output = [results_byPoint[(gas_price, kerosine_price)] for kerosine_price in kerosine_prices for gas_price in gas_prices]
+    logging.info("Swept %s price points with %s distinct solves.", len(output), nSolved)
+    return output
@@ -0,0 +1,154 @@
+"""
+In-process cache of whole responses, for identical payloads (retries, several consumers polling the same plan).
+The payloads are canonicalised (key ordering, float normalisation) and hashed, so a duplicate only costs a hash and a dict lookup.
+"""
+#external packages
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+
+#default number of responses kept in the cache
+DEFAULT_RESPONSE_CACHE_SIZE = 1024
+#default time (in seconds) during which a response is reused
+DEFAULT_RESPONSE_CACHE_TTL = 60
+
+
+def normaliseNumbers(data):
+    """
+    Converts all numbers of a JSON object to floats (so that 100 and 100.0 are the same), recursively.
+    Booleans and strings are not changed.
+    :param data: JSON object
+    :return: normalised JSON object
+    """
+    if isinstance(data, dict):
+        return {key: normaliseNumbers(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [normaliseNumbers(value) for value in data]
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        return float(data) + 0.0
+    return data
+
+
+def getPayloadKey(data):
+    """
+    Gets the canonical key of a payload: the hash of its JSON serialisation with sorted keys and normalised numbers.
+    :param data: JSON object
+    :return: (bytes) payload key
+    """
+    canonical = json.dumps(normaliseNumbers(data), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).digest()
+
+
+def isCacheable(data):
+    """
+    Checks if the response to a payload can be taken from (and kept in) the cache.
+    A payload with a 'previous' dispatch is always solved: with 'previous' set to 'last' its response depends on the last
+    dispatch solved for its power plants, and its own dispatch must become the last one (see warmstart.rememberDispatch).
+    :param data: JSON object
+    :return: (boolean) whether the response can be cached
+    """
+    return not (isinstance(data, dict) and data.get("previous") is not None)
+
+
+
+class ResponseCache:
+    """
+    Bounded cache of responses, with an expiry time (TTL), least-recently-used eviction and hit/miss counters.
+    Intialise:  cache = ResponseCache(max_entries, ttl)
+    A max_entries of 0 disables the cache.
+    """
+
+
+    def __init__(self, max_entries=DEFAULT_RESPONSE_CACHE_SIZE, ttl=DEFAULT_RESPONSE_CACHE_TTL):
+        """
+        Initialise ResponseCache object
+        :param max_entries: maximum number of responses kept in the cache
+        :param ttl: time (in seconds) during which a response is reused
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Gets the response stored for a given key, if it has not expired.
+        :param key: payload key (see getPayloadKey)
+        :return: response, or None if there is none
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        """
+        Stores the response for a given key.
+        :param key: payload key (see getPayloadKey)
+        :param response: response to be stored (it must not be modified afterwards)
+        """
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, response)
+            self.entries.move_to_end(key)
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used responses until the cache is within its size.
+        """
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def configure(self, max_entries, ttl):
+        """
+        Changes the maximum number of responses kept in the cache and their time to live.
+        :param max_entries: maximum number of responses
+        :param ttl: time (in seconds) during which a response is reused
+        """
+        with self.lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self.evict()
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Gets the statistics of the cache.
+        :return: dictionary with the size, maximum size, TTL, hits, misses and hit rate
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups > 0 else 0,
+            }
+
+
+
+#cache shared by all requests of the process
+response_cache = ResponseCache()
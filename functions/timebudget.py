@@ -0,0 +1,58 @@
+"""
+Time budget of a solve, for anytime solving: the searches check it regularly, stop when it has run out,
+and return the cheapest solution found so far instead of the proven optimum.
+"""
+#external packages
+import time
+
+
+#number of combinations (or search nodes) evaluated between two checks of the clock
+BUDGET_CHECK_INTERVAL = 256
+
+
+
+class TimeBudget:
+    """
+    Deadline of a solve, and whether the solution returned is proven to be optimal.
+    The budget runs out when the deadline is passed, or when should_stop() returns True (e.g. the client has disconnected).
+    A search that stops early because of the budget sets optimal to False.
+    Intialise:  budget = TimeBudget(
+                                    deadline_ms,
+                                    should_stop
+                                   )
+    """
+    __slots__ = ("deadline", "should_stop", "optimal")
+
+
+    def __init__(self, deadline_ms=None, should_stop=None):
+        """
+        Initialise TimeBudget object
+        :param deadline_ms: time (in milliseconds, from now) after which the search stops, None for no deadline
+        :param should_stop: function without argument returning True when the search must stop, None if not needed
+        """
+        self.deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+        self.should_stop = should_stop
+        self.optimal = True
+
+    def expired(self):
+        """
+        Checks if the budget has run out.
+        :return: (boolean) whether the search must stop
+        """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.should_stop is not None and bool(self.should_stop())
+
+
+
+def isExpired(budget):
+    """
+    Checks if a budget has run out, and if so records that the solution is no longer proven to be optimal.
+    Must only be called when there is still work left to do.
+    :param budget: TimeBudget, or None for no budget
+    :return: (boolean) whether the search must stop
+    """
+    if budget is None or not budget.expired():
+        return False
+    budget.optimal = False
+    return True
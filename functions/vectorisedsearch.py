@@ -0,0 +1,97 @@
+"""
+NumPy-vectorised evaluation of the interval combinations of a subset of cost tiers (see optimisation.bruteForceSolution).
+All combinations are decoded, checked and costed as integer arrays (power units and cost units, see models.units),
+so the checks and the costs are exact, and only the cheapest combination is returned.
+NumPy is optional: if it is not installed, isAvailable() returns False and the combinations are evaluated one by one.
+"""
+#external packages
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#internal packages
+from functions.timebudget import isExpired
+
+
+#number of combinations evaluated at once, to bound the memory used
+COMBINATIONS_PER_CHUNK = 1 << 16
+
+
+def isAvailable():
+    """
+    Checks if NumPy could be imported.
+    :return: (boolean) whether the vectorised search can be used
+    """
+    return np is not None
+
+
+def findBestCombination(load, subset, plants_byCostTier, power_ranges_byCostTier, budget=None):
+    """
+    Function that finds the cheapest combination of intervals, with exactly one interval from each tier of the subset.
+    For every combination (in the order used by bruteForceSolution), as arrays:
+    (1) The feasibility mask: giving each tier at least its minimum power (and at least 1 unit), the load can be reached with ALL tiers
+    (this is checkIfAllNeeded, for single intervals the reachable range after subtraction is [0, sum of the headrooms]).
+    (2) The greedy-fill cost: each tier gets its minimum power, then the remaining load fills the headroom of the tiers in merit order.
+    Then the argmin of the costs (first one in case of a tie) is taken.
+    The time budget is checked between chunks: when it runs out, the cheapest combination of the chunks evaluated so far is returned.
+    :param load: total load to be distributed, in power units
+    :param subset: subset of tiers to be considered (in increasing order)
+    :param plants_byCostTier: list of plants by cost tier
+    :param power_ranges_byCostTier: list of power ranges by cost tier
+    :param budget: TimeBudget of the solve, None for no time limit
+    :return: [ index of the interval chosen in each tier of the subset (None if no combination is feasible), number of combinations evaluated ]
+    """
+    nSub = len(subset)
+    tier_mins = []
+    tier_maxs = []
+    divides = np.empty(nSub, dtype=np.int64)
+    modulos = np.empty(nSub, dtype=np.int64)
+    costs = np.empty(nSub, dtype=np.int64)
+    number_of_combinations = 1
+    for iSub in range(0, nSub):
+        iTier = subset[iSub]
+        tier_mins.append(np.array([interval[0] for interval in power_ranges_byCostTier[iTier]], dtype=np.int64))
+        tier_maxs.append(np.array([interval[1] for interval in power_ranges_byCostTier[iTier]], dtype=np.int64))
+        divides[iSub] = number_of_combinations
+        modulos[iSub] = len(power_ranges_byCostTier[iTier])
+        costs[iSub] = plants_byCostTier[iTier][0].cost
+        number_of_combinations = number_of_combinations * len(power_ranges_byCostTier[iTier])
+
+    #cost of the infeasible combinations, above any feasible one
+    infeasible_cost = np.iinfo(np.int64).max
+    best_cost = infeasible_cost
+    best_combination = None
+    nEvaluated = 0
+    for start in range(0, number_of_combinations, COMBINATIONS_PER_CHUNK):
+        if start > 0 and isExpired(budget):
+            break
+        stop = min(start + COMBINATIONS_PER_CHUNK, number_of_combinations)
+        nEvaluated = stop
+        interval_indices = (np.arange(start, stop, dtype=np.int64)[:, None] // divides) % modulos
+        mins = np.empty(interval_indices.shape, dtype=np.int64)
+        maxs = np.empty(interval_indices.shape, dtype=np.int64)
+        for iSub in range(0, nSub):
+            mins[:, iSub] = tier_mins[iSub][interval_indices[:, iSub]]
+            maxs[:, iSub] = tier_maxs[iSub][interval_indices[:, iSub]]
+
+        #(1) feasibility mask
+        needed_mins = np.maximum(mins, 1)
+        load_after_needed = load - needed_mins.sum(axis=1)
+        feasible = (load_after_needed >= 0) & (load_after_needed <= (maxs - needed_mins).sum(axis=1))
+
+        #(2) greedy-fill cost
+        headrooms = maxs - mins
+        remaining_load = load - mins.sum(axis=1)
+        headroom_before = np.cumsum(headrooms, axis=1) - headrooms
+        fills = np.clip(remaining_load[:, None] - headroom_before, 0, headrooms)
+        feasible &= (remaining_load >= 0) & (remaining_load <= headrooms.sum(axis=1))
+        global_costs = (mins + fills) @ costs
+        global_costs[~feasible] = infeasible_cost
+
+        iBest = int(np.argmin(global_costs))
+        if global_costs[iBest] < best_cost:
+            best_cost = global_costs[iBest]
+            best_combination = [int(index) for index in interval_indices[iBest]]
+
+    return [best_combination, nEvaluated]
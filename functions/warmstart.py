@@ -0,0 +1,157 @@
+"""
+Warm start of a solve from a previous dispatch of the same power plants, e.g. the dispatch of the previous quarter-hour.
+The plants switched on in the previous dispatch are kept on, and the load is split again between them (local repair).
+The repaired dispatch is the first incumbent of the search: it is returned straight away if its cost is the lower bound
+of the fleet, otherwise only solutions cheaper than it are searched for.
+The powers are in power units (0.1 MW) and the costs integers (see models.units).
+"""
+#internal packages
+from functions.branchandbound import getPlantData, dispatchCommittedPlants, getLowerBound
+from functions.fleetcache import dispatch_cache, getDispatchKey
+
+
+#value of 'previous' in the payload for the last dispatch solved with the same power plants
+LAST_DISPATCH = "last"
+
+
+
+class WarmStart:
+    """
+    Plants switched on in the previous dispatch of a fleet, by index of the plants in the payload.
+    After a solve, it holds the plants switched on in the new dispatch, so that it can warm-start the next solve
+    (e.g. the next timestep of a time series).
+    Intialise:  warm_start = WarmStart(committed)
+    """
+    __slots__ = ("committed",)
+
+
+    def __init__(self, committed=None):
+        """
+        Initialise WarmStart object
+        :param committed: set of indices of the plants switched on, None for a cold start
+        """
+        self.committed = committed
+
+    @classmethod
+    def fromPrevious(cls, previous, names):
+        """
+        Builds a WarmStart from a previous dispatch given in the payload (the output of a solve).
+        The plants are matched by name; plants with the same name are matched in order of appearance.
+        :param previous: list of [ name, power in MW ] (see optimisation.parsePayload)
+        :param names: names of the plants of the payload, in input order
+        :return: WarmStart
+        """
+        indices_byName = {}
+        for iPlant in range(0, len(names)):
+            indices_byName.setdefault(names[iPlant], []).append(iPlant)
+        committed = set()
+        for name, power in previous:
+            indices = indices_byName.get(name)
+            if not indices:
+                continue
+            iPlant = indices.pop(0)
+            if power > 0:
+                committed.add(iPlant)
+        return cls(committed)
+
+    def remember(self, used_plants):
+        """
+        Keeps the plants switched on in a new dispatch, for the next solve.
+        :param used_plants: list of PowerPlant objects used by the dispatch, with their power set
+        """
+        self.committed = set([plant.index for plant in used_plants if plant.p > 0])
+
+
+
+def getWarmStart(parsed):
+    """
+    Gets the warm start of a payload: the previous dispatch given under 'previous',
+    the last dispatch solved with the same power plants if 'previous' is 'last' (see rememberDispatch), or a cold start.
+    :param parsed: parsed data (see optimisation.parsePayload)
+    :return: WarmStart
+    """
+    previous = parsed["previous"]
+    if previous is None:
+        return WarmStart()
+    if previous == LAST_DISPATCH:
+        entry = dispatch_cache.get(getDispatchKey(parsed), lambda: {"committed": None})
+        return WarmStart(entry["committed"])
+    return WarmStart.fromPrevious(previous, parsed["names"])
+
+
+def rememberDispatch(parsed, warm_start):
+    """
+    Keeps the dispatch of a solve as the last dispatch of its power plants, for a later payload with 'previous' set to 'last'.
+    :param parsed: parsed data (see optimisation.parsePayload)
+    :param warm_start: WarmStart updated by the solve
+    """
+    if warm_start.committed is None:
+        return
+    setLastDispatch([getDispatchKey(parsed), warm_start.committed])
+
+
+def setLastDispatch(dispatch):
+    """
+    Keeps a dispatch as the last dispatch of its power plants, e.g. the dispatch kept with a cached response (see optimisation.getResponseDispatch).
+    :param dispatch: [ dispatch key (see fleetcache.getDispatchKey), set of indices of the plants switched on ]
+    """
+    key, committed = dispatch
+    entry = dispatch_cache.get(key, lambda: {"committed": None})
+    entry["committed"] = committed
+
+
+
+def repairDispatch(load_units, ordered_plants, wind_pc, committed):
+    """
+    Function that splits a load between the plants of a previous dispatch (local repair).
+    All committed plants get their minimum power, then the rest of the load is given in merit order (see dispatchCommittedPlants),
+    which is the cheapest dispatch keeping the same plants on.
+    :param load_units: load in power units
+    :param ordered_plants: list of PowerPlant objects sorted by cost, with their cost already set
+    :param wind_pc: wind percentage
+    :param committed: set of indices of the plants switched on
+    :return: [ whether the load can be split, cost, list of [ PowerPlant, power in power units ] ]
+    """
+    plant_data = []
+    for plant in ordered_plants:
+        if plant.index in committed:
+            power_range = plant.getRange(wind_pc)
+            plant_data.append([plant, plant.cost, power_range["min"], power_range["max"]])
+    if len(plant_data) == 0:
+        return [False, 0, []]
+    dispatch = dispatchCommittedPlants(load_units, plant_data, [True] * len(plant_data))
+    if not dispatch[0]:
+        return [False, 0, []]
+    powers = [[plant_data[iPlant][0], dispatch[2][iPlant]] for iPlant in range(0, len(plant_data))]
+    return [True, dispatch[1], powers]
+
+
+def isLowerBound(cost, load_units, ordered_plants, wind_pc):
+    """
+    Checks if a cost is the lower bound of the fleet: the load given in merit order to the full range of the plants, pmin ignored
+    (see branchandbound.getLowerBound). A dispatch of that cost is optimal.
+    :param cost: cost of a dispatch
+    :param load_units: load in power units
+    :param ordered_plants: list of PowerPlant objects sorted by cost, with their cost already set
+    :param wind_pc: wind percentage
+    :return: (boolean) whether the cost is the lower bound
+    """
+    lower_bound = getLowerBound(load_units, getPlantData(ordered_plants, wind_pc, load_units), [])
+    return lower_bound[0] and cost <= lower_bound[1]
+
+
+def applyDispatch(ordered_plants, powers):
+    """
+    Assigns the powers of a repaired dispatch to the PowerPlant objects, the other plants get a power of zero.
+    :param ordered_plants: list of PowerPlant objects
+    :param powers: list of [ PowerPlant, power in power units ] (see repairDispatch)
+    :return: list of PowerPlant objects used by the dispatch
+    """
+    for plant in ordered_plants:
+        plant.p = 0
+    used_plants = []
+    for plant, power in powers:
+        if power > 0:
+            plant.setPower(power)
+            used_plants.append(plant)
+    return used_plants
@@ -0,0 +1,299 @@
+"""
+Wind-scenario ensemble: one load solved for a list of wind percentages (e.g. the scenarios of a wind forecast),
+with the plan of each scenario and statistics of the global cost over the scenarios.
+Only the cost tiers holding wind turbines depend on the wind, so everything else is prepared once for all scenarios:
+the merit order, the cost tiers, the power ranges of the other tiers, and the ranges of the first tiers before the first wind tier.
+The power of the wind turbines is computed for all scenarios in one pass (with NumPy if it is installed),
+and scenarios where all turbines give the same power are only solved once.
+With 'auto' or 'dp', and as long as its table isn't too large, the table of minimal costs of the plants without wind is built once
+(in reverse merit order), and each scenario only combines it with the wind powers reachable by its turbines (see solveWithWindFreeTable).
+The cost of the dispatch is the same as with an independent solve, but among dispatches of the same cost, another one may be chosen.
+"""
+#internal packages
+from models.fleet import WINDTURBINE
+from models.units import toPowerUnits, toEuros, getWindPowers
+from functions.intervalops import IntervalSet
+from functions.optimisation import parsePayload, makeErrorOutput, makeOrderedPlants, makeListOfCostTiers, getPowerRanges, solveLoad
+from functions.optimisation import tryGoldenPath, makeOutputList, getAutoEngine
+from functions.dynamicprogramming import addPlantsToCosts, setPowersFromChoices, getGridRange, isTableTooLarge
+import functions.metrics as metrics
+
+# external packages
+import logging
+import math
+import statistics
+import time
+
+
+#above this number of scenarios, the ensemble is refused
+MAX_SCENARIOS = 10000
+#percentiles of the global cost given in the statistics
+COST_PERCENTILES = [5, 50, 95]
+
+
+
+def checkEnsembleForErrors(data):
+    """
+    Function that checks the scenarios of an ensemble payload: 'wind(%)' must be a non-empty list of percentages, and 'load' a single value.
+    :param data: input data
+    :return: [ list of error messages, list of wind percentages ]
+    """
+    errors = []
+    try:
+        wind_pcs = data["fuels"]["wind(%)"]
+    except (KeyError, TypeError):
+        #reported by parsePayload
+        return [errors, []]
+    if isinstance(data.get("load"), list):
+        errors.append("An ensemble needs a single load, not a time series. Check JSON file.")
+    if not isinstance(wind_pcs, list) or len(wind_pcs) == 0:
+        errors.append("The 'wind(%)' scenarios of an ensemble need to be a non-empty list. Check JSON file.")
+        return [errors, []]
+    if len(wind_pcs) > MAX_SCENARIOS:
+        errors.append("Too many wind scenarios. At most %s scenarios are allowed." %MAX_SCENARIOS)
+        return [errors, []]
+    try:
+        wind_pcs = [float(wind_pc) for wind_pc in wind_pcs]
+    except (TypeError, ValueError):
+        errors.append("Value error in the 'wind(%)' scenarios. Expecting floats. Check JSON file.")
+        return [errors, []]
+    for wind_pc in wind_pcs:
+        if wind_pc < 0 or wind_pc > 100:
+            errors.append("Wind percentage '%s' not valid. Value needs to be between 0 and 100. Check JSON." %wind_pc)
+            break
+    return [errors, wind_pcs]
+
+
+
+def getCostStatistics(costs, nScenarios):
+    """
+    Function that summarises the global costs of the scenarios which have a solution.
+    The percentiles are taken by nearest rank.
+    :param costs: global cost of each scenario with a solution
+    :param nScenarios: number of scenarios, with or without a solution
+    :return: dictionary of statistics
+    """
+    cost_statistics = {
+        "scenarios": nScenarios,
+        "solved": len(costs),
+        "unsolved": nScenarios - len(costs),
+    }
+    if len(costs) == 0:
+        return cost_statistics
+    sorted_costs = sorted(costs)
+    cost_statistics["mean"] = round(statistics.fmean(sorted_costs), 2)
+    cost_statistics["std"] = round(statistics.pstdev(sorted_costs), 2)
+    cost_statistics["min"] = sorted_costs[0]
+    cost_statistics["max"] = sorted_costs[-1]
+    for percentile in COST_PERCENTILES:
+        iRank = max(math.ceil(percentile / 100 * len(sorted_costs)) - 1, 0)
+        cost_statistics["p%s" % percentile] = sorted_costs[iRank]
+    return cost_statistics
+
+
+
+def optimiseWindEnsemble(data_raw, engine="auto", budget=None):
+    """
+    Function that takes raw JSON data where 'wind(%)' is a list of scenarios (and 'load' a single value),
+    and returns the plan and global cost of each scenario, and statistics of the global cost (see getCostStatistics).
+    :param data_raw: input data with a list of wind scenarios
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param budget: TimeBudget shared by all scenarios, None for no time limit
+    :return: { 'scenarios': list of JSON solutions or errors, 'statistics': ... }, or a single error if the payload is not valid
+    """
+    stage_start = time.perf_counter()
+    errors, wind_pcs = checkEnsembleForErrors(data_raw)
+    for error in errors:
+        logging.error(error)
+    #the rest of the payload is checked with the first scenario (the scenarios are checked above)
+    data = data_raw
+    if isinstance(data_raw, dict) and isinstance(data_raw.get("fuels"), dict) and isinstance(data_raw["fuels"].get("wind(%)"), list):
+        data = dict(data_raw)
+        data["fuels"] = dict(data_raw["fuels"])
+        data["fuels"]["wind(%)"] = wind_pcs[0] if len(wind_pcs) > 0 else 0
+    payload_errors, parsed = parsePayload(data)
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "validation")
+    if len(payload_errors + errors) > 0:
+        return makeErrorOutput(payload_errors + errors)
+
+    #everything which doesn't depend on the wind
+    stage_start = time.perf_counter()
+    ordered_plants = makeOrderedPlants(parsed)
+    plants_byCostTier = makeListOfCostTiers(ordered_plants)
+    nTiers = len(plants_byCostTier)
+    wind_tiers = [iTier for iTier in range(0, nTiers) if any(plant.fleet.types[plant.index] == WINDTURBINE for plant in plants_byCostTier[iTier])]
+    fixed_ranges = getPowerRanges(plants_byCostTier, 0)
+    nFixedPrefix = wind_tiers[0] if len(wind_tiers) > 0 else nTiers
+    fixed_prefix_ranges = []
+    tmp_pow_ran = IntervalSet()
+    for iTier in range(0, nFixedPrefix):
+        tmp_pow_ran = tmp_pow_ran.add(fixed_ranges[iTier])
+        fixed_prefix_ranges.append(tmp_pow_ran)
+    turbines = [plant for iTier in wind_tiers for plant in plants_byCostTier[iTier] if plant.fleet.types[plant.index] == WINDTURBINE]
+    wind_powers = getWindPowers([plant.pmax for plant in turbines], wind_pcs)
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "power_ranges")
+
+    #the table of the plants without wind is shared by all scenarios, unless it is too large or another engine is asked for
+    load_units = toPowerUnits(parsed["load"])
+    use_table = engine in ("auto", "dp") and not isTableTooLarge(len(ordered_plants), load_units)
+    if engine == "auto":
+        engine = getAutoEngine(len(ordered_plants), nTiers, load_units)
+    wind_free = {
+        "plants": [plant for plant in reversed(ordered_plants) if plant.fleet.types[plant.index] != WINDTURBINE],
+        "table": None,
+        "reachable": 0,
+    }
+
+    #scenarios giving the same power for every turbine have the same solution
+    outputs_byPowers = {}
+    scenarios = []
+    costs = []
+    for iScenario in range(0, len(wind_pcs)):
+        powers = wind_powers[iScenario]
+        if not powers in outputs_byPowers:
+            wind_pc = wind_pcs[iScenario]
+            fleet = makeScenarioFleet(ordered_plants, plants_byCostTier, fixed_ranges, fixed_prefix_ranges, wind_tiers, wind_pc, powers)
+            output = None
+            if use_table and load_units in fleet["global_power_range"] \
+                    and not tryGoldenPath(load_units, plants_byCostTier, fleet["power_ranges_byCostTier"])[0]:
+                output = solveWithWindFreeTable(parsed["load"], fleet, turbines, wind_free, budget)
+            if output is None:
+                #out of range, obvious solution, or no time left to build the table (the dynamic programme then dispatches greedily)
+                output = solveLoad(parsed["load"], fleet, engine, budget)
+            global_cost = None
+            if isinstance(output, list):
+                global_cost = toEuros(sum(toPowerUnits(output[iPlant]["p"]) * ordered_plants[iPlant].cost for iPlant in range(0, len(output))))
+            outputs_byPowers[powers] = [output, global_cost]
+        output, global_cost = outputs_byPowers[powers]
+
+        scenario = {"wind(%)": wind_pcs[iScenario]}
+        if global_cost is None:
+            scenario.update(output)
+        else:
+            scenario["globalcost"] = global_cost
+            scenario["plan"] = output
+            costs.append(global_cost)
+        scenarios.append(scenario)
+
+    logging.info("Solved %s wind scenarios with %s distinct solves.", len(wind_pcs), len(outputs_byPowers))
+    return {"scenarios": scenarios, "statistics": getCostStatistics(costs, len(wind_pcs))}
+
+
+
+def makeScenarioFleet(ordered_plants, plants_byCostTier, fixed_ranges, fixed_prefix_ranges, wind_tiers, wind_pc, powers):
+    """
+    Function that makes the fleet dictionary of one wind scenario (see optimisation.prepareFleet),
+    from the ranges which don't depend on the wind and the power of the wind turbines.
+    :param ordered_plants: list of plants sorted by cost, shared by all scenarios
+    :param plants_byCostTier: list of cost tiers, shared by all scenarios
+    :param fixed_ranges: power ranges by cost tier, of which those of the wind tiers are replaced
+    :param fixed_prefix_ranges: power ranges of the first n tiers, for the first tiers before the first wind tier
+    :param wind_tiers: indices of the tiers holding wind turbines
+    :param wind_pc: wind percentage of the scenario
+    :param powers: power of each wind turbine (in the order of the wind tiers), in power units
+    :return: fleet dictionary
+    """
+    power_ranges_byCostTier = list(fixed_ranges)
+    iTurbine = 0
+    for iTier in wind_tiers:
+        tier_range = IntervalSet()
+        for plant in plants_byCostTier[iTier]:
+            if plant.fleet.types[plant.index] == WINDTURBINE:
+                plant_range = IntervalSet([[powers[iTurbine], powers[iTurbine]]])
+                iTurbine += 1
+            else:
+                plant_range = IntervalSet([[plant.getRange(wind_pc)["min"], plant.getRange(wind_pc)["max"]]])
+            tier_range = tier_range.add(plant_range)
+        power_ranges_byCostTier[iTier] = tier_range
+
+    tmp_pow_ran = IntervalSet()
+    for iTier in range(0, len(power_ranges_byCostTier)):
+        if iTier < len(fixed_prefix_ranges):
+            tmp_pow_ran = fixed_prefix_ranges[iTier]
+        else:
+            tmp_pow_ran = tmp_pow_ran.add(power_ranges_byCostTier[iTier])
+
+    fleet = {
+        "ordered_plants": ordered_plants,
+        "plants_byCostTier": plants_byCostTier,
+        "wind_pc": wind_pc,
+        "power_ranges_byCostTier": power_ranges_byCostTier,
+        "global_power_range": tmp_pow_ran,
+    }
+    return fleet
+
+
+
+def solveWithWindFreeTable(load, fleet, turbines, wind_free, budget=None):
+    """
+    Function that distributes a load to the fleet of one wind scenario with the dynamic programme (see dynamicProgrammingSolution),
+    reusing the table of minimal costs of the plants without wind, which is built by the first scenario that needs it.
+    The minimal cost of a load doesn't depend on the order in which the plants are added, so the wind turbines are added last.
+    They cost nothing and have a single power each, so only the wind powers reachable by a set of turbines matter:
+    these are kept as a bitset (bit w set if w is reachable), one shift-or per turbine.
+    The cheapest split of the load is then the wind power w, reachable by both the turbines and (for load - w) the plants without wind,
+    with the lowest cost in the table (the most wind among equal costs).
+    The turbines of the split are backtracked from the bitsets, and the other plants from the table.
+    :param load: total load to be distributed, in MW
+    :param fleet: fleet dictionary of the scenario (see makeScenarioFleet)
+    :param turbines: list of wind turbines
+    :param wind_free: dictionary with the plants without wind (in reverse merit order), their table and its reachable loads
+    :param budget: TimeBudget shared by all scenarios, None for no time limit
+    :return: JSON solution or error, None if the time budget ran out before the end of the table
+    """
+    start = time.perf_counter()
+    logging.info("Load is '%s'.", load)
+    logging.info("Found no straightforward solution, using dynamic programming on the plants without wind.")
+    load_units = toPowerUnits(load)
+    if wind_free["table"] is None:
+        costs = [None] * (load_units + 1)
+        costs[0] = 0
+        wind_free["table"] = addPlantsToCosts(costs, wind_free["plants"], fleet["wind_pc"], load_units, budget)
+        if wind_free["table"] is not None:
+            #bit w is set if load - w is reachable without wind
+            wind_free["reachable"] = int("".join(["0" if cost is None else "1" for cost in wind_free["table"][0]]), 2)
+    if wind_free["table"] is None:
+        logging.info("Time budget exhausted before the end of the table of the plants without wind.")
+        return None
+    wind_free_costs, wind_free_choices = wind_free["table"]
+
+    mask = (1 << (load_units + 1)) - 1
+    reachable_byTurbine = []
+    reachable = 1
+    for plant in turbines:
+        grid_range = getGridRange(plant, fleet["wind_pc"], load_units)
+        if grid_range is not None:
+            reachable |= (reachable << grid_range[0]) & mask
+        reachable_byTurbine.append(reachable)
+
+    best_units = None
+    candidates = reachable & wind_free["reachable"]
+    while candidates:
+        wind_units = candidates.bit_length() - 1
+        candidates ^= 1 << wind_units
+        if best_units is None or wind_free_costs[load_units - wind_units] < wind_free_costs[load_units - best_units]:
+            best_units = wind_units
+    metrics.stage_duration.observe(time.perf_counter() - start, "search")
+
+    if best_units is None:
+        error_output = "Unable to distribute load. No solution found."
+        logging.error(error_output)
+        metrics.solve_duration.observe(time.perf_counter() - start, "dp")
+        return {"msg:": error_output}
+    logging.info("Solution total cost: %s", toEuros(wind_free_costs[load_units - best_units]))
+
+    stage_start = time.perf_counter()
+    remaining_units = best_units
+    for iTurbine in range(len(turbines) - 1, -1, -1):
+        plant = turbines[iTurbine]
+        plant.p = 0
+        reachable_before = reachable_byTurbine[iTurbine - 1] if iTurbine > 0 else 1
+        if (reachable_before >> remaining_units) & 1 == 0:
+            power_units = getGridRange(plant, fleet["wind_pc"], load_units)[0]
+            plant.setPower(power_units)
+            remaining_units -= power_units
+    setPowersFromChoices(wind_free["plants"], wind_free_choices, load_units - best_units)
+    output = makeOutputList(fleet["plants_byCostTier"], fleet["ordered_plants"])
+    metrics.stage_duration.observe(time.perf_counter() - stage_start, "distribution")
+    metrics.solve_duration.observe(time.perf_counter() - start, "dp")
+    return output
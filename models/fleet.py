@@ -0,0 +1,241 @@
+# flask packages
+
+# project resources
+from models.units import toPowerUnits, toCostUnits, COST_UNITS_PER_EURO, getWindPowers
+
+# external packages
+from array import array
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+#type codes of the power plants
+WINDTURBINE = 0
+GASFIRED = 1
+TURBOJET = 2
+TYPE_CODES = {"windturbine": WINDTURBINE, "gasfired": GASFIRED, "turbojet": TURBOJET}
+TYPE_NAMES = ["windturbine", "gasfired", "turbojet"]
+#from this number of plants, the costs are computed with NumPy (below, the cost of its calls is higher than the gain)
+VECTORISE_MIN_PLANTS = 32
+
+
+
+class Fleet:
+    """
+    Compact (struct-of-arrays) representation of a list of power plants.
+    Each property of the plants is held in one column: type codes, efficiency, pmin, pmax, cost and power.
+    The powers are integers in power units (0.1 MW) and the costs per MWh integers in cost units (cents), see models.units:
+    they are converted once when the fleet is built.
+    The costs are computed column by column for the whole fleet, and the type strings are only looked at once.
+    The power of the wind turbines is computed for all plants at once for a wind percentage (see setWind), and kept until it changes.
+    Per-plant access goes through PlantView objects, which have the same interface as PowerPlant.
+    Intialise:  new_fleet = Fleet(
+                                names,
+                                types,
+                                efficiencies,
+                                pmins,
+                                pmaxs
+                               )
+    """
+    __slots__ = ("names", "types", "efficiency", "pmin", "pmax", "cost", "p", "views", "wind_pc", "wind_p")
+
+
+    def __init__(self, names, types, efficiencies, pmins, pmaxs):
+        """
+        Initialise Fleet object
+        :param names: (list of str) power plant names
+        :param types: (list of str) power plant types, must be one of 'gasfired', 'turbojet', 'windturbine'
+        :param efficiencies: (list of float) power plant efficiencies, must verify 0 < efficiency <= 1
+        :param pmins: (list of float) minimum power of the plants in MW, must be positive
+        :param pmaxs: (list of float) maximum power of the plants in MW, must be positive and higher than pmin
+        """
+        nPlants = len(names)
+        self.names = list(names)
+        self.types = array('b', [TYPE_CODES[ttype] for ttype in types])
+        self.efficiency = array('d', efficiencies)
+        self.pmin = array('q', [toPowerUnits(pmin) for pmin in pmins])
+        self.pmax = array('q', [toPowerUnits(pmax) for pmax in pmaxs])
+        #same convention as PowerPlant: a plant without efficiency can't supply power
+        for iPlant in range(0, nPlants):
+            if self.efficiency[iPlant] <= 0:
+                self.pmin[iPlant] = 0
+                self.pmax[iPlant] = 0
+        self.cost = array('q', bytes(8 * nPlants))
+        self.p = array('q', bytes(8 * nPlants))
+        self.views = [PlantView(self, iPlant) for iPlant in range(0, nPlants)]
+        self.wind_pc = None
+        self.wind_p = None
+
+    def copy(self):
+        """
+        Makes a Fleet with the same plants, but its own costs and powers, so that it can be solved independently.
+        The columns which never change after initialisation are shared, as well as the wind powers (which are replaced, never changed).
+        :return: Fleet
+        """
+        nPlants = len(self.names)
+        new_fleet = Fleet.__new__(Fleet)
+        new_fleet.names = self.names
+        new_fleet.types = self.types
+        new_fleet.efficiency = self.efficiency
+        new_fleet.pmin = self.pmin
+        new_fleet.pmax = self.pmax
+        new_fleet.cost = array('q', self.cost)
+        new_fleet.p = array('q', bytes(8 * nPlants))
+        new_fleet.views = [PlantView(new_fleet, iPlant) for iPlant in range(0, nPlants)]
+        new_fleet.wind_pc = self.wind_pc
+        new_fleet.wind_p = self.wind_p
+        return new_fleet
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def setCosts(self, gas_price, kerosine_price):
+        """
+        Sets the cost per MWh of all plants (in cost units), given fuel prices.
+        From VECTORISE_MIN_PLANTS plants, and if NumPy is installed, the column is computed with array operations
+        (rounded half to even like toCostUnits, so the costs are the same).
+        :param gas_price: gas price
+        :param kerosine_price: kerosine price
+        """
+        fuel_prices = [0, gas_price, kerosine_price]
+        if np is None or len(self.names) < VECTORISE_MIN_PLANTS:
+            self.cost = array('q', [
+                toCostUnits(fuel_prices[code] / efficiency) if efficiency > 0 else 0
+                for code, efficiency in zip(self.types, self.efficiency)
+            ])
+            return
+
+        prices = np.asarray(fuel_prices, dtype=np.float64)[np.frombuffer(self.types, dtype=np.int8)]
+        efficiencies = np.frombuffer(self.efficiency, dtype=np.float64)
+        powered = efficiencies > 0
+        costs = np.zeros(len(efficiencies), dtype=np.int64)
+        costs[powered] = np.rint(prices[powered] / efficiencies[powered] * COST_UNITS_PER_EURO)
+        self.cost = array('q', costs.tobytes())
+
+    def setWind(self, wind_pc):
+        """
+        Computes the power of the wind turbines for a wind percentage, for all plants in one pass (see getWindPowers).
+        Nothing is computed if the wind percentage is the same as the last time.
+        :param wind_pc: wind percentage
+        :return: (tuple) power of each plant at that wind (only meaningful for wind turbines), in power units
+        """
+        if self.wind_p is None or self.wind_pc != wind_pc:
+            self.wind_p = getWindPowers(self.pmax, [wind_pc])[0]
+            self.wind_pc = wind_pc
+        return self.wind_p
+
+    def meritOrder(self):
+        """
+        Gets the plants sorted by cost (plants with the same cost keep their input order).
+        :return: list of PlantView objects
+        """
+        order = sorted(range(0, len(self.names)), key=self.cost.__getitem__)
+        return [self.views[iPlant] for iPlant in order]
+
+
+
+class PlantView:
+    """
+    View on one plant of a Fleet, with the interface of PowerPlant.
+    The values are read from (and the power written to) the columns of the fleet, in power units and cost units.
+    """
+    __slots__ = ("fleet", "index")
+
+
+    def __init__(self, fleet, index):
+        """
+        Initialise PlantView object
+        :param fleet: Fleet the plant belongs to
+        :param index: index of the plant in the fleet
+        """
+        self.fleet = fleet
+        self.index = index
+
+    @property
+    def name(self):
+        return self.fleet.names[self.index]
+
+    @property
+    def ttype(self):
+        return TYPE_NAMES[self.fleet.types[self.index]]
+
+    @property
+    def efficiency(self):
+        return self.fleet.efficiency[self.index]
+
+    @property
+    def pmin(self):
+        return self.fleet.pmin[self.index]
+
+    @property
+    def pmax(self):
+        return self.fleet.pmax[self.index]
+
+    @property
+    def cost(self):
+        return self.fleet.cost[self.index]
+
+    @property
+    def p(self):
+        return self.fleet.p[self.index]
+
+    @p.setter
+    def p(self, power):
+        self.fleet.p[self.index] = power
+
+    def checkPower(self, power, wind_pc):
+        """
+        Check if the plant can supply this amount of power, given a wind percentage
+        :param power: power to be checked, in power units
+        :param wind_pc: wind percentage
+        :return: (boolean) checkPower
+        """
+        power_range = self.getRange(wind_pc)
+        return power_range["min"] <= power <= power_range["max"]
+
+    def setPower(self, power):
+        """
+        Set the power supplied to the plant to a given number.
+        Only numbers between pmin and pmax are allowed, a ValueError is raised otherwise.
+        :param power: power to be supplied, in power units
+        """
+        if self.pmin <= power <= self.pmax:
+            self.p = power
+        else:
+            raise ValueError("Illegal power value %s for power plant '%s', outside of [%s, %s]" % (power, self.name, self.pmin, self.pmax))
+
+    def setCost(self, cost):
+        """
+        Set the cost (per MWh) of the power plant.
+        Only positive numbers are allowed, a ValueError is raised otherwise.
+        :param cost: cost to be set, in cost units
+        """
+        if cost >= 0:
+            self.fleet.cost[self.index] = cost
+        else:
+            raise ValueError("Illegal (negative) cost value %s for power plant '%s'" % (cost, self.name))
+
+    def getRange(self, wind_pc):
+        """
+        Get range of power that can effectively be supplied by the plant, given a wind percentage.
+        For a windturbine type, this will differ for pmin and pmax: the power is read from the wind powers of the fleet (see Fleet.setWind).
+        :param wind_pc: wind percentage
+        :return: power range, in power units
+        """
+        if self.fleet.types[self.index] == WINDTURBINE:
+            min_power = self.fleet.setWind(wind_pc)[self.index]
+            max_power = min_power
+        else:
+            min_power = self.fleet.pmin[self.index]
+            max_power = self.fleet.pmax[self.index]
+        power_range = {"min": min_power, "max": max_power}
+        return power_range
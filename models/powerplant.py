@@ -1,6 +1,7 @@
 # flask packages
 
 # project resources
+from models.units import toPowerUnits, toCostUnits, getWindUnits
 
 # external packages
 
@@ -9,6 +10,7 @@
 class PowerPlant:
     """
     Template for a power plant as defined by the problem set.
+    The powers are held in power units (0.1 MW) and the cost per MWh in cost units (cents), see models.units.
     Intialise:  new_powerplant = PowerPlant(
 		                            name,
 		                            type,
@@ -25,14 +27,14 @@ class PowerPlant:
         :param name: (str) power plant name
         :param ttype: (str) power plant type, must be one of 'gasfired', 'turbojet', 'windturbine'
         :param efficiency: (float) power plant efficiency, must verify 0 < efficiency <= 1
-        :param pmin: (float) minimum power for the plant, must be positive
-        :param pmax: (float) maximum power for the plant, must be positive and higher than pmin
+        :param pmin: (float) minimum power for the plant in MW, must be positive
+        :param pmax: (float) maximum power for the plant in MW, must be positive and higher than pmin
         """
         self.name = name
         self.ttype = ttype
         self.efficiency = efficiency
-        self.pmin = pmin
-        self.pmax = pmax
+        self.pmin = toPowerUnits(pmin)
+        self.pmax = toPowerUnits(pmax)
         if (efficiency <= 0):
             self.pmin = 0
             self.pmax = 0
@@ -41,18 +43,17 @@ class PowerPlant:
     def checkPower(self, power, wind_pc):
         """
         Check if the plant can supply this amount of power, given a wind percentage
-        :param power: power to be checked
+        :param power: power to be checked, in power units
         :param wind_pc: wind percentage
         :return: (boolean) checkPower
         """
         allowed = False
 
         if self.ttype == "windturbine":
-            wind_power = self.pmax * wind_pc/100
-            if round(power, 1) == round(wind_power, 1):
+            if power == getWindUnits(self.pmax, wind_pc):
                 allowed = True
         elif (self.ttype == "gasfired" or self.ttype == "turbojet"):
-            if round(power, 1) <= self.pmax and round(power, 1) >= self.pmin:
+            if power <= self.pmax and power >= self.pmin:
                 allowed = True
         else:
             pass
@@ -62,33 +63,31 @@ class PowerPlant:
     def setPower(self, power):
         """
         Set the power supplied to the plant to a given number.
-        Only numbers between pmin and pmax are allowed
-        :param power: power to be supplied
-        :param wind_pc: wind percentage
+        Only numbers between pmin and pmax are allowed, a ValueError is raised otherwise.
+        :param power: power to be supplied, in power units
         """
-        power = round(power, 1)
-        if round(self.pmin, 1) <= power <= round(self.pmax, 1):
+        if self.pmin <= power <= self.pmax:
             self.p = power
         else:
-            print("Illegal power value") #raise error
+            raise ValueError("Illegal power value %s for power plant '%s', outside of [%s, %s]" % (power, self.name, self.pmin, self.pmax))
 
     def setCost(self, cost):
         """
         Set the cost (per MWh) of the power plant.
-        Only positive numbers are allowed.
-        :param cost: cost to be set
+        Only positive numbers are allowed, a ValueError is raised otherwise.
+        :param cost: cost to be set, in cost units
         """
-        if cost >=0:
+        if cost >= 0:
             self.cost = cost
         else:
-            print("Illegal (negative) cost value") #raise error
+            raise ValueError("Illegal (negative) cost value %s for power plant '%s'" % (cost, self.name))
 
     def costPerMWh(self, gas_price, kerosine_price):
         """
         Get the cost per MWh of the plant, given fuel prices.
         :param gas_price: gas price
         :param kerosine_price: kerosine price
-        :return: (float) cost per MWh
+        :return: (int) cost per MWh, in cost units
         """
         fuel_price = 0
         if self.ttype == "windturbine":
@@ -104,7 +103,7 @@ class PowerPlant:
             cost = fuel_price/self.efficiency
         else:
             pass 
-        return round(cost, 2)
+        return toCostUnits(cost)
 
 
     def getRange(self, wind_pc):
@@ -112,33 +111,16 @@ class PowerPlant:
         Get range of power that can effectively be supplied by the plant, given a wind percentage.
         For a windturbine type, this will differ for pmin and pmax.
         :param wind_pc: wind percentage
-        :return: power range
+        :return: power range, in power units
         """
         if self.ttype == "windturbine":
-            min_power = round(self.pmax * wind_pc/100, 1)
+            min_power = getWindUnits(self.pmax, wind_pc)
             max_power = min_power
         elif (self.ttype == "gasfired" or self.ttype == "turbojet"):
-            min_power = round(self.pmin, 1)
-            max_power = round(self.pmax, 1)
+            min_power = self.pmin
+            max_power = self.pmax
         else:
             pass #raise error
 
         power_range = {"min": min_power, "max":max_power}
         return power_range
-
-    def setRange(self, rrange):
-        """
-        Set (by fiat) range of power that can effectively be supplied by the plant.
-        There is no guarantee that this is compatible with pmin and pmax!
-        :param rrange: power range to be set
-        """
-        if len(rrange) == 2:
-            for boundary in rrange:
-                boundary = round(boundary, 1)
-            self.rrange = rrange
-        else:
-            print("Non-recognised range") #raise error
-    
-
-    
-
@@ -0,0 +1,121 @@
+"""
+Fixed-point units used inside the solver.
+Powers are integers in units of 0.1 MW, and costs per MWh integers in cents, so that the power ranges are compared exactly
+and the costs of two dispatches are compared without tolerance.
+The cost of a power (in power units) at a cost per MWh (in cost units) is an integer in units of 0.1 cent.
+The JSON values are converted when the payload enters the solver, and converted back when the solution is written.
+"""
+# flask packages
+
+# project resources
+
+# external packages
+from decimal import Decimal
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+#1 power unit = 0.1 MW
+POWER_UNITS_PER_MW = 10
+#1 cost unit = 1 cent (per MWh)
+COST_UNITS_PER_EURO = 100
+#largest products of integers computed with NumPy (64-bit integers)
+MAX_INT64 = (1 << 63) - 1
+
+
+def toPowerUnits(power):
+    """
+    Converts a power (in MW) to an integer number of power units (0.1 MW).
+    :param power: power in MW
+    :return: (int) power in power units
+    """
+    return int(round(power * POWER_UNITS_PER_MW))
+
+
+def toMW(power_units):
+    """
+    Converts a number of power units back to MW, for the JSON output.
+    :param power_units: power in power units
+    :return: (float) power in MW
+    """
+    return power_units / POWER_UNITS_PER_MW
+
+
+def toCostUnits(cost):
+    """
+    Converts a cost per MWh (in euros) to an integer number of cost units (cents).
+    :param cost: cost per MWh in euros
+    :return: (int) cost per MWh in cost units
+    """
+    return int(round(cost * COST_UNITS_PER_EURO))
+
+
+def toEuros(cost):
+    """
+    Converts the cost of a dispatch (power units times cost units) to euros, for the JSON output.
+    The cost is rounded to the cent in integers (half a cent up), so that it doesn't depend on floating-point errors.
+    :param cost: (int) cost in units of 0.1 cent
+    :return: (float) cost in euros
+    """
+    cents = (cost + POWER_UNITS_PER_MW // 2) // POWER_UNITS_PER_MW
+    return cents / COST_UNITS_PER_EURO
+
+
+def getWindUnits(pmax_units, wind_pc):
+    """
+    Gets the power of a wind turbine, in power units.
+    The wind percentage is read as the decimal number it was written as (e.g. 33.3, not its nearest binary float),
+    and the power is computed exactly in integers, rounded to the power unit (half a unit to even, like round):
+    150 MW at 33.3% gives 49.95 MW, rounded to 50.0 MW.
+    :param pmax_units: pmax of the turbine in power units
+    :param wind_pc: wind percentage
+    :return: (int) power in power units
+    """
+    return getWindUnitsFromRatio(pmax_units, getWindRatio(wind_pc))
+
+
+def getWindRatio(wind_pc):
+    """
+    Gets a wind percentage as an exact fraction, read as the decimal number it was written as.
+    :param wind_pc: wind percentage
+    :return: (int, int) numerator and denominator of the percentage
+    """
+    return Decimal(str(wind_pc)).as_integer_ratio()
+
+
+def getWindUnitsFromRatio(pmax_units, wind_ratio):
+    """
+    Gets the power of a wind turbine in power units from the exact fraction of the wind percentage (see getWindRatio),
+    rounded to the power unit (half a unit to even).
+    :param pmax_units: pmax of the turbine in power units
+    :param wind_ratio: numerator and denominator of the wind percentage
+    :return: (int) power in power units
+    """
+    numerator, denominator = wind_ratio
+    power_units, remainder = divmod(pmax_units * numerator, 100 * denominator)
+    if 2 * remainder > 100 * denominator or (2 * remainder == 100 * denominator and power_units % 2 == 1):
+        power_units += 1
+    return power_units
+
+
+def getWindPowers(pmaxs, wind_pcs):
+    """
+    Function that computes the power of wind turbines for all scenarios (or all plants of a fleet) in one pass, as getWindUnits does for one turbine.
+    Each wind percentage is turned into an exact fraction once, and the powers are computed in integers.
+    With NumPy, they are computed as arrays of 64-bit integers, as long as the products can't overflow.
+    :param pmaxs: pmax of the wind turbines, in power units
+    :param wind_pcs: wind percentage of each scenario
+    :return: list (by scenario) of tuples of powers (by turbine), in power units
+    """
+    wind_ratios = [getWindRatio(wind_pc) for wind_pc in wind_pcs]
+    if np is None or len(pmaxs) == 0 or len(wind_ratios) == 0 \
+            or 2 * max(pmaxs) * max([ratio[0] for ratio in wind_ratios]) >= MAX_INT64 or 200 * max([ratio[1] for ratio in wind_ratios]) >= MAX_INT64:
+        return [tuple([getWindUnitsFromRatio(pmax, wind_ratio) for pmax in pmaxs]) for wind_ratio in wind_ratios]
+
+    numerators = np.asarray([ratio[0] for ratio in wind_ratios], dtype=np.int64)
+    divisors = 100 * np.asarray([ratio[1] for ratio in wind_ratios], dtype=np.int64)[:, None]
+    powers, remainders = np.divmod(np.multiply.outer(numerators, np.asarray(pmaxs, dtype=np.int64)), divisors)
+    powers += (2 * remainders > divisors) | ((2 * remainders == divisors) & (powers % 2 == 1))
+    return [tuple(row) for row in powers.tolist()]
@@ -0,0 +1,162 @@
+"""
+Offline solver of JSON lines files: one payload per line in, one solution (or error) per line out, in input order.
+The payloads are solved with optimise on a pool of processes (one per core by default), without going through the server.
+The lines are read and sent to the workers in chunks, with a bounded number of chunks in flight,
+so the memory used stays the same whatever the size of the file. A throughput summary is printed at the end.
+Run from the project directory:  python solvefile.py payloads.jsonl -o results.jsonl [--workers 32]
+'-' (the default) reads from the standard input, or writes to the standard output.
+"""
+#internal packages
+from functions.ndjson import LineSplitter, solveLine, formatLine, STREAM_CHUNK_BYTES
+from functions.timebudget import TimeBudget
+from functions.logqueue import setupLogging
+
+# external packages
+import argparse
+import collections
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+#number of lines sent to a worker at once: enough to make the cost of passing them between processes negligible
+CHUNK_LINES = 64
+#number of chunks in flight per worker, so that the workers never wait for the next chunk
+CHUNKS_PER_WORKER = 4
+
+
+def initialiseWorker(log_file):
+    """
+    Initialises a worker process of the pool: without a log file, the solver doesn't log anything.
+    :param log_file: log file name ('{pid}' is replaced by the process id), None for no log
+    """
+    if log_file is None:
+        logging.disable(logging.CRITICAL)
+    else:
+        setupLogging(log_file)
+
+
+def solveChunk(lines, iFirst, engine, deadline_ms):
+    """
+    Solves the payloads of a chunk of lines in a worker process.
+    An exception raised while solving one payload is turned into an error message for that payload only.
+    The chunks are solved in parallel, so 'previous' can't be set to 'last' (see ndjson.solveLine).
+    :param lines: list of JSON payloads (bytes), None for a line which was too long
+    :param iFirst: number of the first line of the chunk in the file, for the error messages
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param deadline_ms: time budget (in milliseconds) of each payload, None for no time limit
+    :return: [ (bytes) NDJSON lines of the solutions or errors, number of errors ]
+    """
+    output_lines = []
+    nErrors = 0
+    for iLine in range(0, len(lines)):
+        budget = TimeBudget(deadline_ms) if deadline_ms is not None else None
+        try:
+            output = solveLine(lines[iLine], engine, budget, last_dispatch=False)
+        except Exception:
+            error_message = "Unexpected error while solving payload number %s." % (iFirst + iLine)
+            logging.exception(error_message)
+            output = {"msg:": error_message}
+        #a solution is a list (of plants, or of timesteps), an error is a dictionary
+        if isinstance(output, dict):
+            nErrors += 1
+        output_lines.append(formatLine(output))
+    return [b"".join(output_lines), nErrors]
+
+
+def readChunks(input_file, chunk_lines=CHUNK_LINES):
+    """
+    Reads the lines of a file by chunks (see LineSplitter, blank lines are skipped).
+    :param input_file: file opened in binary mode
+    :param chunk_lines: number of lines per chunk
+    :return: generator of lists of lines
+    """
+    splitter = LineSplitter()
+    chunk = []
+    while True:
+        data = input_file.read(STREAM_CHUNK_BYTES)
+        chunk += splitter.feed(data) if data else splitter.close()
+        while len(chunk) >= chunk_lines:
+            yield chunk[:chunk_lines]
+            chunk = chunk[chunk_lines:]
+        if not data:
+            break
+    if len(chunk) > 0:
+        yield chunk
+
+
+def solveFile(input_file, output_file, workers=None, engine="auto", deadline_ms=None, chunk_lines=CHUNK_LINES, log_file=None):
+    """
+    Solves every payload of a JSON lines file on a pool of processes, and writes the solutions in input order as they come.
+    :param input_file: file of payloads, opened in binary mode
+    :param output_file: file of solutions, opened in binary mode
+    :param workers: number of worker processes, None for one per core
+    :param engine: search engine used when there is no obvious solution, one of 'auto', 'bruteforce', 'dp', 'bnb'
+    :param deadline_ms: time budget (in milliseconds) of each payload, None for no time limit
+    :param chunk_lines: number of lines sent to a worker at once
+    :param log_file: log file of the workers, None for no log
+    :return: summary dictionary (lines, errors, seconds, lines per second, workers)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_inflight = workers * CHUNKS_PER_WORKER
+    start = time.perf_counter()
+    nLines = 0
+    nErrors = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=initialiseWorker, initargs=(log_file,)) as pool:
+        #chunks in flight, in input order
+        inflight = collections.deque()
+
+        def writeFirst():
+            nonlocal nErrors
+            output, nChunkErrors = inflight.popleft().result()
+            output_file.write(output)
+            nErrors += nChunkErrors
+
+        for chunk in readChunks(input_file, chunk_lines):
+            if len(inflight) >= max_inflight:
+                writeFirst()
+            inflight.append(pool.submit(solveChunk, chunk, nLines, engine, deadline_ms))
+            nLines += len(chunk)
+        while len(inflight) > 0:
+            writeFirst()
+    output_file.flush()
+
+    seconds = time.perf_counter() - start
+    return {
+        "lines": nLines,
+        "errors": nErrors,
+        "seconds": round(seconds, 3),
+        "lines_per_s": round(nLines / seconds, 1) if seconds > 0 else None,
+        "workers": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solves a JSON lines file of payloads (one payload per line) on a pool of processes.")
+    parser.add_argument("input", nargs="?", default="-", help="file of payloads, '-' for the standard input")
+    parser.add_argument("-o", "--output", default="-", help="file where the solutions are written, '-' for the standard output")
+    parser.add_argument("--workers", type=int, help="number of worker processes (one per core by default)")
+    parser.add_argument("--engine", default="auto", choices=["auto", "bruteforce", "dp", "bnb"], help="search engine")
+    parser.add_argument("--deadline-ms", type=float, help="time budget of each payload, in milliseconds")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES, help="number of lines sent to a worker at once")
+    parser.add_argument("--log-file", help="log file of the solver ('{pid}' is replaced by the process id), no log by default")
+    args = parser.parse_args()
+
+    input_file = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    output_file = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        summary = solveFile(input_file, output_file, args.workers, args.engine, args.deadline_ms, max(args.chunk_lines, 1), args.log_file)
+    finally:
+        if input_file is not sys.stdin.buffer:
+            input_file.close()
+        if output_file is not sys.stdout.buffer:
+            output_file.close()
+
+    print("Solved %s payloads (%s errors) in %.3f seconds with %s workers: %s payloads/s." % (
+        summary["lines"], summary["errors"], summary["seconds"], summary["workers"], summary["lines_per_s"]), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Fixtures shared by the tests. Run them from the project directory:  python -m pytest
+"""
+#external packages
+import os
+import sys
+
+import pytest
+
+#the tests import the project modules the same way as app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#internal packages
+from functions.fleetcache import fleet_cache, merit_index_cache, dispatch_cache
+from functions.responsecache import response_cache
+from functions.logqueue import stopLogging
+import functions.metrics as metrics
+import functions.parallelsearch as parallelsearch
+
+
+
+@pytest.fixture(autouse=True)
+def clearCaches():
+    """
+    Every test starts with empty caches (fleets, merit-order indexes, last dispatches, responses) and metrics,
+    and with the subsets of tiers searched serially.
+    """
+    for cache in [fleet_cache, merit_index_cache, dispatch_cache, response_cache]:
+        cache.clear()
+    metrics.clear()
+    parallelsearch.configure(0)
+    yield
+
+
+@pytest.fixture
+def client(tmp_path):
+    """
+    Flask test client of the app, logging to a temporary file instead of error_and_info.log.
+    """
+    from app import get_flask_app
+    flask_app = get_flask_app({"LOG_FILE": str(tmp_path / "error_and_info.log")})
+    flask_app.config["TESTING"] = True
+    yield flask_app.test_client()
+    stopLogging()
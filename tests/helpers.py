@@ -0,0 +1,188 @@
+"""
+Helpers of the tests: seeded random payloads small enough to be solved by brute force,
+and the check of a production plan against its payload.
+"""
+#internal packages
+from functions.optimisation import optimise, parsePayload
+from functions.warmstart import LAST_DISPATCH, getWarmStart
+
+#external packages
+import copy
+import json
+import os
+import random
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GAS_PRICE = 13.4
+KEROSINE_PRICE = 50.8
+#few efficiencies and sizes, so that the cost tiers hold several plants, some of them identical
+PLANT_TYPES = ["gasfired", "gasfired", "turbojet", "windturbine"]
+EFFICIENCIES = [0.3, 0.37, 0.5, 0.53, 1.0]
+PLANT_SIZES = [10, 36, 50, 150, 210, 460]
+WIND_PCS = [0, 25, 60, 100]
+#tolerance on costs in euros (they are rounded to the cent)
+COST_TOLERANCE = 0.005
+
+
+def loadPayload(file_name):
+    """
+    Loads a payload of the project (e.g. 'example_payloads/payload1.json').
+    :param file_name: file name, from the project directory
+    :return: payload
+    """
+    with open(os.path.join(PROJECT_DIR, file_name)) as payload_file:
+        return json.load(payload_file)
+
+
+def makePayload(rng, nPlants):
+    """
+    Makes a random payload: gas-fired plants (with a pmin of 0 up to their pmax), turbojets and wind turbines,
+    and a load up to 110% of the capacity of the fleet, which may or may not be reachable.
+    :param rng: random.Random object (seeded)
+    :param nPlants: number of plants
+    :return: payload
+    """
+    wind_pc = rng.choice(WIND_PCS)
+    plants = []
+    capacity = 0
+    for iPlant in range(0, nPlants):
+        ttype = rng.choice(PLANT_TYPES)
+        pmax = rng.choice(PLANT_SIZES)
+        plants.append({
+            "name": "plant%s" % iPlant,
+            "type": ttype,
+            "efficiency": rng.choice(EFFICIENCIES) if ttype != "windturbine" else 1,
+            "pmin": rng.choice([0, 0.5 * pmax, 0.8 * pmax, pmax]) if ttype == "gasfired" else 0,
+            "pmax": pmax,
+        })
+        capacity += pmax * wind_pc / 100 if ttype == "windturbine" else pmax
+    return {
+        "load": round(max(capacity, 10) * rng.uniform(0.05, 1.1), 1),
+        "fuels": {
+            "gas(euro/MWh)": GAS_PRICE,
+            "kerosine(euro/MWh)": KEROSINE_PRICE,
+            "co2(euro/ton)": 20,
+            "wind(%)": wind_pc,
+        },
+        "powerplants": plants,
+    }
+
+
+def makePayloads(seed, nPayloads, min_plants=1, max_plants=7):
+    """
+    Makes a list of random payloads (see makePayload).
+    :param seed: seed of the generator
+    :param nPayloads: number of payloads
+    :param min_plants: minimum number of plants of a payload
+    :param max_plants: maximum number of plants of a payload
+    :return: list of payloads
+    """
+    rng = random.Random(seed)
+    return [makePayload(rng, rng.randint(min_plants, max_plants)) for iPayload in range(0, nPayloads)]
+
+
+def makeManyTierPayload(rng, nTiers):
+    """
+    Makes a random payload of gas-fired plants, each with its own efficiency (so each in its own cost tier),
+    with pmins leaving gaps in the power ranges, and a reachable load.
+    :param rng: random.Random object (seeded)
+    :param nTiers: number of plants (and cost tiers)
+    :return: payload
+    """
+    payload = makePayload(rng, 0)
+    for iPlant in range(0, nTiers):
+        pmax = rng.choice(PLANT_SIZES)
+        payload["powerplants"].append({
+            "name": "plant%s" % iPlant,
+            "type": "gasfired",
+            "efficiency": 0.3 + 0.02 * iPlant,
+            "pmin": rng.choice([0.5 * pmax, 0.8 * pmax, pmax]),
+            "pmax": pmax,
+        })
+    #the load of a random subset of plants at random powers, so that it is reachable
+    load = 0
+    for plant in payload["powerplants"]:
+        if rng.random() < 0.5:
+            load += round(rng.uniform(plant["pmin"], plant["pmax"]), 1)
+    payload["load"] = round(max(load, payload["powerplants"][0]["pmax"]), 1)
+    return payload
+
+
+def solve(payload, engine="auto", budget=None):
+    """
+    Solves a copy of a payload, so that the payload can be solved again.
+    :return: JSON solution or error
+    """
+    return optimise(copy.deepcopy(payload), engine, budget)
+
+
+def getLastDispatch(payload):
+    """
+    Gets the plants switched on in the last dispatch solved with the power plants of a payload, in this process.
+    :param payload: payload
+    :return: set of indices of the plants, None if there is none
+    """
+    parsed = parsePayload(dict(payload, previous=LAST_DISPATCH))[1]
+    return getWarmStart(parsed).committed
+
+
+def makeTiePayload():
+    """
+    Makes a payload whose load can be taken by either of two identical plants ('gasfiredbig1', 'gasfiredbig2'):
+    a cold start switches the first one on, and a warm start keeps whichever one was on.
+    :return: payload
+    """
+    payload = loadPayload("example_payloads/payload3.json")
+    payload["load"] = 300
+    payload["fuels"]["wind(%)"] = 0
+    return payload
+
+
+def getPowers(plan):
+    return {plant["name"]: plant["p"] for plant in plan}
+
+
+def getPlanCost(payload, plan):
+    """
+    Checks that a production plan is valid for its payload, and gets its cost.
+    Each plant of the payload appears once, its power is 0 or within its range (the wind power for a wind turbine),
+    and the powers add up to the load.
+    :param payload: payload
+    :param plan: JSON solution
+    :return: cost in euros
+    """
+    fuels = payload["fuels"]
+    fuel_prices = {"gasfired": fuels["gas(euro/MWh)"], "turbojet": fuels["kerosine(euro/MWh)"], "windturbine": 0}
+    assert sorted(plant["name"] for plant in plan) == sorted(plant["name"] for plant in payload["powerplants"])
+    plants_byName = {plant["name"]: plant for plant in payload["powerplants"]}
+    cost = 0
+    total_power = 0
+    for plant_output in plan:
+        plant = plants_byName[plant_output["name"]]
+        power = plant_output["p"]
+        if power != 0:
+            if plant["type"] == "windturbine":
+                assert abs(power - plant["pmax"] * fuels["wind(%)"] / 100) <= 0.05 + 1e-9
+            else:
+                assert plant["pmin"] <= power <= plant["pmax"]
+            cost += power * round(fuel_prices[plant["type"]] / plant["efficiency"], 2)
+        total_power += power
+    assert abs(total_power - payload["load"]) < 1e-6
+    return round(cost, 2)
+
+
+def assertSameOutcome(payload, plan, reference_plan):
+    """
+    Checks that a production plan is as cheap as a reference plan (e.g. from the brute-force engine),
+    or that both are errors.
+    :param payload: payload
+    :param plan: JSON solution or error
+    :param reference_plan: JSON solution or error
+    """
+    if isinstance(reference_plan, dict):
+        assert isinstance(plan, dict), "expected an error, got a plan: %s" % plan
+        return
+    assert not isinstance(plan, dict), "expected a plan, got an error: %s" % plan
+    assert abs(getPlanCost(payload, plan) - getPlanCost(payload, reference_plan)) < COST_TOLERANCE
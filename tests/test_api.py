@@ -0,0 +1,166 @@
+"""
+Tests of the endpoints, with the Flask test client.
+"""
+#internal packages
+import functions.optimisation as optimisation
+from functions.optimisation import getPreviousDispatch
+from functions.warmstart import LAST_DISPATCH, setLastDispatch
+import functions.windensemble as windensemble
+from helpers import loadPayload, makePayloads, makeTiePayload, solve, getPlanCost, getPowers, getLastDispatch, assertSameOutcome
+
+#external packages
+import json
+
+
+def test_batch(client):
+    payloads = makePayloads(1, 12) + [loadPayload("example_faultypayloads/error5.json")]
+    response = client.post("/productionplan/batch", json=payloads)
+    assert response.status_code == 200
+    output = response.get_json()
+    assert len(output) == len(payloads)
+    for payload, plan in zip(payloads, output):
+        assertSameOutcome(payload, plan, solve(payload, "bruteforce"))
+    assert "msg:" in output[-1]
+
+    response = client.post("/productionplan/batch", json=payloads[0])
+    assert "error" in response.get_json()
+
+
+def failParsing(*args, **kwargs):
+    raise AssertionError("the payload should not be parsed again")
+
+
+def test_response_cache(client, monkeypatch):
+    payload = loadPayload("example_payloads/payload3.json")
+    plan = client.post("/productionplan", json=payload).get_json()
+    assertSameOutcome(payload, plan, solve(payload, "bruteforce"))
+    #the same payload, with its keys in another order
+    reordered_payload = dict(reversed(list(payload.items())))
+    assert client.post("/productionplan", json=reordered_payload).get_json() == plan
+    stats = client.get("/productionplan/cache").get_json()["result"]
+    assert stats["responses"]["hits"] == 1
+    assert stats["fleets"]["misses"] == 1
+
+    #a cached response is still the last dispatch of its plants, without parsing its payload again
+    dispatch = getLastDispatch(payload)
+    client.post("/productionplan", json=dict(payload, load=payload["load"] / 4))
+    assert getLastDispatch(payload) != dispatch
+    with monkeypatch.context() as patch:
+        patch.setattr(optimisation, "parsePayload", failParsing)
+        assert client.post("/productionplan", json=payload).get_json() == plan
+    assert getLastDispatch(payload) == dispatch
+
+    #payloads warm-started from a previous dispatch are always solved
+    warm_payload = dict(payload, previous=LAST_DISPATCH)
+    for iRequest in range(0, 2):
+        assertSameOutcome(payload, client.post("/productionplan", json=warm_payload).get_json(), plan)
+    stats = client.get("/productionplan/cache").get_json()["result"]
+    assert stats["responses"]["hits"] == 2
+    assert stats["responses"]["size"] == 2
+
+
+def test_deadline(client):
+    payload = loadPayload("example_payloads/payload2.json")
+    response = client.post("/productionplan?deadline_ms=5000", json=payload)
+    assert response.headers["X-Optimality-Proven"] == "true"
+    assertSameOutcome(payload, response.get_json(), solve(payload, "bruteforce"))
+    assert "X-Optimality-Proven" not in client.post("/productionplan", json=payload).headers
+
+
+def test_metrics(client):
+    for iRequest in range(0, 2):
+        client.post("/productionplan", json=dict(loadPayload("example_payloads/payload1.json"), load=100 + iRequest))
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    assert samples['productionplan_stage_duration_seconds_count{stage="validation"}'] == 2
+    assert samples["productionplan_fleet_preparations_total"] == 1
+    assert sum(value for name, value in samples.items() if name.startswith("productionplan_solve_duration_seconds_count")) == 2
+
+
+def test_sweep(client):
+    for payload in makePayloads(4, 10, min_plants=3):
+        payload["sweep"] = {"gas(euro/MWh)": {"start": 5, "stop": 60, "step": 5}, "kerosine(euro/MWh)": [20, 50.8]}
+        points = client.post("/productionplan/sweep", json=payload).get_json()
+        assert len(points) == 24
+        for point in points:
+            point_payload = dict(payload, fuels=dict(payload["fuels"]))
+            del point_payload["sweep"]
+            for key in ["gas(euro/MWh)", "kerosine(euro/MWh)"]:
+                point_payload["fuels"][key] = point[key]
+            if "globalcost" not in point:
+                assert isinstance(solve(point_payload, "bruteforce"), dict)
+                continue
+            assertSameOutcome(point_payload, point["plan"], solve(point_payload, "bruteforce"))
+            #the global cost is rounded to the cent once, the plan cost plant by plant
+            assert abs(point["globalcost"] - getPlanCost(point_payload, point["plan"])) < 0.0105
+
+    payload = makePayloads(4, 1)[0]
+    assert "msg:" in client.post("/productionplan/sweep", json=payload).get_json()
+
+
+def test_ensemble(client):
+    payload = loadPayload("example_payloads/payload3.json")
+    wind_pcs = [0, 33.3, 60, 100]
+    payload["fuels"]["wind(%)"] = wind_pcs
+    output = client.post("/productionplan/ensemble", json=payload).get_json()
+    assert output["statistics"]["scenarios"] == len(wind_pcs)
+    for scenario, wind_pc in zip(output["scenarios"], wind_pcs):
+        scenario_payload = dict(payload, fuels=dict(payload["fuels"], **{"wind(%)": wind_pc}))
+        assertSameOutcome(scenario_payload, scenario["plan"], solve(scenario_payload, "bruteforce"))
+
+
+def test_stream(client):
+    payloads = makePayloads(8, 12)
+    body = b"\n".join(json.dumps(payload).encode() for payload in payloads[:6]) + b"\nnot json\n" \
+        + b"\n".join(json.dumps(payload).encode() for payload in payloads[6:])
+    response = client.post("/productionplan/stream", data=body, content_type="application/x-ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    outputs = [json.loads(line) for line in response.get_data().splitlines()]
+    assert len(outputs) == len(payloads) + 1
+    assert "error" in outputs.pop(6)
+    for payload, output in zip(payloads, outputs):
+        assertSameOutcome(payload, output, solve(payload, "bruteforce"))
+
+
+def test_ensemble_shares_the_wind_free_table(client, monkeypatch):
+    calls = {"table": 0, "scenarios": 0}
+    addPlantsToCosts = windensemble.addPlantsToCosts
+    solveWithWindFreeTable = windensemble.solveWithWindFreeTable
+
+    def countTables(*args, **kwargs):
+        calls["table"] += 1
+        return addPlantsToCosts(*args, **kwargs)
+
+    def countScenarios(*args, **kwargs):
+        calls["scenarios"] += 1
+        return solveWithWindFreeTable(*args, **kwargs)
+    monkeypatch.setattr(windensemble, "addPlantsToCosts", countTables)
+    monkeypatch.setattr(windensemble, "solveWithWindFreeTable", countScenarios)
+
+    payload = loadPayload("example_payloads/payload3.json")
+    #below the pmin of the cheapest gas plants once the wind is taken, so there is no obvious solution
+    payload["load"] = 80
+    payload["fuels"]["wind(%)"] = [0, 10, 33.3, 60, 100]
+    output = client.post("/productionplan/ensemble", json=payload).get_json()
+    assert calls["table"] == 1 and calls["scenarios"] == 5
+    for scenario in output["scenarios"]:
+        scenario_payload = dict(payload, fuels=dict(payload["fuels"], **{"wind(%)": scenario["wind(%)"]}))
+        assertSameOutcome(scenario_payload, scenario["plan"], solve(scenario_payload, "bruteforce"))
+
+
+def test_batch_warm_starts_from_the_server_dispatch(client):
+    payload = makeTiePayload()
+    #the worker keeps its own last dispatch, with gasfiredbig1 on
+    assert getPowers(client.post("/productionplan/batch", json=[payload]).get_json()[0])["gasfiredbig1"] == 300
+    #the last dispatch of the server process has gasfiredbig2 on
+    warm_payload = dict(payload, previous=LAST_DISPATCH)
+    setLastDispatch([getPreviousDispatch(warm_payload)[0], {1}])
+    output = client.post("/productionplan/batch", json=[warm_payload, dict(warm_payload, load=310)]).get_json()
+    assert [getPowers(plan)["gasfiredbig2"] for plan in output] == [300, 310]
+    assert getLastDispatch(payload) == {1}
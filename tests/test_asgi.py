@@ -0,0 +1,129 @@
+"""
+Tests of the ASGI app, driven through its ASGI channels without a server.
+"""
+#internal packages
+from functions.logqueue import stopLogging
+from functions.optimisation import getPreviousDispatch
+from functions.warmstart import LAST_DISPATCH, setLastDispatch
+import benchmarks.scaling as scaling
+from helpers import loadPayload, makeTiePayload, solve, getPowers, getLastDispatch, assertSameOutcome
+
+#external packages
+import asyncio
+import importlib
+import json
+import random
+import time
+
+import pytest
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """
+    ASGI app with one worker process, logging to a temporary file; its process pool is shut down after the test.
+    """
+    #importing asgi sets up logging in the current directory
+    monkeypatch.chdir(tmp_path)
+    asgi = importlib.import_module("asgi")
+    app = asgi.get_asgi_app({"LOG_FILE": str(tmp_path / "error_and_info.log"), "SOLVER_WORKERS": 1, "MAX_INFLIGHT_SOLVES": 2})
+    yield app
+    asyncio.run(callApp(app, {"type": "lifespan"}, [{"type": "lifespan.shutdown"}]))
+    stopLogging()
+
+
+async def callApp(app, scope, messages):
+    """
+    Calls the app with the given messages, then no more message (the client stays connected).
+    :return: list of the messages sent by the app
+    """
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def post(app, path, body, query_string=b""):
+    """
+    Posts a body to the app.
+    :return: [ status, headers (dictionary), body ]
+    """
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": query_string}
+    sent = asyncio.run(callApp(app, scope, [{"type": "http.request", "body": body, "more_body": False}]))
+    headers = dict(sent[0]["headers"])
+    return [sent[0]["status"], headers, b"".join(message.get("body", b"") for message in sent[1:])]
+
+
+def test_post(asgi_app):
+    payload = loadPayload("example_payloads/payload3.json")
+    status, headers, body = post(asgi_app, "/productionplan", json.dumps(payload).encode(), b"deadline_ms=5000")
+    assert status == 200
+    assert headers[b"x-optimality-proven"] == b"true"
+    plan = json.loads(body)
+    assertSameOutcome(payload, plan, solve(payload, "bruteforce"))
+    #the second time, the response comes from the cache
+    assert json.loads(post(asgi_app, "/productionplan", json.dumps(payload).encode())[2]) == plan
+
+
+def test_errors(asgi_app):
+    assert post(asgi_app, "/unknown", b"{}")[0] == 404
+    assert "error" in json.loads(post(asgi_app, "/productionplan", b"not json")[2])
+    scope = {"type": "http", "method": "GET", "path": "/productionplan", "query_string": b""}
+    assert asyncio.run(callApp(asgi_app, scope, []))[0]["status"] == 405
+
+
+def test_cache_hits_keep_the_last_dispatch(asgi_app):
+    #the last dispatches are kept by the server process, whichever worker solved the payload
+    payload = loadPayload("example_payloads/payload3.json")
+    post(asgi_app, "/productionplan", json.dumps(payload).encode())
+    dispatch = getLastDispatch(payload)
+    assert dispatch
+    post(asgi_app, "/productionplan", json.dumps(dict(payload, load=payload["load"] / 4)).encode())
+    assert getLastDispatch(payload) != dispatch
+    post(asgi_app, "/productionplan", json.dumps(payload).encode())
+    assert getLastDispatch(payload) == dispatch
+
+
+def test_last_dispatch_of_the_server(asgi_app):
+    payload = makeTiePayload()
+    #the worker keeps its own last dispatch, with gasfiredbig1 on
+    assert getPowers(json.loads(post(asgi_app, "/productionplan", json.dumps(payload).encode())[2]))["gasfiredbig1"] == 300
+    #the last dispatch of the server process has gasfiredbig2 on
+    warm_payload = dict(payload, previous=LAST_DISPATCH)
+    setLastDispatch([getPreviousDispatch(warm_payload)[0], {1}])
+    plan = json.loads(post(asgi_app, "/productionplan", json.dumps(warm_payload).encode())[2])
+    assert getPowers(plan)["gasfiredbig2"] == 300
+
+    #lines of a stream are solved in parallel, and can't use the last dispatch
+    body = json.dumps(payload).encode() + b"\n" + json.dumps(warm_payload).encode()
+    lines = [json.loads(line) for line in post(asgi_app, "/productionplan/stream", body)[2].splitlines()]
+    assert getPowers(lines[0])["gasfiredbig1"] == 300
+    assert "msg:" in lines[1]
+
+
+def test_disconnected_client_frees_the_worker(asgi_app):
+    #solved in about 3 seconds by the only worker, unless it is cancelled
+    heavy_payload = scaling.makePayload(random.Random(3), 100, 13, 0.9, 0.3)
+    payload = loadPayload("example_payloads/payload3.json")
+    scope = {"type": "http", "method": "POST", "path": "/productionplan", "query_string": b""}
+
+    async def disconnectThenPost():
+        heavy_messages = [{"type": "http.request", "body": json.dumps(heavy_payload).encode(), "more_body": False},
+                          {"type": "http.disconnect"}]
+        assert await callApp(asgi_app, scope, heavy_messages) == []
+        assert 1 in list(asgi_app.flags)
+        start = time.perf_counter()
+        sent = await callApp(asgi_app, scope, [{"type": "http.request", "body": json.dumps(payload).encode(), "more_body": False}])
+        return [sent[0]["status"], time.perf_counter() - start]
+
+    status, seconds = asyncio.run(disconnectThenPost())
+    assert status == 200
+    assert seconds < 1.5
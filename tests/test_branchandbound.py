@@ -0,0 +1,28 @@
+"""
+Tests of the branch-and-bound engine, against the brute-force engine, and of its choice by 'auto'.
+"""
+#internal packages
+import functions.optimisation as optimisation
+from functions.dynamicprogramming import MAX_TABLE_ENTRIES
+from helpers import makeManyTierPayload, makePayloads, solve, assertSameOutcome
+
+#external packages
+import random
+
+
+def test_bnb_matches_bruteforce():
+    for payload in makePayloads(4, 300):
+        assertSameOutcome(payload, solve(payload, "bnb"), solve(payload, "bruteforce"))
+
+
+def test_bnb_matches_dp_on_many_tiers():
+    rng = random.Random(5)
+    for iPayload in range(0, 20):
+        payload = makeManyTierPayload(rng, 16)
+        assertSameOutcome(payload, solve(payload, "bnb"), solve(payload, "dp"))
+
+
+def test_auto_falls_back_on_bnb_above_the_tier_cap():
+    load_units = MAX_TABLE_ENTRIES
+    assert optimisation.getAutoEngine(2, optimisation.MAX_BRUTEFORCE_TIERS + 1, load_units) == "bnb"
+    assert optimisation.getAutoEngine(2, optimisation.MAX_BRUTEFORCE_TIERS, load_units) == "bruteforce"
@@ -0,0 +1,63 @@
+"""
+Tests of the dynamic-programming engine, against the brute-force engine.
+"""
+#internal packages
+from functions.dynamicprogramming import addPlantToCosts, isTableTooLarge
+import functions.optimisation as optimisation
+from models.units import toPowerUnits
+from helpers import makePayload, makePayloads, solve, assertSameOutcome
+
+#external packages
+import random
+
+
+def test_dp_matches_bruteforce():
+    for payload in makePayloads(1, 300):
+        assertSameOutcome(payload, solve(payload, "dp"), solve(payload, "bruteforce"))
+
+
+def test_addPlantToCosts_matches_every_power():
+    rng = random.Random(2)
+    for iCase in range(0, 200):
+        costs = [rng.choice([None, rng.randint(0, 1000)]) for iLoad in range(0, rng.randint(1, 60))]
+        unit_cost = rng.randint(0, 50)
+        min_units = rng.randint(1, 20)
+        max_units = min_units + rng.randint(0, 20)
+        new_costs, choices = addPlantToCosts(costs, unit_cost, min_units, max_units)
+        for iLoad in range(0, len(costs)):
+            expected = costs[iLoad]
+            for power in range(min_units, min(max_units, iLoad) + 1):
+                if costs[iLoad - power] is not None:
+                    cost = costs[iLoad - power] + unit_cost * power
+                    if expected is None or cost < expected:
+                        expected = cost
+            assert new_costs[iLoad] == expected
+            if choices[iLoad] > 0:
+                assert costs[iLoad - choices[iLoad]] + unit_cost * choices[iLoad] == expected
+
+
+def test_dp_is_not_used_when_its_table_is_too_large(monkeypatch):
+    rng = random.Random(3)
+    payload = makePayload(rng, 200)
+    payload["load"] = 20000
+    for plant in payload["powerplants"]:
+        plant["pmax"] = 460
+    assert isTableTooLarge(len(payload["powerplants"]), toPowerUnits(payload["load"]))
+
+    def failDynamicProgramming(*args, **kwargs):
+        raise AssertionError("the dynamic programme should not be run")
+    monkeypatch.setattr(optimisation, "dynamicProgrammingSolution", failDynamicProgramming)
+    assertSameOutcome(payload, solve(payload, "dp"), solve(payload, "bnb"))
+
+
+def test_auto_uses_dp(monkeypatch):
+    payloads = makePayloads(12, 100)
+    reference_plans = [solve(payload, "bruteforce") for payload in payloads]
+
+    def failSearch(*args, **kwargs):
+        raise AssertionError("the dynamic programme should be run")
+    monkeypatch.setattr(optimisation, "bruteForceSolution", failSearch)
+    monkeypatch.setattr(optimisation, "branchAndBoundSolution", failSearch)
+    for payload, reference_plan in zip(payloads, reference_plans):
+        assertSameOutcome(payload, solve(payload), reference_plan)
+    assert optimisation.getAutoEngine(200, 200, 20000) == "dp"
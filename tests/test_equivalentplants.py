@@ -0,0 +1,51 @@
+"""
+Tests of the split of a tier load between equivalent plants, against the enumeration of the subsets of plants.
+"""
+#internal packages
+from functions.optimisation import splitLoadBySweep, splitLoadByGrid
+
+#external packages
+import itertools
+import random
+
+
+def getFewestPlants(load_units, plant_ranges):
+    """
+    Gets the smallest number of plants whose range contains the load, by enumerating the subsets of plants.
+    :return: number of plants, or None if no subset can supply the load
+    """
+    for nPlants in range(1, len(plant_ranges) + 1):
+        for subset in itertools.combinations(plant_ranges, nPlants):
+            if sum(plant_range[0] for plant_range in subset) <= load_units <= sum(plant_range[1] for plant_range in subset):
+                return nPlants
+    return None
+
+
+def assertValidSplit(load_units, plant_ranges, powers):
+    assert sum(powers) == load_units
+    for power, plant_range in zip(powers, plant_ranges):
+        assert power == 0 or plant_range[0] <= power <= plant_range[1]
+
+
+def test_split_uses_the_fewest_plants():
+    rng = random.Random(1)
+    for iCase in range(0, 1000):
+        plant_ranges = []
+        for iPlant in range(0, rng.randint(1, 7)):
+            pmax = rng.choice([1, 5, 20, 36, 50])
+            plant_ranges.append([rng.choice([1, pmax // 2, pmax]), pmax])
+        load_units = rng.randint(1, sum(plant_range[1] for plant_range in plant_ranges) + 5)
+        fewest_plants = getFewestPlants(load_units, plant_ranges)
+
+        powers = splitLoadByGrid(load_units, plant_ranges)
+        if fewest_plants is None:
+            assert powers is None
+            assert splitLoadBySweep(load_units, plant_ranges) is None
+            continue
+        assertValidSplit(load_units, plant_ranges, powers)
+        assert sum(1 for power in powers if power > 0) == fewest_plants
+
+        powers = splitLoadBySweep(load_units, plant_ranges)
+        if powers is not None:
+            assertValidSplit(load_units, plant_ranges, powers)
+            assert sum(1 for power in powers if power > 0) == fewest_plants
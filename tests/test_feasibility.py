@@ -0,0 +1,55 @@
+"""
+Tests of the reachability of a load by the subsets of cost tiers, against the sums of the powers of the tiers.
+"""
+#internal packages
+from functions.feasibility import SubsetReachability
+from functions.intervalops import IntervalSet, iteratePowerSet
+
+#external packages
+import random
+
+
+def makeTierRanges(rng, nTiers):
+    """
+    Makes the power ranges of a few tiers: a few random intervals of small integers each, some starting at 0.
+    """
+    power_ranges_byCostTier = []
+    for iTier in range(0, nTiers):
+        intervals = []
+        for iInterval in range(0, rng.randint(1, 3)):
+            lmin = rng.choice([0, rng.randint(0, 30)])
+            intervals.append([lmin, lmin + rng.randint(0, 8)])
+        power_ranges_byCostTier.append(IntervalSet(intervals))
+    return power_ranges_byCostTier
+
+
+def getSums(power_ranges, load):
+    """
+    Gets the loads up to the load which are the sum of one power of each tier, each supplying at least one power unit.
+    """
+    sums = set([0])
+    for power_range in power_ranges:
+        powers = [power for lmin, lmax in power_range for power in range(max(lmin, 1), lmax + 1)]
+        sums = set(total + power for total in sums for power in powers if total + power <= load)
+    return sums
+
+
+def test_reachability_matches_sums():
+    rng = random.Random(1)
+    nChecked = 0
+    for iFleet in range(0, 200):
+        nTiers = rng.randint(1, 7)
+        power_ranges_byCostTier = makeTierRanges(rng, nTiers)
+        load = rng.randint(0, 120)
+        reachability = SubsetReachability(load, power_ranges_byCostTier)
+        for subset in iteratePowerSet(list(range(0, nTiers))):
+            reachable = load in getSums([power_ranges_byCostTier[iTier] for iTier in subset], load)
+            assert reachability.isReachable(subset) == reachable
+            nChecked += reachable
+    assert nChecked > 0
+
+
+def test_load_of_zero():
+    reachability = SubsetReachability(0, [IntervalSet([[0, 5]]), IntervalSet([[2, 3]])])
+    assert reachability.isReachable([])
+    assert not reachability.isReachable([0])
@@ -0,0 +1,87 @@
+"""
+Tests of the compact Fleet model, against PowerPlant objects.
+"""
+#internal packages
+from models.fleet import Fleet, VECTORISE_MIN_PLANTS
+from models.powerplant import PowerPlant
+import models.fleet
+import models.units
+from helpers import makePayloads, GAS_PRICE, KEROSINE_PRICE
+
+#external packages
+import pytest
+
+
+def makeFleet(payload):
+    plants = payload["powerplants"]
+    return Fleet(
+        [plant["name"] for plant in plants],
+        [plant["type"] for plant in plants],
+        [plant["efficiency"] for plant in plants],
+        [plant["pmin"] for plant in plants],
+        [plant["pmax"] for plant in plants],
+    )
+
+
+def test_fleet_matches_powerplants():
+    for payload in makePayloads(1, 50):
+        fleet = makeFleet(payload)
+        fleet.setCosts(GAS_PRICE, KEROSINE_PRICE)
+        wind_pc = payload["fuels"]["wind(%)"]
+        for view, plant in zip(fleet, payload["powerplants"]):
+            powerplant = PowerPlant(plant["name"], plant["type"], plant["efficiency"], plant["pmin"], plant["pmax"])
+            assert view.name == powerplant.name
+            assert view.cost == powerplant.costPerMWh(GAS_PRICE, KEROSINE_PRICE)
+            assert view.getRange(wind_pc) == powerplant.getRange(wind_pc)
+        costs = [view.cost for view in fleet.meritOrder()]
+        assert costs == sorted(costs)
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_large_fleet_columns_match_powerplants(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(models.fleet, "np", None)
+        monkeypatch.setattr(models.units, "np", None)
+    for payload in makePayloads(3, 10, min_plants=VECTORISE_MIN_PLANTS, max_plants=3 * VECTORISE_MIN_PLANTS):
+        payload["powerplants"][0]["efficiency"] = 0
+        fleet = makeFleet(payload)
+        fleet.setCosts(GAS_PRICE, KEROSINE_PRICE)
+        for wind_pc in [0, 33.3, 12.5, 100]:
+            for view, plant in zip(fleet, payload["powerplants"]):
+                powerplant = PowerPlant(plant["name"], plant["type"], plant["efficiency"], plant["pmin"], plant["pmax"])
+                assert view.cost == powerplant.costPerMWh(GAS_PRICE, KEROSINE_PRICE)
+                assert view.getRange(wind_pc) == powerplant.getRange(wind_pc)
+
+
+def test_wind_powers_are_computed_once_per_wind(monkeypatch):
+    calls = []
+    getWindPowers = models.fleet.getWindPowers
+    monkeypatch.setattr(models.fleet, "getWindPowers", lambda pmaxs, wind_pcs: calls.append(wind_pcs) or getWindPowers(pmaxs, wind_pcs))
+    fleet = Fleet(["windpark1", "windpark2", "gasfired1"], ["windturbine", "windturbine", "gasfired"], [1, 1, 0.5], [0, 0, 100], [150, 36, 200])
+    assert [plant.getRange(33.3)["max"] for plant in fleet] == [500, 120, 2000]
+    assert [plant.getRange(33.3)["max"] for plant in fleet.copy()] == [500, 120, 2000]
+    assert [plant.getRange(50)["max"] for plant in fleet] == [750, 180, 2000]
+    assert calls == [[33.3], [50]]
+
+
+def test_copy_has_its_own_powers():
+    payload = makePayloads(2, 1, min_plants=3)[0]
+    fleet = makeFleet(payload)
+    fleet_copy = fleet.copy()
+    plant = fleet_copy[0]
+    plant.setPower(plant.pmax)
+    assert fleet[0].p == 0
+    assert fleet_copy[0].p == plant.pmax
+
+
+@pytest.mark.parametrize("model", ["fleet", "powerplant"])
+def test_illegal_values_are_refused(model):
+    if model == "fleet":
+        plant = Fleet(["gasfired1"], ["gasfired"], [0.5], [100], [200])[0]
+    else:
+        plant = PowerPlant("gasfired1", "gasfired", 0.5, 100, 200)
+    with pytest.raises(ValueError, match="gasfired1"):
+        plant.setPower(2500)
+    with pytest.raises(ValueError, match="gasfired1"):
+        plant.setCost(-1)
+    assert plant.p == 0
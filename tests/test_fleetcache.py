@@ -0,0 +1,57 @@
+"""
+Tests of the cache of prepared fleets, and of the subsets of cost tiers searched with them.
+"""
+#internal packages
+from functions.fleetcache import fleet_cache, DEFAULT_FLEET_CACHE_SIZE
+from functions.intervalops import iteratePowerSet
+from functions.optimisation import parsePayload
+import functions.optimisation as optimisation
+from helpers import makePayloads, solve
+
+#external packages
+import random
+
+
+def test_fleet_is_prepared_once_per_plants_and_wind(monkeypatch):
+    preparations = []
+    prepareFleet = optimisation.prepareFleet
+    monkeypatch.setattr(optimisation, "prepareFleet", lambda *args, **kwargs: preparations.append(args[1]) or prepareFleet(*args, **kwargs))
+    rng = random.Random(1)
+    payload = makePayloads(2, 1, min_plants=4)[0]
+    payload["fuels"]["wind(%)"] = 60
+    capacity = sum(plant["pmax"] for plant in payload["powerplants"])
+    fleets = []
+    for iLoad in range(0, 5):
+        parsed = parsePayload(dict(payload, load=round(capacity * rng.uniform(0.05, 1), 1)))[1]
+        fleets.append(optimisation.getFleet(parsed))
+    assert all(fleet is fleets[0] for fleet in fleets)
+    #another wind percentage is another fleet
+    parsed = parsePayload(dict(payload, fuels=dict(payload["fuels"], **{"wind(%)": 25})))[1]
+    assert optimisation.getFleet(parsed) is not fleets[0]
+    assert preparations == [60, 25]
+    stats = fleet_cache.stats()
+    assert stats["misses"] == 2 and stats["hits"] == 4
+
+
+def test_least_recently_used_fleet_is_evicted():
+    fleet_cache.resize(2)
+    try:
+        payloads = makePayloads(3, 3)
+        for payload in payloads + [payloads[0]]:
+            solve(payload)
+        stats = fleet_cache.stats()
+        assert stats["size"] == 2
+        assert stats["misses"] == 4
+    finally:
+        fleet_cache.resize(DEFAULT_FLEET_CACHE_SIZE)
+
+
+def test_power_set_is_made_from_bitmasks():
+    tiers = ["a", "b", "c", "d"]
+    subsets = list(iteratePowerSet(tiers))
+    assert len(subsets) == 15
+    assert subsets[0] == ["a"] and subsets[2] == ["a", "b"] and subsets[-1] == tiers
+    assert len(set(tuple(subset) for subset in subsets)) == 15
+    #chunks of the power set, as searched in parallel, make up the whole power set
+    chunks = list(iteratePowerSet(tiers, 1, 6)) + list(iteratePowerSet(tiers, 6, 16))
+    assert chunks == subsets
@@ -0,0 +1,70 @@
+"""
+Tests of IntervalSet, against the sets of integers its intervals stand for.
+"""
+#internal packages
+from functions.intervalops import IntervalSet
+
+#external packages
+import random
+
+
+def makeIntervals(rng):
+    """
+    Makes a few random intervals of small integers, which may overlap or touch.
+    """
+    intervals = []
+    for iInterval in range(0, rng.randint(0, 5)):
+        lmin = rng.randint(0, 40)
+        intervals.append([lmin, lmin + rng.randint(0, 6)])
+    return intervals
+
+
+def getIntegers(intervals):
+    return set(number for lmin, lmax in intervals for number in range(lmin, lmax + 1))
+
+
+def assertNormalised(interval_set):
+    """
+    Checks that the intervals are sorted, disjoint and not adjacent.
+    """
+    for iInterval in range(1, len(interval_set)):
+        assert interval_set[iInterval - 1][1] + 1 < interval_set[iInterval][0]
+
+
+def test_intervals_are_merged():
+    interval_set = IntervalSet([[5, 7], [0, 2], [3, 4], [10, 12], [11, 15]])
+    assert list(interval_set) == [(0, 7), (10, 15)]
+    assert interval_set.min() == 0
+    assert interval_set.max() == 15
+    assert IntervalSet().min() == 0 and IntervalSet().max() == 0
+
+
+def test_membership():
+    rng = random.Random(1)
+    for iCase in range(0, 500):
+        intervals = makeIntervals(rng)
+        interval_set = IntervalSet(intervals)
+        integers = getIntegers(intervals)
+        assertNormalised(interval_set)
+        assert getIntegers(interval_set) == integers
+        for number in range(-1, 50):
+            assert (number in interval_set) == (number in integers)
+
+
+def test_add_is_union_and_sums():
+    rng = random.Random(2)
+    for iCase in range(0, 2000):
+        intervals = makeIntervals(rng)
+        other_intervals = makeIntervals(rng)
+        integers = getIntegers(intervals)
+        other_integers = getIntegers(other_intervals)
+        expected = integers | other_integers | set(a + b for a in integers for b in other_integers)
+        new_set = IntervalSet(intervals).add(other_intervals)
+        assertNormalised(new_set)
+        assert getIntegers(new_set) == expected
+
+
+def test_reducedBy_stops_at_zero():
+    interval_set = IntervalSet([[0, 3], [6, 9], [20, 25]])
+    assert list(interval_set.reducedBy(5)) == [(0, 4), (15, 20)]
+    assert list(interval_set.reducedBy(0)) == list(interval_set)
@@ -0,0 +1,42 @@
+"""
+Tests of the queued logging: records written by the background thread, verbose sampling and rotation.
+"""
+#internal packages
+from functions.logqueue import setupLogging, stopLogging, VERBOSE
+
+#external packages
+import logging
+import os
+
+
+def test_records_are_written_and_sampled(tmp_path):
+    log_file = str(tmp_path / "log_{pid}.log")
+    setupLogging(log_file, 0, 0, 3)
+    try:
+        for iRecord in range(0, 9):
+            logging.info("Request %s.", iRecord)
+            logging.log(VERBOSE, "Dump of request %s.", iRecord)
+    finally:
+        stopLogging()
+    with open(log_file.replace("{pid}", str(os.getpid()))) as written_file:
+        lines = written_file.read().splitlines()
+    assert lines.count("INFO: Request 4.") == 1
+    assert len([line for line in lines if line.startswith("INFO:")]) == 9
+    assert [line for line in lines if line.startswith("VERBOSE:")] == ["VERBOSE: Dump of request %s." % iRecord for iRecord in [0, 3, 6]]
+
+
+def test_file_is_rotated(tmp_path):
+    log_file = str(tmp_path / "rotated.log")
+    setupLogging(log_file, 200, 2, 0)
+    try:
+        for iRecord in range(0, 50):
+            logging.info("Request %s of a long series of requests.", iRecord)
+            logging.log(VERBOSE, "Dropped dump.")
+    finally:
+        stopLogging()
+    assert sorted(os.listdir(tmp_path)) == ["rotated.log", "rotated.log.1", "rotated.log.2"]
+    for file_name in os.listdir(tmp_path):
+        with open(os.path.join(tmp_path, file_name)) as written_file:
+            content = written_file.read()
+        assert "Dropped" not in content
+        assert len(content) <= 200
@@ -0,0 +1,68 @@
+"""
+Tests of the merit-order index, against the merit order and the fleet prepared from scratch.
+"""
+#internal packages
+from functions.meritorder import MeritOrderIndex
+from functions.optimisation import parsePayload, makeOrderedPlants, prepareFleet
+import functions.optimisation as optimisation
+from helpers import makePayload, loadPayload, solve
+
+#external packages
+import random
+
+
+GAS_PRICES = [0, 10, 13.4, 20, 25.5, 40, 50.8]
+KEROSINE_PRICES = [0, 13.4, 30, 50.8, 60]
+#efficiencies giving the same cost once rounded to the cent, at some prices
+CLOSE_EFFICIENCIES = [0.3, 0.30001, 0.35, 0.5, 0.49999, 0.7, 1.0]
+
+
+def getTierIndices(fleet):
+    return [[plant.index for plant in tier] for tier in fleet["plants_byCostTier"]]
+
+
+def test_index_matches_fleet_prepared_from_scratch():
+    rng = random.Random(7)
+    nChecked = 0
+    for iFleet in range(0, 300):
+        payload = makePayload(rng, rng.randint(1, 40))
+        for plant in payload["powerplants"]:
+            if plant["type"] != "windturbine" and rng.random() < 0.3:
+                plant["efficiency"] = rng.choice(CLOSE_EFFICIENCIES)
+        parsed = parsePayload(payload)[1]
+        merit_index = MeritOrderIndex(parsed)
+        for iPrices in range(0, 8):
+            parsed["gas_price"] = rng.choice(GAS_PRICES)
+            parsed["kerosine_price"] = rng.choice(KEROSINE_PRICES)
+            ordered_plants = makeOrderedPlants(parsed)
+            indexed_plants = merit_index.orderPlants(parsed["gas_price"], parsed["kerosine_price"])
+            assert [(plant.index, plant.cost) for plant in indexed_plants] == [(plant.index, plant.cost) for plant in ordered_plants]
+
+            fleet = prepareFleet(ordered_plants, parsed["wind_pc"])
+            indexed_fleet = prepareFleet(indexed_plants, parsed["wind_pc"], merit_index=merit_index)
+            assert getTierIndices(indexed_fleet) == getTierIndices(fleet)
+            assert indexed_fleet["power_ranges_byCostTier"] == fleet["power_ranges_byCostTier"]
+            assert indexed_fleet["global_power_range"] == fleet["global_power_range"]
+            nChecked += 1
+    assert nChecked == 2400
+
+
+def test_new_prices_only_compute_new_tiers(monkeypatch):
+    computed_tiers = []
+    getPowerRanges = optimisation.getPowerRanges
+    def countTiers(plants_byCostTier, wind_pc):
+        computed_tiers.append([[plant.name for plant in tier] for tier in plants_byCostTier])
+        return getPowerRanges(plants_byCostTier, wind_pc)
+    monkeypatch.setattr(optimisation, "getPowerRanges", countTiers)
+
+    payload = loadPayload("example_payloads/payload3.json")
+    solve(payload)
+    assert len(computed_tiers[0]) == 4
+    #same tiers in the same order
+    solve(dict(payload, fuels=dict(payload["fuels"], **{"gas(euro/MWh)": 20})))
+    #same tiers, the turbojet before the gas-fired plants
+    solve(dict(payload, fuels=dict(payload["fuels"], **{"kerosine(euro/MWh)": 5})))
+    assert computed_tiers[1:] == [[], []]
+    #the turbojet costs as much as the big gas-fired plants (25.28 euros/MWh): one new tier
+    solve(dict(payload, fuels=dict(payload["fuels"], **{"kerosine(euro/MWh)": 7.584})))
+    assert computed_tiers[3] == [["gasfiredbig1", "gasfiredbig2", "tj1"]]
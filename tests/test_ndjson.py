@@ -0,0 +1,36 @@
+"""
+Tests of the NDJSON lines: splitting a stream into lines whatever its chunks, and solving each line.
+"""
+#internal packages
+from functions.ndjson import LineSplitter, solveLine, formatLine
+from helpers import loadPayload, solve
+
+#external packages
+import json
+
+
+def splitStream(body, chunk_size, max_line_bytes=100):
+    splitter = LineSplitter(max_line_bytes)
+    lines = []
+    for start in range(0, len(body), chunk_size):
+        lines += splitter.feed(body[start:start + chunk_size])
+    return lines + splitter.close()
+
+
+def test_lines_do_not_depend_on_chunks():
+    body = b'{"a": 1}\n\n  \n{"b": 2}\r\n' + b"x" * 250 + b'\n{"c": 3}\n' + b"y" * 101 + b'\n{"d": 4}'
+    expected = [b'{"a": 1}', b'{"b": 2}\r', None, b'{"c": 3}', None, b'{"d": 4}']
+    for chunk_size in range(1, len(body) + 1):
+        assert splitStream(body, chunk_size) == expected
+
+
+def test_each_line_is_answered_on_its_own():
+    payload = loadPayload("example_payloads/payload3.json")
+    outputs = [solveLine(line) for line in [json.dumps(payload).encode(), b"not json", None, b'{"load": 100}', json.dumps(payload)]]
+    assert outputs[0] == outputs[4] == solve(payload)
+    assert "error" in outputs[1] and "error" in outputs[2] and "msg:" in outputs[3]
+    #each output is one line of JSON
+    for output in outputs:
+        line = formatLine(output)
+        assert line.endswith(b"\n") and line.count(b"\n") == 1
+        assert json.loads(line) == output
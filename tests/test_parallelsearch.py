@@ -0,0 +1,37 @@
+"""
+Tests of the parallel search of the subsets of cost tiers: same plans as the serial search.
+"""
+#internal packages
+import functions.parallelsearch as parallelsearch
+from helpers import makeManyTierPayload, solve, assertSameOutcome
+
+#external packages
+import logging
+import random
+
+
+def test_parallel_search_matches_serial_search(caplog):
+    rng = random.Random(1)
+    payloads = [makeManyTierPayload(rng, rng.randint(parallelsearch.PARALLEL_MIN_TIERS, 11)) for iPayload in range(0, 12)]
+    serial_plans = [solve(payload, "bruteforce") for payload in payloads]
+    caplog.set_level(logging.INFO)
+    parallelsearch.configure(2)
+    try:
+        for payload, serial_plan in zip(payloads, serial_plans):
+            plan = solve(payload, "bruteforce")
+            assertSameOutcome(payload, plan, serial_plan)
+            #the cheapest solution of the first chunk is kept in case of a tie, as in the serial search
+            assert plan == serial_plan
+    finally:
+        parallelsearch.configure(0)
+    assert any(record.message.startswith("Searching") for record in caplog.records)
+
+
+def test_small_fleets_are_searched_serially():
+    parallelsearch.configure(2)
+    try:
+        assert not parallelsearch.isEnabled(parallelsearch.PARALLEL_MIN_TIERS - 1)
+        assert parallelsearch.isEnabled(parallelsearch.PARALLEL_MIN_TIERS)
+    finally:
+        parallelsearch.configure(0)
+    assert not parallelsearch.isEnabled(parallelsearch.PARALLEL_MIN_TIERS)
@@ -0,0 +1,38 @@
+"""
+Tests of the single-pass check and parsing of the payloads.
+"""
+#internal packages
+from functions.optimisation import parsePayload
+from helpers import loadPayload, PROJECT_DIR
+
+#external packages
+import glob
+import os
+
+
+def test_example_payloads_are_parsed():
+    for file_name in sorted(glob.glob(os.path.join(PROJECT_DIR, "example_payloads", "*.json"))):
+        payload = loadPayload(file_name)
+        errors, parsed = parsePayload(payload)
+        assert errors == []
+        assert parsed["load"] == payload["load"]
+        assert parsed["wind_pc"] == payload["fuels"]["wind(%)"]
+        assert parsed["names"] == [plant["name"] for plant in payload["powerplants"]]
+        assert parsed["pmaxs"] == [plant["pmax"] for plant in payload["powerplants"]]
+
+
+def test_all_errors_are_reported():
+    for file_name in ["error2.json", "error4.json"]:
+        assert len(parsePayload(loadPayload(os.path.join("example_faultypayloads", file_name)))[0]) == 1
+    #both faulty power plants are reported
+    errors = parsePayload(loadPayload(os.path.join("example_faultypayloads", "error5.json")))[0]
+    assert len(errors) == 2
+
+
+def test_previous_dispatch():
+    payload = loadPayload(os.path.join("example_payloads", "payload1.json"))
+    assert parsePayload(dict(payload, previous="last"))[1]["previous"] == "last"
+    errors, parsed = parsePayload(dict(payload, previous=[{"name": "gasfiredbig1", "p": 200}]))
+    assert errors == []
+    assert parsed["previous"] == [["gasfiredbig1", 200.0]]
+    assert len(parsePayload(dict(payload, previous=[{"name": "gasfiredbig1"}]))[0]) == 1
@@ -0,0 +1,67 @@
+"""
+Tests of the response cache: canonical keys, expiry, least-recently-used eviction and counters.
+"""
+#internal packages
+import functions.responsecache as responsecache
+from functions.responsecache import ResponseCache, getPayloadKey, isCacheable
+from functions.warmstart import LAST_DISPATCH
+
+#external packages
+import pytest
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Clock of the cache, moved forward by the tests: clock[0] is the time in seconds.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(responsecache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_payload_keys_are_canonical():
+    payload = {"load": 100, "fuels": {"gas(euro/MWh)": 13.4, "wind(%)": 60}, "powerplants": []}
+    same_payload = {"powerplants": [], "fuels": {"wind(%)": 60.0, "gas(euro/MWh)": 13.4}, "load": 100.0}
+    assert getPayloadKey(payload) == getPayloadKey(same_payload)
+    assert getPayloadKey(payload) != getPayloadKey(dict(payload, load=100.1))
+    #a boolean isn't the same as a number
+    assert getPayloadKey({"a": True}) != getPayloadKey({"a": 1})
+    assert isCacheable(payload) and not isCacheable(dict(payload, previous=LAST_DISPATCH))
+
+
+def test_responses_expire(clock):
+    cache = ResponseCache(10, 60)
+    cache.put(b"a", "plan a")
+    clock[0] += 59.9
+    assert cache.get(b"a") == "plan a"
+    #a hit doesn't extend the time to live
+    clock[0] += 0.1
+    assert cache.get(b"a") is None
+    assert cache.stats()["size"] == 0
+    #storing the response again starts a new time to live
+    cache.put(b"a", "plan a")
+    clock[0] += 30
+    assert cache.get(b"a") == "plan a"
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_least_recently_used_response_is_evicted(clock):
+    cache = ResponseCache(2, 60)
+    cache.put(b"a", "plan a")
+    cache.put(b"b", "plan b")
+    #b becomes the least recently used
+    assert cache.get(b"a") == "plan a"
+    cache.put(b"c", "plan c")
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == "plan a" and cache.get(b"c") == "plan c"
+    cache.configure(1, 60)
+    assert cache.stats()["size"] == 1 and cache.get(b"c") == "plan c"
+
+
+def test_cache_of_size_zero_is_disabled(clock):
+    cache = ResponseCache(0, 60)
+    cache.put(b"a", "plan a")
+    assert cache.get(b"a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,40 @@
+"""
+Tests of the scaling benchmark: seeded fleets and summaries.
+"""
+#internal packages
+import benchmarks.scaling as scaling
+
+#external packages
+import random
+
+
+def test_fleets_are_seeded():
+    payload = scaling.makePayload(random.Random(1), 20, 12, 0.5, 0.3)
+    assert payload == scaling.makePayload(random.Random(1), 20, 12, 0.5, 0.3)
+    assert len(payload["powerplants"]) == 20
+
+
+def test_unsolved_cases_are_not_timed():
+    records = [
+        {"plants": 5, "total": 10.0, "solved": True, "optimal": True},
+        {"plants": 5, "total": 30.0, "solved": True, "optimal": False},
+        {"plants": 5, "total": 0.1, "solved": False, "optimal": True},
+        {"plants": 10, "total": 0.1, "solved": False, "optimal": True},
+    ]
+    summaries = scaling.summarise(records)
+    assert summaries[0]["cases"] == 3
+    assert summaries[0]["unsolved"] == 1
+    assert summaries[0]["p50_ms"] == 20.0
+    assert summaries[0]["max_ms"] == 30.0
+    assert summaries[0]["throughput_per_s"] == 50.0
+    assert summaries[0]["not_optimal"] == 1
+    assert summaries[1]["unsolved"] == 1
+    assert summaries[1]["p50_ms"] is None and summaries[1]["throughput_per_s"] is None
+
+
+def test_run_case():
+    records = scaling.runCase(random.Random(2), 10, 4, 0.5, 0.3, 2, 1, "auto", 2000)
+    assert len(records) == 2
+    for record in records:
+        assert record["solved"] in (True, False)
+        assert record["total"] >= record["solve"]
@@ -0,0 +1,39 @@
+"""
+Tests of the offline solver of JSON lines files, against the brute-force engine on each line.
+"""
+#internal packages
+from solvefile import solveFile, readChunks
+from helpers import makePayloads, solve, assertSameOutcome
+
+#external packages
+import io
+import json
+
+
+def test_solutions_are_in_input_order():
+    payloads = makePayloads(9, 20)
+    input_lines = [json.dumps(payload).encode() for payload in payloads]
+    input_lines.insert(5, b"not json")
+    output_file = io.BytesIO()
+    summary = solveFile(io.BytesIO(b"\n".join(input_lines) + b"\n"), output_file, workers=2, chunk_lines=3)
+    outputs = [json.loads(line) for line in output_file.getvalue().splitlines()]
+    assert summary["lines"] == len(outputs) == len(payloads) + 1
+    assert "error" in outputs.pop(5)
+    for payload, output in zip(payloads, outputs):
+        assertSameOutcome(payload, output, solve(payload, "bruteforce"))
+    assert summary["errors"] == 1 + len([output for output in outputs if isinstance(output, dict)])
+
+
+def test_chunks():
+    input_file = io.BytesIO(b"".join(b"%d\n" % iLine for iLine in range(0, 10)))
+    assert [len(chunk) for chunk in readChunks(input_file, 4)] == [4, 4, 2]
+
+
+def test_lines_cannot_use_the_last_dispatch():
+    payload = makePayloads(10, 1)[0]
+    input_lines = [json.dumps(payload).encode(), json.dumps(dict(payload, previous="last")).encode()]
+    output_file = io.BytesIO()
+    summary = solveFile(io.BytesIO(b"\n".join(input_lines)), output_file, workers=1)
+    outputs = [json.loads(line) for line in output_file.getvalue().splitlines()]
+    assert "last" in outputs[1]["msg:"]
+    assert summary["errors"] == 1 + isinstance(outputs[0], dict)
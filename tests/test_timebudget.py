@@ -0,0 +1,74 @@
+"""
+Tests of anytime solving: with a time budget, every engine answers in time with a valid plan, and stops as soon as it is cancelled.
+"""
+#internal packages
+from functions.timebudget import TimeBudget, isExpired
+import functions.timebudget as timebudget
+import benchmarks.scaling as scaling
+from helpers import solve, getPlanCost
+
+#external packages
+import random
+import time
+
+import pytest
+
+
+#time given to the search, and time allowed for the whole solve (preparation of the fleet included)
+DEADLINE_MS = 50
+MAX_SOLVE_SECONDS = 2
+
+
+@pytest.mark.parametrize("engine", ["auto", "bruteforce", "dp", "bnb"])
+def test_budget_gives_a_plan_in_time(engine):
+    rng = random.Random(1)
+    for nPlants in [50, 100, 200]:
+        #heavy fleets of the scaling benchmark: many cost tiers, tight pmins
+        payload = scaling.makePayload(rng, nPlants, 40, 0.9, 0.3)
+        budget = TimeBudget(DEADLINE_MS)
+        start = time.perf_counter()
+        plan = solve(payload, engine, budget)
+        assert time.perf_counter() - start < MAX_SOLVE_SECONDS
+        assert not isinstance(plan, dict), "expected a plan, got an error: %s" % plan
+        getPlanCost(payload, plan)
+
+
+@pytest.mark.parametrize("engine", ["bruteforce", "dp", "bnb"])
+def test_cancelled_search_stops_at_once(engine):
+    #the brute-force engine checks the budget more than 30000 times on this fleet when it isn't cancelled
+    payload = scaling.makePayload(random.Random(1), 20, 40, 0.9, 0.3)
+    checks = []
+    #cancelled from the first check, as when the client has disconnected
+    budget = TimeBudget(None, lambda: checks.append(True) or True)
+    plan = solve(payload, engine, budget)
+    assert len(checks) == 1
+    assert not budget.optimal
+    #the best plan found before the first check, if any
+    if isinstance(plan, dict):
+        assert "time budget" in plan["msg:"]
+    else:
+        getPlanCost(payload, plan)
+
+
+def test_budget_expires_at_its_deadline(monkeypatch):
+    now = [50.0]
+    monkeypatch.setattr(timebudget.time, "monotonic", lambda: now[0])
+    budget = TimeBudget(200)
+    now[0] = 50.19
+    assert not isExpired(budget) and budget.optimal
+    now[0] = 50.2
+    assert isExpired(budget) and not budget.optimal
+    assert not isExpired(None) and not TimeBudget().expired()
+
+
+def test_dp_without_time_gives_a_greedy_plan():
+    rng = random.Random(3)
+    nStopped = 0
+    for nPlants in [50, 100, 200]:
+        payload = scaling.makePayload(rng, nPlants, 40, 0.9, 0.3)
+        budget = TimeBudget(0)
+        plan = solve(payload, "dp", budget)
+        assert not isinstance(plan, dict), "expected a plan, got an error: %s" % plan
+        getPlanCost(payload, plan)
+        nStopped += not budget.optimal
+    assert nStopped > 0
@@ -0,0 +1,47 @@
+"""
+Tests of time series of loads: one fleet per wind percentage, and each timestep warm-started from the previous one.
+"""
+#internal packages
+from functions.optimisation import getTimeStep
+import functions.optimisation as optimisation
+from helpers import loadPayload, makePayloads, makeTiePayload, solve, getPowers, getPlanCost
+
+#external packages
+import random
+
+
+def test_fleet_is_prepared_once_per_wind(monkeypatch):
+    preparations = []
+    prepareFleet = optimisation.prepareFleet
+    monkeypatch.setattr(optimisation, "prepareFleet", lambda *args, **kwargs: preparations.append(args[1]) or prepareFleet(*args, **kwargs))
+    rng = random.Random(1)
+    payload = loadPayload("example_payloads/payload3.json")
+    #a day of quarter-hours, with two wind percentages
+    payload["load"] = [round(rng.uniform(100, 900), 1) for iStep in range(0, 96)]
+    payload["fuels"]["wind(%)"] = [60 if iStep < 48 else 25 for iStep in range(0, 96)]
+    output = solve(payload)
+    assert len(output) == 96
+    for iStep in range(0, 96):
+        getPlanCost(getTimeStep(payload, iStep), output[iStep])
+    assert preparations == [60, 25]
+
+
+def test_each_timestep_is_warm_started_from_the_previous_one():
+    payload = makeTiePayload()
+    cold_plan = solve(payload)
+    assert getPowers(cold_plan)["gasfiredbig1"] == 300
+    #the first timestep starts from 'previous', with the other big plant on, and the next ones keep it
+    payload["previous"] = [dict(plant, p=300 if plant["name"] == "gasfiredbig2" else 0) for plant in cold_plan]
+    payload["load"] = [300, 310, 290.5, 300]
+    for plan in solve(payload):
+        powers = getPowers(plan)
+        assert powers["gasfiredbig1"] == 0 and powers["gasfiredbig2"] > 0
+
+
+def test_time_series_errors():
+    payload = makePayloads(3, 1)[0]
+    payload["load"] = []
+    assert "msg:" in solve(payload)
+    payload["load"] = [100, 200]
+    payload["fuels"]["wind(%)"] = [50]
+    assert "msg:" in solve(payload)
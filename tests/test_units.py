@@ -0,0 +1,41 @@
+"""
+Tests of the fixed-point units: conversions, rounding of the wind power and of the costs.
+"""
+#internal packages
+from models.units import toPowerUnits, toMW, toCostUnits, toEuros, getWindUnits
+from helpers import loadPayload
+
+#external packages
+import random
+from fractions import Fraction
+
+
+def test_conversions():
+    assert toPowerUnits(0.3) == 3 and toPowerUnits(460) == 4600 and toMW(4605) == 460.5
+    assert toCostUnits(13.4 / 0.5) == 2680 and toCostUnits(50.8 / 0.3) == 16933
+    #half a cent is rounded up, whatever the sign of the floating-point error
+    assert toEuros(14) == 0.01 and toEuros(15) == 0.02 and toEuros(2680 * 4600) == 12328.0
+
+
+def test_wind_units_are_exact():
+    assert getWindUnits(toPowerUnits(150), 33.3) == 500
+    assert getWindUnits(toPowerUnits(150), 60) == 900
+    #half a power unit is rounded to even
+    assert getWindUnits(5, 50) == 2 and getWindUnits(15, 50) == 8
+    rng = random.Random(1)
+    for iCheck in range(0, 2000):
+        pmax_units = rng.randint(0, 100000)
+        wind_pc = round(rng.uniform(0, 100), rng.randint(0, 3))
+        assert getWindUnits(pmax_units, wind_pc) == round(Fraction(pmax_units) * Fraction(str(wind_pc)) / 100)
+
+
+def test_wind_power_in_plan(client):
+    #computed in floating point, 150 MW at 33.3% used to give 49.9 MW
+    payload = loadPayload("example_payloads/payload3.json")
+    payload["fuels"]["wind(%)"] = 33.3
+    payload["powerplants"] = [plant for plant in payload["powerplants"] if plant["type"] != "windturbine"]
+    payload["powerplants"].append({"name": "windpark", "type": "windturbine", "efficiency": 1, "pmin": 0, "pmax": 150})
+    plan = client.post("/productionplan", json=payload).get_json()
+    assert {plant["name"]: plant["p"] for plant in plan}["windpark"] == 50.0
+    assert round(sum([plant["p"] for plant in plan]), 1) == payload["load"]
+
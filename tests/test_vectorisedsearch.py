@@ -0,0 +1,53 @@
+"""
+Tests of the vectorised search of the interval combinations, against the scalar search.
+"""
+#internal packages
+import functions.optimisation as optimisation
+import functions.vectorisedsearch as vectorisedsearch
+import functions.metrics as metrics
+from functions.timebudget import TimeBudget
+from models.units import toPowerUnits
+from helpers import makePayloads, solve, assertSameOutcome
+
+#external packages
+import pytest
+
+
+pytestmark = pytest.mark.skipif(not vectorisedsearch.isAvailable(), reason="NumPy is not installed")
+
+
+def test_vectorised_search_matches_scalar_search(monkeypatch):
+    for payload in makePayloads(5, 200, min_plants=3, max_plants=9):
+        monkeypatch.setattr(optimisation, "VECTORISE_MIN_COMBINATIONS", 1)
+        vectorised_plan = solve(payload, "bruteforce")
+        monkeypatch.setattr(optimisation, "VECTORISE_MIN_COMBINATIONS", float("inf"))
+        assertSameOutcome(payload, vectorised_plan, solve(payload, "bruteforce"))
+
+
+def test_combinations_evaluated_are_counted_once(monkeypatch):
+    #four tiers of two plants of 100 to 110 MW, each tier can supply 100 to 110 MW or 200 to 220 MW
+    payload = makePayloads(6, 1)[0]
+    payload["powerplants"] = [
+        {"name": "plant%s" % iPlant, "type": "gasfired", "efficiency": 0.3 + 0.1 * (iPlant // 2), "pmin": 100, "pmax": 110}
+        for iPlant in range(0, 8)
+    ]
+    payload["load"] = 620
+    parsed = optimisation.parsePayload(payload)[1]
+    fleet = optimisation.prepareFleet(optimisation.makeOrderedPlants(parsed), parsed["wind_pc"])
+    power_ranges_byCostTier = fleet["power_ranges_byCostTier"]
+    subset = list(range(0, len(power_ranges_byCostTier)))
+    number_of_combinations = 1
+    for power_range in power_ranges_byCostTier:
+        number_of_combinations *= len(power_range)
+    assert number_of_combinations == 16
+    monkeypatch.setattr(optimisation, "VECTORISE_MIN_COMBINATIONS", 1)
+    monkeypatch.setattr(vectorisedsearch, "COMBINATIONS_PER_CHUNK", 2)
+
+    optimisation.bruteForceSolution(toPowerUnits(parsed["load"]), subset, fleet["plants_byCostTier"], power_ranges_byCostTier)
+    assert metrics.combinations_evaluated.value() == number_of_combinations
+
+    #with no time left, only the first chunk is evaluated
+    budget = TimeBudget(0)
+    optimisation.bruteForceSolution(toPowerUnits(parsed["load"]), subset, fleet["plants_byCostTier"], power_ranges_byCostTier, budget)
+    assert metrics.combinations_evaluated.value() == number_of_combinations + 2
+    assert not budget.optimal
@@ -0,0 +1,37 @@
+"""
+Tests of warm starts from a previous dispatch, against the brute-force engine on each load.
+"""
+#internal packages
+from functions.warmstart import WarmStart, LAST_DISPATCH
+from helpers import makePayloads, solve, assertSameOutcome
+
+#external packages
+import random
+
+import pytest
+
+
+@pytest.mark.parametrize("engine", ["auto", "bruteforce", "dp", "bnb"])
+def test_consecutive_loads_match_bruteforce(engine):
+    rng = random.Random(1)
+    for payload in makePayloads(10, 15, min_plants=3):
+        previous = None
+        for iStep in range(0, 8):
+            payload["load"] = max(round(payload["load"] + rng.uniform(-5, 5), 1), 0)
+            reference_plan = solve(payload, "bruteforce")
+            plan = solve(dict(payload, previous=previous), engine)
+            assertSameOutcome(payload, plan, reference_plan)
+            assertSameOutcome(payload, solve(dict(payload, previous=LAST_DISPATCH), engine), reference_plan)
+            if not isinstance(plan, dict):
+                previous = plan
+
+
+def test_previous_dispatch_is_matched_by_name():
+    previous = [["a", 10.0], ["b", 0.0], ["a", 5.0], ["unknown", 20.0], ["c", 0.0], ["a", 1.0]]
+    assert WarmStart.fromPrevious(previous, ["a", "b", "c", "a"]).committed == {0, 3}
+
+
+def test_previous_dispatch_errors():
+    payload = makePayloads(11, 1)[0]
+    assert "msg:" in solve(dict(payload, previous=[{"name": "gasfired0"}]))
+    assert "msg:" in solve(dict(payload, previous="first"))
@@ -0,0 +1,65 @@
+"""
+Tests of wind-scenario ensembles, against the brute-force engine on each scenario.
+"""
+#internal packages
+from functions.windensemble import optimiseWindEnsemble, getWindPowers
+from models.units import getWindUnits
+from functions.timebudget import TimeBudget
+from helpers import loadPayload, makePayloads, solve, assertSameOutcome
+
+#external packages
+import copy
+import random
+
+import pytest
+
+
+@pytest.mark.parametrize("engine", ["auto", "bruteforce", "dp", "bnb"])
+def test_each_scenario_matches_bruteforce(engine):
+    rng = random.Random(1)
+    for payload in makePayloads(5, 25, min_plants=3):
+        wind_pcs = [rng.choice([0, 12.5, 33.3, 50, 60, 100]) for iScenario in range(0, rng.randint(1, 8))]
+        ensemble_payload = dict(payload, fuels=dict(payload["fuels"], **{"wind(%)": wind_pcs}))
+        output = optimiseWindEnsemble(copy.deepcopy(ensemble_payload), engine)
+        assert [scenario["wind(%)"] for scenario in output["scenarios"]] == wind_pcs
+        costs = []
+        for scenario in output["scenarios"]:
+            scenario_payload = dict(payload, fuels=dict(payload["fuels"], **{"wind(%)": scenario["wind(%)"]}))
+            reference_plan = solve(scenario_payload, "bruteforce")
+            if "globalcost" in scenario:
+                assertSameOutcome(scenario_payload, scenario["plan"], reference_plan)
+                costs.append(scenario["globalcost"])
+            else:
+                assert isinstance(reference_plan, dict), "expected a plan, got an error: %s" % scenario
+        cost_statistics = output["statistics"]
+        assert cost_statistics["scenarios"] == len(wind_pcs)
+        assert cost_statistics["solved"] == len(costs)
+        if len(costs) > 0:
+            assert cost_statistics["min"] == min(costs) and cost_statistics["max"] == max(costs)
+            assert cost_statistics["min"] <= cost_statistics["p50"] <= cost_statistics["max"]
+
+
+def test_wind_powers_match_each_turbine():
+    rng = random.Random(2)
+    pmaxs = [rng.randint(0, 5000) for iTurbine in range(0, 30)] + [5, 15, 25]
+    wind_pcs = [rng.choice([0, 10, 33.3, 50, 100]) for iScenario in range(0, 20)] + [rng.uniform(0, 100) for iScenario in range(0, 20)]
+    powers = getWindPowers(pmaxs, wind_pcs)
+    assert powers == [tuple(getWindUnits(pmax, wind_pc) for pmax in pmaxs) for wind_pc in wind_pcs]
+
+
+def test_ensemble_errors():
+    payload = makePayloads(6, 1)[0]
+    payload["fuels"]["wind(%)"] = []
+    assert "msg:" in optimiseWindEnsemble(payload)
+    payload["fuels"]["wind(%)"] = [50, 120]
+    assert "msg:" in optimiseWindEnsemble(payload)
+
+
+def test_no_time_for_the_table_gives_greedy_plans():
+    payload = loadPayload("example_payloads/payload3.json")
+    payload["load"] = 80
+    payload["fuels"]["wind(%)"] = [0, 10, 33.3, 60, 100]
+    budget = TimeBudget(0)
+    output = optimiseWindEnsemble(payload, budget=budget)
+    assert not budget.optimal
+    assert output["statistics"]["solved"] > 0